@@ -1,14 +1,20 @@
 #!/usr/bin/env python3
 """
 Modal deployment for UI-TARS-1.5-7B
-Production-ready deployment with Transformers on A100 GPUs.
+Production-ready deployment with vLLM on a single H100 (or A100-80GB) GPU.
 
-NOTE: vLLM 0.6.6 does NOT support Qwen2.5-VL architecture (Qwen2_5_VLForConditionalGeneration).
-UI-TARS-1.5-7B is based on Qwen2.5-VL, so we must use HuggingFace Transformers.
+UI-TARS-1.5-7B is based on Qwen2.5-VL (Qwen2_5_VLForConditionalGeneration),
+which vLLM supports since 0.7.2. The vLLM server (`serve`) is the default: it
+provides continuous batching, paged attention, prefix caching and CUDA graphs,
+and exposes the OpenAI-compatible API natively.
 
-Based on the working local server implementation.
+The HuggingFace Transformers server (`UITARSTransformersServer`) is kept as a
+fallback, based on the working local server implementation.
 """
 
+import os
+import re
+
 import modal
 
 # Modal app configuration
@@ -17,8 +23,67 @@ app = modal.App("uitars-grounding-server")
 # Model configuration
 MODEL_NAME = "ByteDance-Seed/UI-TARS-1.5-7B"
 MODEL_REVISION = "main"
-GROUNDING_WIDTH = 1920
-GROUNDING_HEIGHT = 1080
+# Multiples of the 28px vision patch grid (patch 14 x merge 2), so smart_resize
+# leaves the size unchanged and the model's coordinates are in exactly this space
+GROUNDING_WIDTH = 1932
+GROUNDING_HEIGHT = 1092
+
+# Every screenshot is resized to GROUNDING_WIDTH x GROUNDING_HEIGHT before the
+# processor sees it, so each request yields the same number of vision tokens
+# (batchable, and stable shapes for torch.compile / CUDA graphs). Coordinates
+# in the response are mapped back to the size of the image that was sent.
+# Smaller images would hit the model's low-resolution path and are rejected.
+MIN_IMAGE_SIZE = 256
+
+# torch.compile the language decoder with mode="reduce-overhead" so Inductor
+# fuses kernels and replays CUDA graphs instead of launching every op per token.
+# Compilation takes 30-90s and is paid once at container startup (see warmup).
+ENABLE_TORCH_COMPILE = True
+
+# Prompts are left-padded up to a multiple of this many tokens so the compiled
+# decoder only ever sees a handful of input shapes and Dynamo doesn't recompile.
+PROMPT_BUCKET_SIZE = 256
+
+# Length of the compiled decoder's static KV cache. generate() sizes the cache
+# from max_length, which would otherwise be prompt bucket + max_tokens and give
+# every request mix a new cache shape (and a recompile). It is pinned here, and
+# each request's max_tokens is enforced by a stopping criterion instead. A
+# grounding image is 2691 vision tokens, which leaves ~1k tokens of headroom.
+STATIC_CACHE_LEN = 4096
+
+# Attention kernel: "flash_attention_2" (fused, needs the flash-attn wheel and
+# an Ampere+ GPU), "sdpa" or "eager"
+ATTN_IMPLEMENTATION = "flash_attention_2"
+
+# Weight-only quantization of the language decoder: None (bf16), "int8", or
+# "fp8" (needs Hopper or newer). Decode at batch=1 is HBM-bandwidth bound, so
+# halving bytes per weight roughly doubles decode speed. The vision tower is
+# compute bound and stays in bf16.
+QUANTIZATION = "int8"
+
+# "(x, y)" points in UI-TARS output, rescaled back to the input image size
+COORDINATE_PATTERN = re.compile(r"\((\d+(?:\.\d+)?),\s*(\d+(?:\.\d+)?)\)")
+
+# Base64 of the JPEG SOI marker (FF D8 FF); such images are decoded with nvJPEG
+JPEG_BASE64_PREFIX = "/9j/"
+
+# Number of screenshots whose vision tower embeddings are kept on the GPU
+# (~20MB each at 1920x1080), so repeat queries on one screenshot skip the ViT
+VISION_CACHE_SIZE = 32
+
+# Maximum number of pooled buffers (pinned host staging and GPU input tensors)
+# kept per (device, dtype, shape). With a fixed grounding resolution almost
+# every request reuses the same shapes, so the hot path allocates nothing.
+BUFFER_POOL_SIZE = 8
+
+# Dynamic batching: concurrent /v1/chat/completions requests arriving within
+# BATCH_TIMEOUT seconds of each other are run as one batched generate call.
+MAX_BATCH_SIZE = 16
+BATCH_TIMEOUT = 0.02
+
+# With torch.compile, batches are padded up to one of these sizes (by repeating
+# their last request) so the decoder only sees a few batch shapes
+BATCH_BUCKETS = (1, 4, 8, MAX_BATCH_SIZE)
 
 # Create a persistent volume for model caching
 # This avoids downloading the 31GB model on every cold start
@@ -27,27 +92,52 @@ model_cache = modal.Volume.from_name(
     create_if_missing=True
 )
 
-# Define the container image with all dependencies
+# Define the container images with all dependencies
+# vLLM pins its own torch/transformers, so it gets a separate image
 vllm_image = (
     modal.Image.debian_slim(python_version="3.11")
     .pip_install(
-        "vllm==0.6.6",  # Latest stable with vision support
+        "vllm==0.10.1.1",  # Qwen2.5-VL support landed in 0.7.2
+        "hf-transfer",  # Fast HuggingFace downloads
+        "hf-xet",  # Chunked parallel downloads for Xet-backed repos
+    )
+    .env({
+        "HF_HUB_ENABLE_HF_TRANSFER": "1",
+        "HF_XET_HIGH_PERFORMANCE": "1",
+    })
+)
+
+transformers_image = (
+    modal.Image.debian_slim(python_version="3.11")
+    .pip_install(
         "torch==2.5.1",
         "transformers>=4.48.0",  # Need 4.48+ for Qwen2.5-VL support
         "accelerate==1.2.1",
+        "torchao==0.7.0",  # Weight-only int8/fp8 quantization
+        "torchvision==0.20.1",  # nvJPEG decode on the GPU
         "pillow==11.0.0",
         "hf-transfer",  # Fast HuggingFace downloads
+        "hf-xet",  # Chunked parallel downloads for Xet-backed repos
         "huggingface_hub",  # For snapshot_download
         "qwen-vl-utils",  # Required for Qwen2.5-VL models
     )
+    # Prebuilt FlashAttention-2 wheel matching torch 2.5 / CUDA 12 / Python 3.11
+    .pip_install(
+        "https://github.com/Dao-AILab/flash-attention/releases/download/v2.7.4.post1/"
+        "flash_attn-2.7.4.post1+cu12torch2.5cxx11abiFALSE-cp311-cp311-linux_x86_64.whl"
+    )
     .env({
         "HF_HUB_ENABLE_HF_TRANSFER": "1",
+        "HF_XET_HIGH_PERFORMANCE": "1",
+        # Grow CUDA allocator segments in place instead of fragmenting into
+        # many fixed-size blocks under varying request shapes
+        "PYTORCH_CUDA_ALLOC_CONF": "expandable_segments:True",
     })
 )
 
 
 @app.function(
-    image=vllm_image,
+    image=transformers_image,
     # No secrets needed for downloading public models
     volumes={"/model_cache": model_cache},
     timeout=60 * 60,  # 1 hour for download
@@ -75,6 +165,7 @@ def download_model():
         cache_dir="/model_cache",
         revision=MODEL_REVISION,
         ignore_patterns=["*.md", "*.txt"],
+        max_workers=16,  # Fetch safetensors shards in parallel
     )
     
     # Commit the volume
@@ -87,38 +178,81 @@ def download_model():
 
 
 # GPU configuration - using new Modal 1.0 syntax
-GPU_CONFIG = "A100-40GB"
+# A single 80GB GPU fits the 7B weights plus a large KV cache, so batches can
+# grow without tensor parallelism. H100 adds FP8 tensor cores; Modal falls
+# back to A100-80GB (same KV headroom, similar $/hr) when H100s are scarce.
+GPU_CONFIG = ["H100", "A100-80GB"]
 
 # Container settings
 SCALEDOWN_WINDOW = 60 * 10  # Keep warm for 10 minutes
 
 
-# NOTE: vLLM server commented out because vLLM 0.6.6 does NOT support
-# Qwen2_5_VLForConditionalGeneration (the architecture UI-TARS uses).
-# vLLM only supports Qwen2VLForConditionalGeneration (older Qwen2-VL).
-# Use the Transformers implementation below instead.
-#
-# @app.function(
-#     image=vllm_image,
-#     gpu=GPU_CONFIG,
-#     volumes={"/model_cache": model_cache},
-#     timeout=60 * 20,
-#     scaledown_window=SCALEDOWN_WINDOW,
-# )
-# @modal.concurrent(max_inputs=100)
-# @modal.web_server(port=8000, startup_timeout=180)
-# def serve():
-#     """vLLM server - NOT SUPPORTED for UI-TARS (Qwen2.5-VL architecture)"""
-#     pass
-
-
-# Alternative: Custom implementation with transformers (if vLLM doesn't work)
-@app.cls(
+# vLLM server settings
+VLLM_PORT = 8000
+MAX_MODEL_LEN = 8192
+MAX_NUM_SEQS = 64  # Concurrent sequences per batch; the 80GB KV cache fits them
+GPU_MEMORY_UTILIZATION = 0.92
+
+
+@app.function(
     image=vllm_image,
     gpu=GPU_CONFIG,
     volumes={"/model_cache": model_cache},
     timeout=60 * 20,
     scaledown_window=SCALEDOWN_WINDOW,
+)
+@modal.concurrent(max_inputs=100)
+@modal.web_server(port=VLLM_PORT, startup_timeout=60 * 10)
+def serve():
+    """
+    vLLM OpenAI-compatible server for UI-TARS.
+
+    Deploy with: modal deploy deploy_uitars_modal.py
+    Endpoint: <your-modal-url>/v1/chat/completions
+    """
+    import subprocess
+
+    cmd = [
+        "vllm",
+        "serve",
+        MODEL_NAME,
+        "--revision",
+        MODEL_REVISION,
+        # Agent S3's huggingface engine requests model="tgi"
+        "--served-model-name",
+        "ui-tars-1.5-7b",
+        "tgi",
+        "--host",
+        "0.0.0.0",
+        "--port",
+        str(VLLM_PORT),
+        "--download-dir",
+        "/model_cache",
+        "--dtype",
+        "bfloat16",
+        "--max-model-len",
+        str(MAX_MODEL_LEN),
+        "--gpu-memory-utilization",
+        str(GPU_MEMORY_UTILIZATION),
+        "--max-num-seqs",
+        str(MAX_NUM_SEQS),
+        # FP8 weights (native on H100, Marlin W8A16 on A100) halve decode bandwidth
+        "--quantization",
+        "fp8",
+        # No --enable-prefix-caching: the V1 engine already reuses KV blocks for
+        # shared prompt prefixes (including identical screenshots) by default
+    ]
+    print(f"🚀 Starting vLLM: {' '.join(cmd)}")
+    subprocess.Popen(cmd)
+
+
+# Fallback: Custom implementation with transformers
+@app.cls(
+    image=transformers_image,
+    gpu=GPU_CONFIG,
+    volumes={"/model_cache": model_cache},
+    timeout=60 * 20,
+    scaledown_window=SCALEDOWN_WINDOW,
     # Secret optional - only needed for gated models
     # secrets=[modal.Secret.from_name("huggingface-secret")],
 )
@@ -126,7 +260,7 @@ SCALEDOWN_WINDOW = 60 * 10  # Keep warm for 10 minutes
 class UITARSTransformersServer:
     """
     Fallback implementation using HuggingFace Transformers.
-    Use this if vLLM doesn't fully support UI-TARS vision features yet.
+    Use this if the vLLM server (`serve`) misbehaves for UI-TARS.
     
     Deploy with: modal deploy deploy_uitars_modal.py::UITARSTransformersServer.chat_completions
     """
@@ -134,14 +268,16 @@ class UITARSTransformersServer:
     @modal.enter()
     def load_model(self):
         """Load the UI-TARS model on container startup."""
+        import threading
         import torch
+        from concurrent.futures import ThreadPoolExecutor
         from transformers import Qwen2_5_VLForConditionalGeneration, AutoProcessor
 
         print("=" * 60)
         print("🚀 Initializing UI-TARS-1.5-7B (Transformers)")
         print("=" * 60)
         print(f"📦 Model: {MODEL_NAME}")
-        print(f"🎮 GPU: A100 40GB")
+        print(f"🎮 GPU: {torch.cuda.get_device_name() if torch.cuda.is_available() else 'none'}")
         print()
 
         # Detect device
@@ -159,6 +295,27 @@ class UITARSTransformersServer:
             cache_dir="/model_cache",
             trust_remote_code=True,
         )
+        # Batched prompts are left-padded so every row ends at the same position
+        self.processor.tokenizer.padding_side = "left"
+
+        # The chat template scaffold (system prompt, role tags, vision markers,
+        # generation prompt) is identical for every request, so render it once
+        # around a sentinel and splice each query in with plain string concat.
+        query_sentinel = "<<QUERY>>"
+        template = self.processor.apply_chat_template(
+            [
+                {
+                    "role": "user",
+                    "content": [
+                        {"type": "image"},
+                        {"type": "text", "text": query_sentinel},
+                    ],
+                }
+            ],
+            add_generation_prompt=True,
+            tokenize=False,
+        )
+        self._prompt_prefix, self._prompt_suffix = template.split(query_sentinel)
 
         # Load model - MUST use Qwen2_5_VLForConditionalGeneration for generation
         # AutoModel loads Qwen2_5_VLModel which doesn't have .generate() method
@@ -169,12 +326,326 @@ class UITARSTransformersServer:
             trust_remote_code=True,
             torch_dtype=torch.bfloat16,
             device_map="auto",
+            # Fused FlashAttention-2 kernels for both the vision tower (varlen
+            # windowed attention) and the decoder; the eager fallback moves the
+            # full attention matrix through HBM for thousands of image tokens
+            attn_implementation=ATTN_IMPLEMENTATION,
+            # Materialize weights straight onto the GPU instead of first
+            # allocating a full CPU copy of the 31GB checkpoint
+            low_cpu_mem_usage=True,
         )
         self.model.eval()
+        self.model.config.use_cache = True
+
+        # Any remaining scaled_dot_product_attention calls may use the flash kernel
+        torch.backends.cuda.enable_flash_sdp(True)
+
+        # All generate calls run on one dedicated thread: the FastAPI event loop
+        # never blocks on the GPU, and the GPU is a single queue of work
+        # (batches, streams and direct `generate` calls never interleave)
+        self._gpu_executor = ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix="uitars-gpu"
+        )
+
+        # Side stream for GPU image preprocessing (see _prepare_inputs_gpu)
+        self._preprocess_stream = (
+            torch.cuda.Stream() if torch.cuda.is_available() else None
+        )
+
+        # Pinned host and GPU buffers reused across requests, keyed by
+        # (device, dtype, shape) (see _borrow_buffer)
+        self._buffer_pool = {}
+        self._buffer_lock = threading.Lock()
 
         print("✅ Model loaded successfully!")
         print()
-    
+
+        if QUANTIZATION and torch.cuda.is_available():
+            self._quantize_model()
+
+        # A static KV cache keeps every decode step at the same tensor shapes,
+        # which is what lets the reduce-overhead compiled decoder capture one
+        # CUDA graph and replay it per token instead of relaunching each kernel.
+        # With a dynamic cache the KV tensors grow every step and graphs can't
+        # be reused. Older Transformers releases don't support it for Qwen2.5-VL.
+        cache_kwargs = {}
+        if ENABLE_TORCH_COMPILE and getattr(self.model, "_supports_static_cache", False):
+            cache_kwargs["cache_implementation"] = "static"
+
+        # Grounding is plain greedy decoding. Clear the sampling/penalty values
+        # shipped in the checkpoint's generation_config and switch off every
+        # optional output so generate() builds no logits processors or warpers
+        # and keeps no per-step bookkeeping.
+        self.model.generation_config.update(
+            temperature=None,
+            top_p=None,
+            top_k=None,
+            repetition_penalty=None,
+        )
+        self._generate_kwargs = {
+            "do_sample": False,
+            "num_beams": 1,
+            "use_cache": True,
+            "output_scores": False,
+            "output_logits": False,
+            "output_attentions": False,
+            "output_hidden_states": False,
+            "return_dict_in_generate": False,
+            **cache_kwargs,
+        }
+
+        self._install_vision_cache()
+
+        if ENABLE_TORCH_COMPILE and torch.cuda.is_available():
+            self._compile_model()
+
+        # Set UITARS_WARMUP=0 in the container environment to skip warmup
+        # while iterating on the server
+        if os.environ.get("UITARS_WARMUP", "1") != "0":
+            self._warmup()
+
+    def _install_vision_cache(self):
+        """
+        Memoize vision tower outputs by image content hash.
+
+        Agent S3 often asks several grounding questions about the same
+        screenshot, and the image embeddings depend only on the image. The
+        vision tower's forward is wrapped so that, for images whose hash is in
+        `self._vision_keys` (set around each generate call, in batch order),
+        cached embeddings are reused and only the missing images are encoded.
+        """
+        import torch
+        from collections import OrderedDict
+
+        visual = getattr(self.model, "visual", None) or self.model.model.visual
+        encode = visual.forward
+        merge_size = self.processor.image_processor.merge_size
+        self._vision_cache = OrderedDict()
+        self._vision_keys = None
+
+        def cached_forward(pixel_values, grid_thw=None, **kwargs):
+            keys = self._vision_keys
+            if keys is None or grid_thw is None or len(keys) != len(grid_thw):
+                return encode(pixel_values, grid_thw=grid_thw, **kwargs)
+
+            # pixel_values holds every image's patches back to back; each image
+            # yields one embedding per merge_size x merge_size patch group
+            patch_counts = grid_thw.prod(-1).tolist()
+            patches = pixel_values.split(patch_counts)
+            missing = [i for i, key in enumerate(keys) if key not in self._vision_cache]
+            if missing:
+                embeddings = encode(
+                    torch.cat([patches[i] for i in missing]),
+                    grid_thw=grid_thw[missing],
+                    **kwargs,
+                )
+                token_counts = [patch_counts[i] // merge_size**2 for i in missing]
+                for i, embedding in zip(missing, embeddings.split(token_counts)):
+                    self._vision_cache[keys[i]] = embedding
+                    while len(self._vision_cache) > VISION_CACHE_SIZE:
+                        self._vision_cache.popitem(last=False)
+
+            for key in keys:
+                self._vision_cache.move_to_end(key, last=True)
+            return torch.cat([self._vision_cache[key] for key in keys])
+
+        visual.forward = cached_forward
+
+    def _vision_key(self, image_base64: str) -> bytes:
+        """Content hash identifying an image in the vision cache."""
+        import hashlib
+
+        image_base64 = self._strip_data_uri(image_base64)
+        return hashlib.sha256(image_base64.encode("utf-8")).digest()
+
+    def _language_decoder(self):
+        """Return the text decoder module (nested under `language_model` in Transformers >= 4.52)."""
+        return getattr(self.model.model, "language_model", self.model.model)
+
+    def _quantize_model(self):
+        """Quantize the language decoder's linear layers to QUANTIZATION in place."""
+        from torchao.quantization import (
+            float8_weight_only,
+            int8_weight_only,
+            quantize_,
+        )
+
+        print(f"🔄 Quantizing language decoder to {QUANTIZATION}...")
+        configs = {"int8": int8_weight_only, "fp8": float8_weight_only}
+        if QUANTIZATION not in configs:
+            raise ValueError(f"Unsupported QUANTIZATION: {QUANTIZATION}")
+
+        # Weight-only schemes need no activation calibration data
+        quantize_(self._language_decoder(), configs[QUANTIZATION]())
+
+        print("✅ Language decoder quantized!")
+        print()
+
+    def _compile_model(self):
+        """Compile the language decoder (compilation itself happens during warmup)."""
+        import torch
+
+        print("🔄 Compiling language decoder (mode=reduce-overhead)...")
+
+        # Only the text decoder runs once per generated token, so that is where
+        # kernel launch overhead dominates. The vision tower runs once per image.
+        decoder = self._language_decoder()
+        # One graph per (batch bucket, prompt bucket) for prefill plus one per batch
+        # bucket for decode; the default limit of 8 would fall back to eager
+        torch._dynamo.config.cache_size_limit = max(
+            torch._dynamo.config.cache_size_limit, 64
+        )
+        decoder.forward = torch.compile(
+            decoder.forward,
+            mode="reduce-overhead",
+            dynamic=False,
+        )
+
+        print("✅ Language decoder compiled!")
+        print()
+
+    def _warmup(self):
+        """
+        Run canned requests so the first real request sees steady-state latency.
+
+        The passes pay for torch.compile, CUDA graph capture, cuDNN/cuBLAS
+        autotuning and tokenizer/processor caches at container start instead.
+        """
+        import base64
+        import io
+        import time
+        from PIL import Image
+
+        print("🔥 Warming up...")
+        buffer = io.BytesIO()
+        Image.new("RGB", (GROUNDING_WIDTH, GROUNDING_HEIGHT), (128, 128, 128)).save(
+            buffer, format="PNG"
+        )
+        dummy_base64 = base64.b64encode(buffer.getvalue()).decode("utf-8")
+
+        # First pass compiles, second captures CUDA graphs, third is steady state.
+        # Every batch bucket is a separate graph, so each one is warmed up.
+        batch_sizes = BATCH_BUCKETS if ENABLE_TORCH_COMPILE else (1,)
+        for label in ("compile", "graph capture", "steady state"):
+            for batch_size in batch_sizes:
+                start_time = time.time()
+                # On the GPU thread: compiled CUDA graphs are tracked per thread
+                self._gpu_executor.submit(
+                    self._generate_batch,
+                    [dummy_base64] * batch_size,
+                    ["click submit"] * batch_size,
+                    8,
+                ).result()
+                print(
+                    f"   Warmup ({label}, batch {batch_size}): "
+                    f"{time.time() - start_time:.2f}s"
+                )
+
+        print("✅ Warmup complete!")
+        print()
+
+    def _to_device(self, inputs):
+        """
+        Copy processor outputs into pooled GPU buffers through pinned staging buffers.
+
+        Pageable tensors are first copied by the driver into a hidden pinned
+        buffer before the DMA; staging them in our own pinned memory skips that
+        copy and lets the transfer run asynchronously (`non_blocking=True`).
+        The destination GPU tensors also come from the pool, so steady-state
+        requests don't go through the CUDA caching allocator at all.
+
+        Returns:
+            (inputs on device, borrowed buffers to hand back to `_release_buffers`)
+        """
+        if self.device.type != "cuda":
+            return inputs.to(self.model.device), []
+
+        borrowed = []
+        for key, tensor in inputs.items():
+            if tensor.is_cuda:
+                continue  # Already produced on the GPU (see _prepare_inputs_gpu)
+            pinned = self._borrow_buffer(tensor.shape, tensor.dtype, "cpu")
+            pinned.copy_(tensor)
+            on_device = self._borrow_buffer(tensor.shape, tensor.dtype, self.model.device)
+            on_device.copy_(pinned, non_blocking=True)
+            inputs[key] = on_device
+            borrowed += [pinned, on_device]
+        return inputs, borrowed
+
+    def _borrow_buffer(self, shape, dtype, device):
+        """Take a buffer of the given shape from the pool (or allocate one); host buffers are pinned."""
+        import torch
+
+        device = torch.device(device)
+        with self._buffer_lock:
+            pool = self._buffer_pool.get((device, dtype, tuple(shape)))
+            if pool:
+                return pool.pop()
+        return torch.empty(
+            shape, dtype=dtype, device=device, pin_memory=device.type == "cpu"
+        )
+
+    def _release_buffers(self, buffers):
+        """Return borrowed buffers to the pool once generation no longer reads them."""
+        with self._buffer_lock:
+            for buffer in buffers:
+                key = (buffer.device, buffer.dtype, tuple(buffer.shape))
+                pool = self._buffer_pool.setdefault(key, [])
+                if len(pool) < BUFFER_POOL_SIZE:
+                    pool.append(buffer)
+
+    def _pad_to_bucket(self, inputs):
+        """Left-pad input_ids/attention_mask up to the next PROMPT_BUCKET_SIZE multiple."""
+        import torch.nn.functional as F
+
+        length = inputs["input_ids"].shape[1]
+        padding = -length % PROMPT_BUCKET_SIZE
+        if padding:
+            pad_token_id = self.processor.tokenizer.pad_token_id
+            inputs["input_ids"] = F.pad(
+                inputs["input_ids"], (padding, 0), value=pad_token_id
+            )
+            inputs["attention_mask"] = F.pad(
+                inputs["attention_mask"], (padding, 0), value=0
+            )
+        return inputs
+
+    def _length_kwargs(self, prompt_length: int, max_tokens: int, criteria=()):
+        """
+        generate() kwargs limiting the output to max_tokens new tokens.
+
+        With the compiled decoder, max_length stays at STATIC_CACHE_LEN so the
+        static cache keeps one shape, and the limit is a stopping criterion.
+        """
+        import torch
+        from transformers import StoppingCriteria, StoppingCriteriaList
+
+        criteria = list(criteria)
+        if not ENABLE_TORCH_COMPILE:
+            return {
+                "max_new_tokens": max_tokens,
+                "stopping_criteria": StoppingCriteriaList(criteria),
+            }
+
+        limit = prompt_length + max_tokens
+
+        class StopAtLength(StoppingCriteria):
+            """Stop once max_tokens new tokens have been generated."""
+
+            def __call__(self, input_ids, scores, **kwargs):
+                return torch.full(
+                    (input_ids.shape[0],),
+                    input_ids.shape[1] >= limit,
+                    dtype=torch.bool,
+                    device=input_ids.device,
+                )
+
+        return {
+            # Longer requests still work, at the cost of one extra cache shape
+            "max_length": max(STATIC_CACHE_LEN, limit),
+            "stopping_criteria": StoppingCriteriaList(criteria + [StopAtLength()]),
+        }
+
     @modal.method()
     def generate(self, image_base64: str, query: str, max_tokens: int = 100) -> str:
         """
@@ -188,63 +659,398 @@ class UITARSTransformersServer:
         Returns:
             Generated text response (coordinates)
         """
+        return self._gpu_executor.submit(
+            self._generate, image_base64, query, max_tokens
+        ).result()
+
+    def _prepare_inputs(self, images_base64: list, queries: list):
+        """
+        Build model inputs for a batch of requests and move them to the device.
+
+        Returns:
+            (inputs on device, borrowed buffers to hand back to `_release_buffers`,
+            original (width, height) of each image)
+        """
+        # Build Qwen2.5-VL prompts from the pre-rendered chat template
+        texts = [
+            self._prompt_prefix + query + self._prompt_suffix for query in queries
+        ]
+
+        # JPEG screenshots are decoded and preprocessed on the GPU; anything
+        # else (PNG, WebP, ...) goes through the CPU processor path.
+        # Prompts are left-padded to a common length so decode steps align.
+        if self.device.type == "cuda" and all(
+            self._strip_data_uri(image_base64).startswith(JPEG_BASE64_PREFIX)
+            for image_base64 in images_base64
+        ):
+            inputs, image_sizes = self._prepare_inputs_gpu(images_base64, texts)
+        else:
+            inputs, image_sizes = self._prepare_inputs_cpu(images_base64, texts)
+
+        if ENABLE_TORCH_COMPILE:
+            inputs = self._pad_to_bucket(inputs)
+        inputs, borrowed = self._to_device(inputs)
+        return inputs, borrowed, image_sizes
+
+    @staticmethod
+    def _check_image_size(width: int, height: int):
+        """Reject images too small to be resized up to the grounding resolution."""
+        if min(width, height) < MIN_IMAGE_SIZE:
+            raise ValueError(
+                f"Image is {width}x{height}; both sides must be at least "
+                f"{MIN_IMAGE_SIZE}px"
+            )
+
+    @staticmethod
+    def _rescale_coordinates(text: str, image_size) -> str:
+        """Map "(x, y)" points from GROUNDING_WIDTH x GROUNDING_HEIGHT to the original image size."""
+        width, height = image_size
+        if (width, height) == (GROUNDING_WIDTH, GROUNDING_HEIGHT):
+            return text
+
+        def rescale(match):
+            x = round(float(match.group(1)) * width / GROUNDING_WIDTH)
+            y = round(float(match.group(2)) * height / GROUNDING_HEIGHT)
+            return f"({x},{y})"
+
+        return COORDINATE_PATTERN.sub(rescale, text)
+
+    def _rescale_stream(self, chunks, image_size):
+        """
+        Rescale coordinates in a stream of text chunks.
+
+        Text after the last unmatched "(" is held back until the point is
+        complete, so a coordinate split across chunks is still rescaled.
+        """
+        pending = ""
+        for chunk in chunks:
+            pending += chunk
+            split = pending.rfind("(")
+            if split == -1 or ")" in pending[split:]:
+                split = len(pending)
+            if split:
+                yield self._rescale_coordinates(pending[:split], image_size)
+                pending = pending[split:]
+        if pending:
+            yield self._rescale_coordinates(pending, image_size)
+
+    def _generate_stream(
+        self, image_base64: str, query: str, max_tokens: int, stop_event
+    ):
+        """
+        Queue generation on the GPU thread and return an iterator of text chunks.
+
+        Args:
+            image_base64: Base64-encoded image
+            query: Text query
+            max_tokens: Maximum tokens to generate
+            stop_event: threading.Event; setting it stops generation early
+
+        Returns:
+            Iterator yielding decoded text as tokens are produced
+        """
         import torch
+        from transformers import StoppingCriteria, TextIteratorStreamer
+
+        class StopOnEvent(StoppingCriteria):
+            """Stop decoding once the client has gone away."""
+
+            def __call__(self, input_ids, scores, **kwargs):
+                return torch.full(
+                    (input_ids.shape[0],),
+                    stop_event.is_set(),
+                    dtype=torch.bool,
+                    device=input_ids.device,
+                )
+
+        streamer = TextIteratorStreamer(
+            self.processor.tokenizer,
+            skip_prompt=True,
+            skip_special_tokens=True,
+            clean_up_tokenization_spaces=False,
+        )
+
+        # Input preparation runs on the caller's thread so invalid images
+        # raise before the stream starts
+        with torch.no_grad():
+            inputs, borrowed, image_sizes = self._prepare_inputs(
+                [image_base64], [query]
+            )
+
+        def run():
+            self._vision_keys = [self._vision_key(image_base64)]
+            try:
+                with torch.no_grad():
+                    self.model.generate(
+                        **inputs,
+                        streamer=streamer,
+                        **self._length_kwargs(
+                            inputs["input_ids"].shape[1], max_tokens, [StopOnEvent()]
+                        ),
+                        **self._generate_kwargs,
+                    )
+            except Exception as e:
+                print(f"❌ Streaming generation failed: {e}")
+                streamer.end()  # Unblock the consumer
+            finally:
+                self._vision_keys = None
+                self._release_buffers(borrowed)
+
+        self._gpu_executor.submit(run)
+        return self._rescale_stream(streamer, image_sizes[0])
+
+    @staticmethod
+    def _strip_data_uri(image_base64: str) -> str:
+        """Drop a `data:image/...;base64,` prefix, if any."""
+        if "base64," in image_base64:
+            return image_base64.split("base64,", 1)[1]
+        return image_base64
+
+    def _prepare_inputs_cpu(self, images_base64: list, texts: list):
+        """
+        Decode and preprocess images on the CPU with the Qwen2.5-VL processor.
+
+        Returns:
+            (processor outputs, original (width, height) of each image)
+        """
         import base64
         import io
         from PIL import Image
+        from qwen_vl_utils import process_vision_info
 
-        # Decode base64 image
-        if "base64," in image_base64:
-            image_base64 = image_base64.split("base64,")[1]
-        image_bytes = base64.b64decode(image_base64)
-        image = Image.open(io.BytesIO(image_bytes))
-
-        # Run inference using proper Qwen2.5-VL format
-        with torch.no_grad():
-            # Prepare messages in Qwen2.5-VL format
-            # The model expects a conversation format with image and text
-            messages = [
+        # Resize the images to the grounding resolution with the canonical
+        # Qwen2.5-VL helper. Images come out already aligned to the patch
+        # grid, so the processor's own resize is a no-op.
+        vision_messages = []
+        image_sizes = []
+        for image_base64 in images_base64:
+            image_bytes = base64.b64decode(self._strip_data_uri(image_base64))
+            image = Image.open(io.BytesIO(image_bytes))
+            self._check_image_size(*image.size)
+            image_sizes.append(image.size)
+            vision_messages.append(
                 {
                     "role": "user",
                     "content": [
-                        {"type": "image", "image": image},
-                        {"type": "text", "text": query},
+                        {
+                            "type": "image",
+                            "image": image,
+                            "resized_width": GROUNDING_WIDTH,
+                            "resized_height": GROUNDING_HEIGHT,
+                        }
                     ],
                 }
-            ]
+            )
+        images, _ = process_vision_info(vision_messages)
+
+        # The processor expands the image placeholder to the image's patch
+        # count, tokenizes the text and preprocesses the images.
+        inputs = self.processor(
+            text=texts,
+            images=images,
+            padding=True,
+            return_tensors="pt",
+        )
+        return inputs, image_sizes
+
+    def _prepare_inputs_gpu(self, images_base64: list, texts: list):
+        """
+        Decode JPEG images with nvJPEG and preprocess them on the GPU.
+
+        Mirrors Qwen2VLImageProcessor (resize, rescale, normalize, patchify)
+        so the decoded pixels never leave VRAM, then expands the image
+        placeholder tokens in `texts` the same way the processor does.
 
-            # Process inputs using the processor's apply_chat_template
-            # This handles both text tokenization and image processing
-            inputs = self.processor.apply_chat_template(
-                messages,
-                add_generation_prompt=True,
-                tokenize=True,
-                return_dict=True,
-                return_tensors="pt"
-            ).to(self.model.device)
-
-            # Generate response
-            generated_ids = self.model.generate(
-                **inputs,
-                max_new_tokens=max_tokens,
-                do_sample=False,
+        Returns:
+            (model inputs, original (width, height) of each image)
+        """
+        import base64
+        import torch
+        from transformers import BatchFeature
+
+        merge_size = self.processor.image_processor.merge_size
+
+        encoded = [
+            torch.frombuffer(
+                bytearray(base64.b64decode(self._strip_data_uri(image_base64))),
+                dtype=torch.uint8,
+            )
+            for image_base64 in images_base64
+        ]
+
+        # Decode and preprocessing kernels are queued on a side stream so the
+        # GPU works on them while the CPU tokenizes the prompts below
+        preprocess_stream = self._preprocess_stream
+        preprocess_stream.wait_stream(torch.cuda.current_stream())
+        with torch.cuda.stream(preprocess_stream):
+            pixel_values, image_grid_thw, image_sizes = self._patchify_jpegs(encoded)
+
+        # Each image placeholder becomes one token per merged patch group
+        image_token = getattr(self.processor, "image_token", "<|image_pad|>")
+        expanded_texts = [
+            text.replace(
+                image_token,
+                image_token * (grid_t * grid_h * grid_w // merge_size**2),
+                1,
+            )
+            for text, (grid_t, grid_h, grid_w) in zip(texts, image_grid_thw)
+        ]
+        text_inputs = self.processor.tokenizer(
+            expanded_texts, padding=True, return_tensors="pt"
+        )
+
+        # Join the streams before the model consumes the pixels
+        torch.cuda.current_stream().wait_stream(preprocess_stream)
+        pixel_values.record_stream(torch.cuda.current_stream())
+
+        inputs = BatchFeature(
+            {
+                **text_inputs,
+                "pixel_values": pixel_values,
+                "image_grid_thw": torch.tensor(image_grid_thw, device=self.device),
+            }
+        )
+        return inputs, image_sizes
+
+    def _patchify_jpegs(self, encoded: list):
+        """
+        Decode JPEG byte tensors on the GPU and turn them into Qwen2.5-VL patches.
+
+        Returns:
+            (pixel_values of shape [total_patches, patch_dim], list of [t, h, w]
+            grids, original (width, height) of each image)
+        """
+        import torch
+        import torch.nn.functional as F
+        from qwen_vl_utils import smart_resize
+        from torchvision.io import ImageReadMode, decode_jpeg
+
+        image_processor = self.processor.image_processor
+        patch_size = image_processor.patch_size
+        merge_size = image_processor.merge_size
+        temporal_patch_size = image_processor.temporal_patch_size
+        mean = torch.tensor(image_processor.image_mean, device=self.device).view(1, 3, 1, 1)
+        std = torch.tensor(image_processor.image_std, device=self.device).view(1, 3, 1, 1)
+
+        decoded = decode_jpeg(encoded, mode=ImageReadMode.RGB, device=self.device)
+
+        # Same target size as process_vision_info(resized_width/height=...)
+        resized_height, resized_width = smart_resize(
+            GROUNDING_HEIGHT,
+            GROUNDING_WIDTH,
+            factor=patch_size * merge_size,
+            min_pixels=image_processor.min_pixels,
+            max_pixels=image_processor.max_pixels,
+        )
+
+        pixel_values = []
+        image_grid_thw = []
+        image_sizes = []
+        for image in decoded:
+            height, width = image.shape[-2:]
+            self._check_image_size(width, height)
+            image_sizes.append((width, height))
+            pixels = image.unsqueeze(0).float()
+            if (resized_height, resized_width) != (height, width):
+                pixels = F.interpolate(
+                    pixels,
+                    size=(resized_height, resized_width),
+                    mode="bicubic",
+                    align_corners=False,
+                    antialias=True,
+                )
+            pixels = (pixels * image_processor.rescale_factor - mean) / std
+
+            # A single frame is repeated to fill the temporal patch, then split
+            # into merge_size x merge_size groups of patch_size x patch_size patches
+            grid_h = resized_height // patch_size
+            grid_w = resized_width // patch_size
+            patches = pixels.repeat(temporal_patch_size, 1, 1, 1).view(
+                1,
+                temporal_patch_size,
+                3,
+                grid_h // merge_size,
+                merge_size,
+                patch_size,
+                grid_w // merge_size,
+                merge_size,
+                patch_size,
             )
+            patches = patches.permute(0, 3, 6, 4, 7, 2, 1, 5, 8)
+            pixel_values.append(
+                patches.reshape(
+                    grid_h * grid_w, 3 * temporal_patch_size * patch_size * patch_size
+                )
+            )
+            image_grid_thw.append([1, grid_h, grid_w])
+
+        return torch.cat(pixel_values), image_grid_thw, image_sizes
 
-            # Trim the input tokens from the output
-            generated_ids_trimmed = [
-                out_ids[len(in_ids):]
-                for in_ids, out_ids in zip(inputs.input_ids, generated_ids)
+    def _generate(self, image_base64: str, query: str, max_tokens: int = 100) -> str:
+        """Run a single grounding request (used by `generate`)."""
+        return self._generate_batch([image_base64], [query], max_tokens)[0]
+
+    def _generate_batch(
+        self, images_base64: list, queries: list, max_tokens: int = 100
+    ) -> list:
+        """
+        Run several grounding requests through a single batched `generate` call.
+
+        Args:
+            images_base64: Base64-encoded images, one per request
+            queries: Text queries, one per request
+            max_tokens: Maximum tokens to generate (shared by the whole batch)
+
+        Returns:
+            Generated text responses, in the same order as the inputs
+        """
+        import torch
+
+        # Pad the batch with copies of its last request up to a batch bucket;
+        # the extra rows' outputs are dropped below
+        count = len(images_base64)
+        if ENABLE_TORCH_COMPILE:
+            size = next((b for b in BATCH_BUCKETS if b >= count), count)
+            images_base64 = images_base64 + images_base64[-1:] * (size - count)
+            queries = queries + queries[-1:] * (size - count)
+
+        # Run inference using proper Qwen2.5-VL format
+        with torch.no_grad():
+            inputs, borrowed, image_sizes = self._prepare_inputs(
+                images_base64, queries
+            )
+
+            # Generate responses
+            self._vision_keys = [
+                self._vision_key(image_base64) for image_base64 in images_base64
             ]
+            try:
+                generated_ids = self.model.generate(
+                    **inputs,
+                    **self._length_kwargs(inputs["input_ids"].shape[1], max_tokens),
+                    **self._generate_kwargs,
+                )
+            finally:
+                self._vision_keys = None
+                self._release_buffers(borrowed)
+
+            # Every row is left-padded to the same prompt length, so the new
+            # tokens are one slice, copied to the host in a single transfer
+            prompt_length = inputs["input_ids"].shape[1]
+            new_token_ids = generated_ids[:count, prompt_length:].tolist()
 
-            # Decode response
-            response = self.processor.batch_decode(
-                generated_ids_trimmed,
+            # Decode responses
+            responses = self.processor.tokenizer.batch_decode(
+                new_token_ids,
                 skip_special_tokens=True,
                 clean_up_tokenization_spaces=False
-            )[0]
+            )
+
+        return [
+            self._rescale_coordinates(response, image_size)
+            for response, image_size in zip(responses, image_sizes[:count])
+        ]
 
-        return response
-    
     @modal.asgi_app()
     def fastapi_app(self):
         """
@@ -252,24 +1058,134 @@ class UITARSTransformersServer:
         This allows us to have proper /v1/chat/completions path.
         """
         from fastapi import FastAPI, Request, HTTPException
-        from fastapi.responses import JSONResponse
+        from fastapi.responses import JSONResponse, StreamingResponse
+        import asyncio
+        import json
+        import threading
         import time
         
         web_app = FastAPI(title="UI-TARS Grounding Server")
         
-        # Store reference to generate method to avoid Modal Function name conflict
-        generate_fn = self.generate.local
-        
+        # Requests are queued and drained in micro-batches so concurrent callers
+        # share one forward pass instead of serializing on the GPU.
+        # Each item is (future, image_base64, query, max_tokens).
+        request_queue = asyncio.Queue()
+
+        async def run_batch(max_tokens, items):
+            """Run one batch of compatible requests and resolve their futures."""
+            loop = asyncio.get_running_loop()
+            try:
+                responses = await loop.run_in_executor(
+                    self._gpu_executor,
+                    self._generate_batch,
+                    [item[1] for item in items],
+                    [item[2] for item in items],
+                    max_tokens,
+                )
+            except Exception as e:
+                if len(items) > 1:
+                    # Don't fail the whole batch for one bad request (e.g. an
+                    # image that is too small): retry each request on its own
+                    for item in items:
+                        await run_batch(max_tokens, [item])
+                    return
+                for future, *_ in items:
+                    if not future.done():
+                        future.set_exception(e)
+                return
+
+            for (future, *_), response in zip(items, responses):
+                if not future.done():
+                    future.set_result(response)
+
+        async def batch_worker():
+            """Collect up to MAX_BATCH_SIZE requests within BATCH_TIMEOUT and run them."""
+            loop = asyncio.get_running_loop()
+            while True:
+                batch = [await request_queue.get()]
+                deadline = loop.time() + BATCH_TIMEOUT
+                while len(batch) < MAX_BATCH_SIZE:
+                    remaining = deadline - loop.time()
+                    if remaining <= 0:
+                        break
+                    try:
+                        batch.append(
+                            await asyncio.wait_for(request_queue.get(), remaining)
+                        )
+                    except asyncio.TimeoutError:
+                        break
+
+                # Only requests with the same max_tokens can share a generate call
+                groups = {}
+                for item in batch:
+                    groups.setdefault(item[3], []).append(item)
+                for max_tokens, items in groups.items():
+                    await run_batch(max_tokens, items)
+
+        @web_app.on_event("startup")
+        async def start_batch_worker():
+            web_app.state.batch_worker = asyncio.create_task(batch_worker())
+
         @web_app.get("/health")
         async def health():
             """Health check endpoint."""
             return {"status": "ok", "model": "ui-tars-1.5-7b"}
         
+        async def stream_chat_completion(request, image_base64, query, max_tokens):
+            """Stream `chat.completion.chunk` events as Server-Sent Events."""
+            stop_event = threading.Event()
+            chunks = await asyncio.get_running_loop().run_in_executor(
+                None, self._generate_stream, image_base64, query, max_tokens, stop_event
+            )
+            completion_id = f"chatcmpl-uitars-{int(time.time())}"
+            created = int(time.time())
+            end_of_stream = object()
+
+            def sse_event(delta, finish_reason=None):
+                payload = {
+                    "id": completion_id,
+                    "object": "chat.completion.chunk",
+                    "created": created,
+                    "model": "ui-tars-1.5-7b",
+                    "choices": [{
+                        "index": 0,
+                        "delta": delta,
+                        "finish_reason": finish_reason
+                    }]
+                }
+                return f"data: {json.dumps(payload)}\n\n"
+
+            async def event_stream():
+                loop = asyncio.get_running_loop()
+                try:
+                    yield sse_event({"role": "assistant"})
+                    while True:
+                        # The streamer blocks on a queue, so wait for it off the event loop
+                        chunk = await loop.run_in_executor(None, next, chunks, end_of_stream)
+                        if chunk is end_of_stream:
+                            break
+                        if await request.is_disconnected():
+                            return
+                        if chunk:
+                            yield sse_event({"content": chunk})
+                    yield sse_event({}, finish_reason="stop")
+                    yield "data: [DONE]\n\n"
+                finally:
+                    # Client disconnected or stream finished: free the GPU
+                    stop_event.set()
+
+            return StreamingResponse(event_stream(), media_type="text/event-stream")
+
         @web_app.post("/v1/chat/completions")
         async def chat_completions(request: Request):
             """
             OpenAI-compatible chat completions endpoint.
             
+            Images are resized to GROUNDING_WIDTH x GROUNDING_HEIGHT (oversize
+            screenshots are downscaled) and returned coordinates are mapped
+            back to the size of the image sent. Images with a side shorter
+            than MIN_IMAGE_SIZE pixels are rejected with a 400.
+            
             Usage:
                 curl -X POST https://your-workspace--uitars-transformers.modal.run/v1/chat/completions \
                     -H "Content-Type: application/json" \
@@ -279,6 +1195,7 @@ class UITARSTransformersServer:
                 data = await request.json()
                 messages = data.get("messages", [])
                 max_tokens = data.get("max_tokens", 100)
+                stream = data.get("stream", False)
                 
                 # Extract image and text
                 image_base64 = None
@@ -299,9 +1216,16 @@ class UITARSTransformersServer:
                 if not image_base64 or not query:
                     raise HTTPException(status_code=400, detail="Missing image or query")
                 
-                # Generate response using the local method reference
+                # Streaming requests return tokens as they are decoded, so
+                # callers can parse coordinates before generation finishes
+                if stream:
+                    return await stream_chat_completion(request, image_base64, query, max_tokens)
+                
+                # Queue the request for the batch worker and wait for its result
                 start_time = time.time()
-                response_text = generate_fn(image_base64, query, max_tokens)
+                future = asyncio.get_running_loop().create_future()
+                await request_queue.put((future, image_base64, query, max_tokens))
+                response_text = await future
                 inference_time = time.time() - start_time
                 
                 print(f"✅ Inference completed in {inference_time:.2f}s")
@@ -329,6 +1253,8 @@ class UITARSTransformersServer:
                 
             except HTTPException:
                 raise
+            except ValueError as e:
+                raise HTTPException(status_code=400, detail=str(e))
             except Exception as e:
                 print(f"❌ Error: {e}")
                 import traceback
@@ -349,13 +1275,12 @@ def main():
     print("🚀 UI-TARS Modal Deployment Guide")
     print("=" * 60)
     print()
-    print("⚠️  IMPORTANT: vLLM NOT SUPPORTED")
+    print("ℹ️  Two servers are deployed")
     print("────────────────────────────────────────────────────────")
-    print("  vLLM 0.6.6 does NOT support Qwen2.5-VL architecture.")
-    print("  UI-TARS-1.5-7B is based on Qwen2.5-VL (Qwen2_5_VLForConditionalGeneration).")
-    print("  vLLM only supports older Qwen2-VL (Qwen2VLForConditionalGeneration).")
+    print("  serve                     - vLLM (default, continuous batching)")
+    print("  UITARSTransformersServer  - HuggingFace Transformers fallback")
     print()
-    print("  ✅ You MUST use the Transformers endpoint instead.")
+    print("  Both expose an OpenAI-compatible /v1/chat/completions endpoint.")
     print()
     print()
     print("STEP 1: Download Model to Modal Volume (one-time setup)")
@@ -366,12 +1291,13 @@ def main():
     print("  You only need to do this once.")
     print()
     print()
-    print("STEP 2: Deploy the Transformers Server")
+    print("STEP 2: Deploy the Servers")
     print("────────────────────────────────────────────────────────")
     print("  modal deploy deploy_uitars_modal.py")
     print()
-    print("  This deploys the HuggingFace Transformers server.")
-    print("  You'll get a URL like:")
+    print("  This deploys the vLLM server and the Transformers fallback.")
+    print("  You'll get URLs like:")
+    print("  https://your-workspace--uitars-grounding-server-serve.modal.run")
     print("  https://your-workspace--uitars-transformers.modal.run")
     print()
     print()
@@ -402,11 +1328,12 @@ def main():
     print()
     print("  Modal Dashboard:  https://modal.com/apps")
     print("  Modal Docs:       https://modal.com/docs")
+    print("  vLLM:             https://docs.vllm.ai")
     print("  Transformers:     https://huggingface.co/docs/transformers")
     print()
     print("=" * 60)
     print()
-    print("💡 The Transformers server exposes OpenAI-compatible API at:")
+    print("💡 Both servers expose an OpenAI-compatible API at:")
     print("   <your-modal-url>/v1/chat/completions")
     print()
     print("=" * 60)
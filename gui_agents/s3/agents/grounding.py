@@ -20,6 +20,9 @@ logger = logging.getLogger("desktopenv.agent")
 class ACI:
     def __init__(self):
         self.notes: List[str] = []
+        # Structured robotgo actions for the code returned by the last agent action,
+        # or None when that action only exists as code
+        self.last_actions: Optional[List[Dict]] = None
 
 
 # Agent action decorator
@@ -448,6 +451,10 @@ class OSWorldACI(ACI):
         """Set the current task instruction for the code agent."""
         self.current_task_instruction = task_instruction
 
+    def _action(self, action_type: str, **params) -> Dict:
+        """Build one robotgo action dict for this platform."""
+        return {"type": action_type, "params": params, "platform": self.platform}
+
     # Resize from grounding model coordinate space to actual screen coordinate space
     def resize_coordinates(self, coordinates: List[int]) -> List[int]:
         """
@@ -528,9 +535,23 @@ class OSWorldACI(ACI):
             command += f"""import pyautogui; pyautogui.click({x}, {y}, clicks={num_clicks}, button={repr(button_type)}); """
             for k in normalized_hold_keys:
                 command += f"pyautogui.keyUp({repr(k)}); "
+            # OPTIMIZATION: Record the action so robotgo can skip parsing the code back
+            self.last_actions = [self._action(
+                "click", x=x, y=y, clicks=num_clicks, button=button_type,
+                hold_keys=normalized_hold_keys,
+            )]
             # Return pyautoguicode to click on the element
             return command
 
+    def _launcher_actions(self, keys: List[str], text: str) -> List[Dict]:
+        """Open a launcher with keys, type text, press enter, then wait (robotgo form)."""
+        return [
+            self._action("hotkey", keys=keys),
+            self._action("type", text=text),
+            self._action("press", key="enter"),
+            self._action("wait", duration=1.0),
+        ]
+
     @agent_action
     def switch_applications(self, app_code):
         """Switch to a different application that is already open
@@ -538,10 +559,12 @@ class OSWorldACI(ACI):
             app_code:str the code name of the application to switch to from the provided list of open applications
         """
         if self.platform == "darwin":
+            self.last_actions = self._launcher_actions(["command", "space"], app_code)
             return f"import pyautogui; import time; pyautogui.hotkey('command', 'space', interval=0.5); pyautogui.typewrite({repr(app_code)}); pyautogui.press('enter'); time.sleep(1.0)"
         elif self.platform == "linux":
             return UBUNTU_APP_SETUP.replace("APP_NAME", app_code)
         elif self.platform == "windows":
+            self.last_actions = self._launcher_actions(["win", "d"], app_code)
             return f"import pyautogui; import time; pyautogui.hotkey('win', 'd', interval=0.5); pyautogui.typewrite({repr(app_code)}); pyautogui.press('enter'); time.sleep(1.0)"
         else:
             assert (
@@ -554,9 +577,19 @@ class OSWorldACI(ACI):
         Args:
             app_or_filename:str, the name of the application or filename to open
         """
+        if self.platform in ("linux", "windows"):
+            self.last_actions = [
+                self._action("hotkey", keys=["win"]),
+                self._action("wait", duration=0.5),
+                self._action("type", text=app_or_filename),
+                self._action("wait", duration=1.0),
+                self._action("press", key="enter"),
+                self._action("wait", duration=0.5),
+            ]
         if self.platform == "linux":
             return f"import pyautogui; pyautogui.hotkey('win'); time.sleep(0.5); pyautogui.write({repr(app_or_filename)}); time.sleep(1.0); pyautogui.hotkey('enter'); time.sleep(0.5)"
         elif self.platform == "darwin":
+            self.last_actions = self._launcher_actions(["command", "space"], app_or_filename)
             return f"import pyautogui; import time; pyautogui.hotkey('command', 'space', interval=0.5); pyautogui.typewrite({repr(app_or_filename)}); pyautogui.press('enter'); time.sleep(1.0)"
         elif self.platform == "windows":
             return (
@@ -588,6 +621,7 @@ class OSWorldACI(ACI):
         from gui_agents.s3.utils.profiler import profiler
 
         with profiler.profile("Action_Type", metadata={"text_length": len(text)}):
+            actions = []
             command = "import pyautogui; "
             command += (
                 "\ntry:\n"
@@ -604,12 +638,15 @@ class OSWorldACI(ACI):
                     coords1 = self.generate_coords(element_description, self.obs)
                     x, y = self.resize_coordinates(coords1)
                 command += f"pyautogui.click({x}, {y}); "
+                actions.append(self._action("click", x=x, y=y))
 
             if overwrite:
                 command += (
                     f"pyautogui.hotkey({repr('command' if self.platform == 'darwin' else 'ctrl')}, 'a'); "
                     "pyautogui.press('backspace'); "
                 )
+                actions.append(self._action("hotkey", keys=["command" if self.platform == "darwin" else "ctrl", "a"]))
+                actions.append(self._action("press", key="backspace"))
 
             # Check if text contains Unicode characters that pyautogui.write() can't handle
             has_unicode = any(ord(char) > 127 for char in text)
@@ -622,8 +659,14 @@ class OSWorldACI(ACI):
                 # Use regular pyautogui.write() for ASCII text
                 command += f"pyautogui.write({repr(text)}); "
 
+            # robotgo types Unicode directly, so it needs no clipboard detour
+            if text:
+                actions.append(self._action("type", text=text))
+
             if enter:
                 command += "pyautogui.press('enter'); "
+                actions.append(self._action("press", key="enter"))
+            self.last_actions = actions
             return command
 
     @agent_action
@@ -671,6 +714,10 @@ class OSWorldACI(ACI):
             command += f"pyautogui.dragTo({x2}, {y2}, duration=1., button='left'); pyautogui.mouseUp(); "
             for k in normalized_hold_keys:
                 command += f"pyautogui.keyUp({repr(k)}); "
+            self.last_actions = [self._action(
+                "dragTo", x1=x1, y1=y1, x2=x2, y2=y2, button="left",
+                hold_keys=normalized_hold_keys,
+            )]
 
             # Return pyautoguicode to drag and drop the elements
 
@@ -696,6 +743,7 @@ class OSWorldACI(ACI):
         command = "import pyautogui; "
         command += f"pyautogui.moveTo({x1}, {y1}); "
         command += f"pyautogui.dragTo({x2}, {y2}, duration=1., button='{button}'); pyautogui.mouseUp(); "
+        self.last_actions = [self._action("dragTo", x1=x1, y1=y1, x2=x2, y2=y2, button=button)]
 
         # Return pyautoguicode to drag and drop the elements
         return command
@@ -788,6 +836,11 @@ class OSWorldACI(ACI):
         """
         coords1 = self.generate_coords(element_description, self.obs)
         x, y = self.resize_coordinates(coords1)
+        self.last_actions = [
+            self._action("moveTo", x=x, y=y),
+            self._action("wait", duration=0.5),
+            self._action("scroll", x=x, y=y, clicks=int(clicks), horizontal=bool(shift)),
+        ]
 
         if shift:
             return f"import pyautogui; import time; pyautogui.moveTo({x}, {y}); time.sleep(0.5); pyautogui.hscroll({clicks})"
@@ -851,6 +904,7 @@ class OSWorldACI(ACI):
 
         # add quotes around the normalized keys
         quoted_keys = [f"'{key}'" for key in normalized_keys]
+        self.last_actions = [self._action("hotkey", keys=normalized_keys)]
         return f"import pyautogui; pyautogui.hotkey({', '.join(quoted_keys)})"
 
     @agent_action
@@ -871,6 +925,11 @@ class OSWorldACI(ACI):
         command += f"pyautogui.press({press_keys_str}); "
         for k in normalized_hold_keys:
             command += f"pyautogui.keyUp({repr(k)}); "
+        self.last_actions = (
+            [self._action("keyDown", key=k) for k in normalized_hold_keys]
+            + [self._action("press", key=k) for k in normalized_press_keys]
+            + [self._action("keyUp", key=k) for k in normalized_hold_keys]
+        )
 
         return command
 
@@ -880,6 +939,7 @@ class OSWorldACI(ACI):
         Args:
             time:float the amount of time to wait in seconds
         """
+        self.last_actions = [self._action("wait", duration=float(time))]
         return f"""import time; time.sleep({time})"""
 
     @agent_action
@@ -1,3 +1,4 @@
+import contextvars
 from functools import partial
 import logging
 import textwrap
@@ -18,6 +19,7 @@ from gui_agents.s3.utils.common_utils import (
 from gui_agents.s3.utils.formatters import (
     SINGLE_ACTION_FORMATTER,
     CODE_VALID_FORMATTER,
+    second_code_block_closed,
 )
 
 logger = logging.getLogger("desktopenv.agent")
@@ -50,7 +52,8 @@ class Worker(BaseModule):
             reflection_engine_params: Dict (optional)
                 Optional separate parameters for reflection agent (for using faster/cheaper model)
             reflection_frequency: int
-                Reflect every N steps (1=every step, 2=every other step, etc.)
+                Reflect every N steps (1=every step, 2=every other step, etc.).
+                When N > 1 the reflection runs alongside planning and is applied on the next step.
         """
         super().__init__(worker_engine_params, platform)
 
@@ -98,6 +101,8 @@ class Worker(BaseModule):
         self.worker_history = []
         self.reflections = []
         self.cost_this_turn = 0
+        # Reflection produced alongside the previous step's planning (reflection_frequency > 1)
+        self.deferred_reflection = (None, None)
         self.screenshot_inputs = []
 
     def flush_messages(self):
@@ -340,16 +345,31 @@ class Worker(BaseModule):
         reflection_thoughts = None
         context_message = ""
 
+        # OPTIMIZATION: Reflection is already sparse when reflection_frequency > 1, so
+        # don't block planning on it; overlap it with this step's planning + grounding
+        # and hand the result to the next step's generator message instead
+        defer_reflection = self.reflection_frequency > 1
+
         # Use ThreadPoolExecutor to run both tasks in parallel
-        with ThreadPoolExecutor(max_workers=2) as executor:
-            # Start both tasks in parallel
-            # Note: Reflection already has profiling inside _generate_reflection
-            reflection_future = executor.submit(self._generate_reflection, instruction, obs)
-            context_future = executor.submit(self._prepare_context_message)
+        executor = ThreadPoolExecutor(max_workers=2)
+        # Start both tasks in parallel
+        # Note: Reflection already has profiling inside _generate_reflection; each task
+        # runs in a copy of this context so its timings nest under the current step
+        reflection_future = executor.submit(
+            contextvars.copy_context().run, self._generate_reflection, instruction, obs
+        )
+        context_future = executor.submit(
+            contextvars.copy_context().run, self._prepare_context_message
+        )
+        executor.shutdown(wait=False)
 
-            # Wait for both to complete
+        # Wait for both to complete (only context when reflection is deferred)
+        context_message = context_future.result()
+        if defer_reflection:
+            reflection, reflection_thoughts = self.deferred_reflection
+            self.deferred_reflection = (None, None)
+        else:
             reflection, reflection_thoughts = reflection_future.result()
-            context_message = context_future.result()
 
         # Add reflection to message if available
         if reflection:
@@ -381,8 +401,10 @@ class Worker(BaseModule):
                 format_checkers,
                 temperature=self.temperature,
                 use_thinking=self.use_thinking,
+                # A second action block already fails the single-action check, so
+                # stop reading a runaway multi-step plan there
+                stop_when=second_code_block_closed,
             )
-        self.worker_history.append(plan)
         self.generator_agent.add_message(plan, role="assistant")
         logger.info("PLAN:\n %s", plan)
 
@@ -420,6 +442,12 @@ class Worker(BaseModule):
                     1.333
                 )  # Skip a turn if the code cannot be evaluated
 
+        # Collect the deferred reflection before touching state it reads
+        if defer_reflection:
+            next_reflection = reflection_future.result()
+            if next_reflection[0]:
+                self.deferred_reflection = next_reflection
+
         executor_info = {
             "plan": plan,
             "plan_code": plan_code,
@@ -432,7 +460,10 @@ class Worker(BaseModule):
                 and self.grounding_agent.last_code_agent_result is not None
                 else None
             ),
+            # Structured form of exec_code for the robotgo executor, when available
+            "exec_actions": getattr(self.grounding_agent, "last_actions", None),
         }
+        self.worker_history.append(plan)
         self.turn_count += 1
         self.screenshot_inputs.append(obs["screenshot"])
         self.flush_messages()
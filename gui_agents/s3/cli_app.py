@@ -1,56 +1,98 @@
 import argparse
+import atexit
+import concurrent.futures
 import datetime
+import functools
 import io
 import logging
+import logging.handlers
+import mss
 import os
 import platform
 import pyautogui
+import queue
 import signal
+import subprocess
 import sys
+import threading
 import time
 
+from typing import Callable, Tuple
+
 from PIL import Image
 
 from gui_agents.s3.agents.grounding import OSWorldACI
 from gui_agents.s3.agents.agent_s import AgentS3
+from gui_agents.s3.utils.common_utils import compress_image
 from gui_agents.s3.utils.local_env import LocalEnv
+from gui_agents.s3.utils.profiler import profiler
+from gui_agents.s3.utils.robotgo_executor import (
+    execute_robotgo_actions,
+    execute_robotgo_code,
+    get_screen_size,
+)
 
-current_platform = platform.system().lower()
+platform_os = platform.system()
+current_platform = platform_os.lower()
+IS_DARWIN = platform_os == "Darwin"
+IS_LINUX = platform_os == "Linux"
+IS_WINDOWS = platform_os == "Windows"
 
-# Global flag to track pause state for debugging
-paused = False
+# Pause state for debugging: set while running, cleared while paused
+_resume_event = threading.Event()
+_resume_event.set()
 
 
-def get_char():
+def _get_char_posix():
     """Get a single character from stdin without pressing Enter"""
     try:
-        # Import termios and tty on Unix-like systems
-        if platform.system() in ["Darwin", "Linux"]:
-            import termios
-            import tty
+        import termios
+        import tty
+
+        fd = sys.stdin.fileno()
+        old_settings = termios.tcgetattr(fd)
+        try:
+            tty.setraw(sys.stdin.fileno())
+            ch = sys.stdin.read(1)
+        finally:
+            termios.tcsetattr(fd, termios.TCSADRAIN, old_settings)
+        return ch
+    except:
+        return input()  # Fallback for non-terminal environments
 
-            fd = sys.stdin.fileno()
-            old_settings = termios.tcgetattr(fd)
-            try:
-                tty.setraw(sys.stdin.fileno())
-                ch = sys.stdin.read(1)
-            finally:
-                termios.tcsetattr(fd, termios.TCSADRAIN, old_settings)
-            return ch
-        else:
-            # Windows fallback
-            import msvcrt
 
-            return msvcrt.getch().decode("utf-8", errors="ignore")
+def _get_char_windows():
+    """Get a single character from stdin without pressing Enter"""
+    try:
+        import msvcrt
+
+        return msvcrt.getch().decode("utf-8", errors="ignore")
     except:
         return input()  # Fallback for non-terminal environments
 
 
+# Resolve the platform-specific implementation once at import time
+get_char = _get_char_posix if IS_DARWIN or IS_LINUX else _get_char_windows
+
+
+# Keys accepted at the pause prompt (Ctrl+C quits, Esc resumes)
+_KEY_ACTIONS = {3: "quit", 27: "resume"}
+
+# SIGINTs arriving within this window of the previous one are treated as one press
+_SIGINT_DEBOUNCE_S = 0.1
+_last_sigint_ts = 0.0
+
+
 def signal_handler(signum, frame):
     """Handle Ctrl+C signal for debugging during agent execution"""
-    global paused
+    global _last_sigint_ts
+
+    now = time.monotonic()
+    if now - _last_sigint_ts < _SIGINT_DEBOUNCE_S:
+        return
+    _last_sigint_ts = now
 
-    if not paused:
+    if _resume_event.is_set():
         print("\n\n🔸 Agent-S Workflow Paused 🔸")
         print("=" * 50)
         print("Options:")
@@ -58,22 +100,23 @@ def signal_handler(signum, frame):
         print("  • Press Esc to resume workflow")
         print("=" * 50)
 
-        paused = True
+        _resume_event.clear()
 
-        while paused:
+        while not _resume_event.is_set():
             try:
                 print("\n[PAUSED] Waiting for input... ", end="", flush=True)
                 char = get_char()
+                action = _KEY_ACTIONS.get(ord(char[0])) if char else None
 
-                if ord(char) == 3:  # Ctrl+C
+                if action == "quit":
                     print("\n\n🛑 Exiting Agent-S...")
                     sys.exit(0)
-                elif ord(char) == 27:  # Esc
+                elif action == "resume":
                     print("\n\n▶️  Resuming Agent-S workflow...")
-                    paused = False
+                    _resume_event.set()
                     break
                 else:
-                    print(f"\n   Unknown command: '{char}' (ord: {ord(char)})")
+                    print(f"\n   Unknown command: {char!r}")
 
             except KeyboardInterrupt:
                 print("\n\n🛑 Exiting Agent-S...")
@@ -122,40 +165,207 @@ sdebug_handler.setFormatter(formatter)
 stdout_handler.addFilter(logging.Filter("desktopenv"))
 sdebug_handler.addFilter(logging.Filter("desktopenv"))
 
-logger.addHandler(file_handler)
-logger.addHandler(debug_handler)
-logger.addHandler(stdout_handler)
-logger.addHandler(sdebug_handler)
+# OPTIMIZATION: Log calls only enqueue records; file/stdout writes happen on a listener thread
+log_queue = queue.Queue(-1)
+logger.addHandler(logging.handlers.QueueHandler(log_queue))
+log_listener = logging.handlers.QueueListener(
+    log_queue,
+    file_handler,
+    debug_handler,
+    stdout_handler,
+    sdebug_handler,
+    respect_handler_level=True,
+)
+log_listener.start()
+atexit.register(log_listener.stop)
+
+# Per-step status goes through the queued handlers; the "desktopenv" prefix routes it to stdout
+status_logger = logging.getLogger("desktopenv.cli")
 
-platform_os = platform.system()
+
+def _applescript_string(text: str) -> str:
+    """Escape text for use inside a double-quoted AppleScript string literal."""
+    return text.replace("\\", "\\\\").replace('"', '\\"')
 
 
 def show_permission_dialog(code: str, action_description: str):
     """Show a platform-specific permission dialog and return True if approved."""
-    if platform.system() == "Darwin":
-        result = os.system(
-            f'osascript -e \'display dialog "Do you want to execute this action?\n\n{code} which will try to {action_description}" with title "Action Permission" buttons {{"Cancel", "OK"}} default button "OK" cancel button "Cancel"\''
+    # Dialogs are launched with an argv list (no intermediate shell), so quotes in
+    # the code cannot break out of the command
+    if IS_DARWIN:
+        message = _applescript_string(
+            f"Do you want to execute this action?\n\n{code} which will try to {action_description}"
+        )
+        result = subprocess.run(
+            [
+                "osascript",
+                "-e",
+                f'display dialog "{message}" with title "Action Permission" buttons {{"Cancel", "OK"}} default button "OK" cancel button "Cancel"',
+            ],
+            check=False,
         )
-        return result == 0
-    elif platform.system() == "Linux":
-        result = os.system(
-            f'zenity --question --title="Action Permission" --text="Do you want to execute this action?\n\n{code}" --width=400 --height=200'
+        return result.returncode == 0
+    elif IS_LINUX:
+        result = subprocess.run(
+            [
+                "zenity",
+                "--question",
+                "--title=Action Permission",
+                f"--text=Do you want to execute this action?\n\n{code}",
+                "--width=400",
+                "--height=200",
+            ],
+            check=False,
         )
-        return result == 0
+        return result.returncode == 0
     return False
 
 
 def scale_screen_dimensions(width: int, height: int, max_dim_size: int):
+    # Screens that already fit need no float math
+    if width <= max_dim_size and height <= max_dim_size:
+        return width, height
     scale_factor = min(max_dim_size / width, max_dim_size / height, 1)
     safe_width = int(width * scale_factor)
     safe_height = int(height * scale_factor)
     return safe_width, safe_height
 
 
-def run_agent(agent, instruction: str, scaled_width: int, scaled_height: int, use_robotgo: bool = False):
-    from gui_agents.s3.utils.profiler import profiler
+@functools.lru_cache(maxsize=256)
+def compile_action(code: str):
+    """Compile an action snippet once; repeated actions reuse the cached code object."""
+    return compile(code, "<agent>", "exec")
+
+
+# OPTIMIZATION: Persistent worker for screenshot capture, resize and WebP encoding.
+# Pillow and libwebp release the GIL, so this work overlaps the main thread.
+_io_pool = concurrent.futures.ThreadPoolExecutor(max_workers=1)
+
+# Encode buffer reused by every screenshot; only ever touched from _io_pool's thread
+_screenshot_buffer = io.BytesIO()
+
+# Globals for executing grounded pyautogui actions. Generated snippets reference
+# pyautogui.* and time.*; the direct bindings save the attribute lookup for code
+# that calls them bare.
+_EXEC_GLOBALS = {
+    "__builtins__": __builtins__,
+    "pyautogui": pyautogui,
+    "pag": pyautogui,
+    "time": time,
+    "click": pyautogui.click,
+    "write": pyautogui.write,
+    "moveTo": pyautogui.moveTo,
+    "press": pyautogui.press,
+    "hotkey": pyautogui.hotkey,
+}
+
+# Lazily created DXGI Desktop Duplication camera (Windows only)
+_dxcam_camera = None
+
+
+def get_dxcam_camera():
+    """Return a dxcam camera on Windows, or None if unavailable."""
+    global _dxcam_camera
+    if _dxcam_camera is None and IS_WINDOWS:
+        try:
+            import dxcam
+
+            # Frames are grabbed on demand; no background capture thread is started
+            _dxcam_camera = dxcam.create(output_color="RGB")
+        except Exception as e:
+            logger.warning(f"dxcam unavailable, falling back to mss: {e}")
+            _dxcam_camera = False
+    return _dxcam_camera or None
+
+
+def make_capture_fn(
+    scaled_width: int,
+    scaled_height: int,
+    quality: int = 70,
+    grayscale: bool = False,
+):
+    """Build a capture function specialized for one output size and encoding.
+
+    The returned ``capture(sct, monitor, camera)`` grabs the primary screen, resizes
+    and compresses it, and returns ``(bytes, backend)``. Run it on _io_pool.
+    """
+    target_size = (scaled_width, scaled_height)
+    # Last dxcam capture, reused while the screen is unchanged
+    last_dxcam_bytes = None
+
+    def capture(sct, monitor, camera):
+        nonlocal last_dxcam_bytes
+        # Only the encoded bytes leave this function; each full-resolution buffer is
+        # released as soon as the next, smaller stage exists to keep peak memory low
+        frame = camera.grab() if camera else None
+        if frame is None and camera and last_dxcam_bytes is not None:
+            # grab() returns None when nothing changed since the previous grab
+            return last_dxcam_bytes, "dxcam"
+        if frame is not None:
+            # OPTIMIZATION: DXGI Desktop Duplication is ~5x faster than GDI/mss on Windows
+            screenshot = Image.fromarray(frame)
+            del frame
+            backend = "dxcam"
+        else:
+            # OPTIMIZATION: Use mss library instead of pyautogui (3-5x faster)
+            sct_img = sct.grab(monitor)
+            # Convert mss screenshot to PIL Image
+            # OPTIMIZATION: Decode straight from the raw BGRA buffer; .bgra makes a full-frame bytes() copy
+            screenshot = Image.frombytes("RGB", sct_img.size, sct_img.raw, "raw", "BGRX")
+            del sct_img
+            backend = "mss"
+
+        # Rebinding drops the full-resolution frame before encoding
+        screenshot = fit_screenshot(screenshot, target_size, grayscale)
+        screenshot_bytes = compress_image(
+            image=screenshot, quality=quality, method=0, output=_screenshot_buffer
+        )
+        del screenshot
+        if backend == "dxcam":
+            last_dxcam_bytes = screenshot_bytes
+        return screenshot_bytes, backend
+
+    return capture
+
+
+def fit_screenshot(
+    screenshot: Image.Image, target_size: Tuple[int, int], grayscale: bool = False
+) -> Image.Image:
+    """Resize a screenshot to the agent resolution (and optionally drop chroma)."""
+    # OPTIMIZATION: Skip the full-frame resize pass when the capture is already the target size
+    if screenshot.size != target_size:
+        # OPTIMIZATION: Use BICUBIC interpolation instead of LANCZOS (2-3x faster, minimal quality loss)
+        screenshot = screenshot.resize(target_size, Image.BICUBIC)
+
+    # Dropping chroma shrinks the encoded frame further; layout and text survive
+    if grayscale:
+        screenshot = screenshot.convert("L")
+    return screenshot
+
+
+def encode_screenshot(
+    screenshot: Image.Image,
+    scaled_width: int,
+    scaled_height: int,
+    quality: int = 70,
+    grayscale: bool = False,
+) -> bytes:
+    """Resize a screenshot to the agent resolution and compress it. Run on _io_pool."""
+    screenshot = fit_screenshot(screenshot, (scaled_width, scaled_height), grayscale)
+
+    # Compress screenshot using WebP format for faster LLM processing
+    # OPTIMIZATION: libwebp method=0 is the fastest encoder mode; reuse one encode buffer
+    return compress_image(
+        image=screenshot, quality=quality, method=0, output=_screenshot_buffer
+    )
+
 
-    global paused
+def run_agent(
+    agent,
+    instruction: str,
+    capture: Callable,
+    use_robotgo: bool = False,
+):
     obs = {}
     traj = "Task:\n" + instruction
     subtask_traj = ""
@@ -163,96 +373,136 @@ def run_agent(agent, instruction: str, scaled_width: int, scaled_height: int, us
     # Reset profiler for new task
     profiler.reset()
 
-    for step in range(15):
-        with profiler.profile(f"Step_{step+1}"):
-            # Check if we're in paused state and wait
-            while paused:
-                time.sleep(0.1)
-
-            # Get screen shot using mss (faster than pyautogui)
-            with profiler.profile("Screenshot_Capture"):
-                # OPTIMIZATION: Use mss library instead of pyautogui (3-5x faster)
-                import mss
-                with mss.mss() as sct:
-                    # Capture the first monitor (primary screen)
-                    monitor = sct.monitors[1]
-                    sct_img = sct.grab(monitor)
-                    # Convert mss screenshot to PIL Image
-                    screenshot = Image.frombytes("RGB", sct_img.size, sct_img.bgra, "raw", "BGRX")
-
-                # OPTIMIZATION: Use BICUBIC interpolation instead of LANCZOS (2-3x faster, minimal quality loss)
-                screenshot = screenshot.resize((scaled_width, scaled_height), Image.BICUBIC)
-
-                # Compress screenshot using WebP format for faster LLM processing
-                from gui_agents.s3.utils.common_utils import compress_image
-                screenshot_bytes = compress_image(image=screenshot)
-
-                # Convert to base64 string.
-                obs["screenshot"] = screenshot_bytes
-
-            # Check again for pause state before prediction
-            while paused:
-                time.sleep(0.1)
-
-            print(f"\n🔄 Step {step + 1}/15: Getting next action from agent...")
-
-            # Get next action code from the agent
-            with profiler.profile("Agent_Prediction"):
-                info, code = agent.predict(instruction=instruction, observation=obs)
-
-            if "done" in code[0].lower() or "fail" in code[0].lower():
-                # Log completion for debugging
-                logger.info(
-                    f"Agent completed task on step {step + 1}. Code: {code[0]}"
-                )
-
-                if platform.system() == "Darwin":
-                    os.system(
-                        'osascript -e \'display dialog "Task Completed" with title "OpenACI Agent" buttons "OK" default button "OK"\''
-                    )
-                elif platform.system() == "Linux":
-                    os.system(
-                        'zenity --info --title="OpenACI Agent" --text="Task Completed" --width=200 --height=100'
-                    )
+    # OPTIMIZATION: Capture on the background I/O thread so the next screenshot
+    # can be taken while the main thread finishes the current step.
+    # Open the mss grabber once per task, on the thread that will use it
+    sct = _io_pool.submit(mss.mss).result()
+    # Capture the first monitor (primary screen)
+    monitor = sct.monitors[1]
+    camera = get_dxcam_camera()
+    pending_capture = None
 
-                break
-
-            if "next" in code[0].lower():
-                continue
-
-            if "wait" in code[0].lower():
-                print("⏳ Agent requested wait...")
-                time.sleep(5)
-                continue
-
-            else:
-                time.sleep(1.0)
-                print("EXECUTING CODE:", code[0])
-
-                # Check for pause state before execution
-                while paused:
-                    time.sleep(0.1)
-
-                # Execute code using robotgo or pyautogui
-                with profiler.profile("Code_Execution"):
-                    if use_robotgo:
-                        from gui_agents.s3.utils.robotgo_executor import execute_robotgo_code
-                        success = execute_robotgo_code(code[0])
-                        if not success:
-                            logger.error("Failed to execute robotgo code")
-                    else:
-                        exec(code[0])
-                time.sleep(1.0)
-
-                # Update task and subtask trajectories
-                if "reflection" in info and "executor_plan" in info:
-                    traj += (
-                        "\n\nReflection:\n"
-                        + str(info["reflection"])
-                        + "\n\n----------------------\n\nPlan:\n"
-                        + info["executor_plan"]
+    def prefetch_screenshot():
+        return _io_pool.submit(capture, sct, monitor, camera)
+
+    try:
+        for step in range(15):
+            with profiler.profile(f"Step_{step+1}"):
+                # Check if we're in paused state and wait
+                if not _resume_event.is_set():
+                    _resume_event.wait()
+                    # The screen may have changed while paused; drop the prefetched frame.
+                    # Let it finish first so at most one frame is ever in flight.
+                    if pending_capture is not None and not pending_capture.cancel():
+                        concurrent.futures.wait([pending_capture])
+                    pending_capture = None
+
+                # Get screen shot using dxcam on Windows, mss elsewhere (faster than pyautogui)
+                if pending_capture is None:
+                    pending_capture = prefetch_screenshot()
+
+                # Check again for pause state before prediction
+                _resume_event.wait()
+
+                status_logger.info(f"🔄 Step {step + 1}/15: Getting next action from agent...")
+
+                # Collect the frame as late as possible so encoding overlaps the work above
+                with profiler.profile("Screenshot_Capture") as capture_key:
+                    screenshot_bytes, backend = pending_capture.result()
+                    pending_capture = None
+                    profiler.add_metadata(capture_key, {"backend": backend})
+
+                    # Convert to base64 string.
+                    obs["screenshot"] = screenshot_bytes
+
+                # Get next action code from the agent
+                with profiler.profile("Agent_Prediction"):
+                    info, code = agent.predict(instruction=instruction, observation=obs)
+
+                # Lowercase the action once and reuse it for every keyword check
+                action = code[0].lower()
+
+                if "done" in action or "fail" in action:
+                    # Log completion for debugging
+                    logger.info(
+                        f"Agent completed task on step {step + 1}. Code: {code[0]}"
                     )
 
+                    if IS_DARWIN:
+                        subprocess.run(
+                            [
+                                "osascript",
+                                "-e",
+                                'display dialog "Task Completed" with title "OpenACI Agent" buttons "OK" default button "OK"',
+                            ],
+                            check=False,
+                        )
+                    elif IS_LINUX:
+                        subprocess.run(
+                            [
+                                "zenity",
+                                "--info",
+                                "--title=OpenACI Agent",
+                                "--text=Task Completed",
+                                "--width=200",
+                                "--height=100",
+                            ],
+                            check=False,
+                        )
+
+                    break
+
+                if "next" in action:
+                    continue
+
+                if "wait" in action:
+                    status_logger.info("⏳ Agent requested wait...")
+                    time.sleep(5)
+                    pending_capture = prefetch_screenshot()
+                    continue
+
+                else:
+                    time.sleep(1.0)
+                    status_logger.info(f"EXECUTING CODE: {code[0]}")
+
+                    # Check for pause state before execution
+                    _resume_event.wait()
+
+                    # Execute code using robotgo or pyautogui
+                    with profiler.profile("Code_Execution"):
+                        if use_robotgo:
+                            # OPTIMIZATION: Run the grounding agent's structured actions
+                            # directly; only parse the code when it has none
+                            exec_actions = info.get("exec_actions")
+                            if exec_actions is not None:
+                                success = execute_robotgo_actions(exec_actions)
+                            else:
+                                success = execute_robotgo_code(code[0])
+                            if not success:
+                                logger.error("Failed to execute robotgo code")
+                        else:
+                            # OPTIMIZATION: Reuse compiled code objects and skip the caller's frame globals
+                            # (shallow copy so names defined by one action don't leak into the next)
+                            exec(compile_action(code[0]), dict(_EXEC_GLOBALS))
+                    time.sleep(1.0)
+
+                    # OPTIMIZATION: Start capturing the next observation while the
+                    # trajectory is updated and the next step is set up
+                    pending_capture = prefetch_screenshot()
+
+                    # Update task and subtask trajectories
+                    if "reflection" in info and "executor_plan" in info:
+                        traj += (
+                            "\n\nReflection:\n"
+                            + str(info["reflection"])
+                            + "\n\n----------------------\n\nPlan:\n"
+                            + info["executor_plan"]
+                        )
+    finally:
+        if pending_capture is not None:
+            pending_capture.cancel()
+        _io_pool.submit(sct.close).result()
+
     # Display grounding cache statistics
     if hasattr(agent, "executor") and hasattr(agent.executor, "grounding_agent"):
         grounding_agent = agent.executor.grounding_agent
@@ -379,6 +629,26 @@ def main():
         help="Use Go robotgo executor instead of Python pyautogui (requires robotgo_executor binary)",
     )
 
+    # Screenshot pipeline config
+    parser.add_argument(
+        "--screenshot_quality",
+        type=int,
+        default=70,
+        help="WebP quality (1-100) of screenshots sent to the models. Lower = smaller uploads.",
+    )
+    parser.add_argument(
+        "--screenshot_max_dim",
+        type=int,
+        default=2400,
+        help="Maximum width/height of screenshots sent to the models; larger screens are scaled down.",
+    )
+    parser.add_argument(
+        "--screenshot_grayscale",
+        action="store_true",
+        default=False,
+        help="Send grayscale screenshots to further reduce upload size.",
+    )
+
     # Reflection model config (optional - defaults to main model if not specified)
     parser.add_argument(
         "--reflection_provider",
@@ -407,14 +677,13 @@ def main():
 
     args = parser.parse_args()
 
-    # Re-scales screenshot size to ensure it fits in UI-TARS context limit
+    # Re-scales screenshot size to ensure it fits in UI-TARS context limit (and to cut upload size)
     if args.use_robotgo:
-        from gui_agents.s3.utils.robotgo_executor import get_screen_size
         screen_width, screen_height = get_screen_size()
     else:
         screen_width, screen_height = pyautogui.size()
     scaled_width, scaled_height = scale_screen_dimensions(
-        screen_width, screen_height, max_dim_size=2400
+        screen_width, screen_height, max_dim_size=args.screenshot_max_dim
     )
 
     # Load the general engine params
@@ -477,15 +746,16 @@ def main():
     print("📡 Testing grounding model connectivity...")
     try:
         # Take a test screenshot for validation
-        if args.use_robotgo:
-            # Still use pyautogui for screenshots (or could use mss)
-            test_screenshot = pyautogui.screenshot()
-        else:
-            test_screenshot = pyautogui.screenshot()
-        test_screenshot = test_screenshot.resize((scaled_width, scaled_height), Image.LANCZOS)
-        buffered = io.BytesIO()
-        test_screenshot.save(buffered, format="PNG")
-        test_screenshot_bytes = buffered.getvalue()
+        test_screenshot = pyautogui.screenshot()
+        # OPTIMIZATION: Reuse the run loop's BICUBIC + fast WebP path instead of LANCZOS + PNG
+        test_screenshot_bytes = _io_pool.submit(
+            encode_screenshot,
+            test_screenshot,
+            scaled_width,
+            scaled_height,
+            args.screenshot_quality,
+            args.screenshot_grayscale,
+        ).result()
 
         # Validate the grounding model
         grounding_agent.validate_grounding_model(test_screenshot_bytes)
@@ -495,6 +765,14 @@ def main():
         print(f"\n{str(e)}\n")
         sys.exit(1)
 
+    # Specialize the per-step capture pipeline for this screen and encoding
+    capture = make_capture_fn(
+        scaled_width,
+        scaled_height,
+        quality=args.screenshot_quality,
+        grayscale=args.screenshot_grayscale,
+    )
+
     agent = AgentS3(
         engine_params,
         grounding_agent,
@@ -511,7 +789,7 @@ def main():
         agent.reset()
 
         # Run the agent on your own device
-        run_agent(agent, query, scaled_width, scaled_height)
+        run_agent(agent, query, capture, use_robotgo=args.use_robotgo)
 
         response = input("Would you like to provide another query? (y/n): ")
         if response.lower() != "y":
@@ -1,19 +1,129 @@
+import asyncio
+import atexit
+import importlib
 import os
+import threading
 
-import backoff
-from anthropic import Anthropic
-from openai import (
-    AzureOpenAI,
-    APIConnectionError,
-    APIError,
-    AzureOpenAI,
-    OpenAI,
-    RateLimitError,
-)
+from gui_agents.s3.utils import llm_cache
+from gui_agents.s3.utils.rate_limiter import DualBucket, estimate_tokens
+from gui_agents.s3.utils.retry import retry_llm
+
+
+# SDK clients shared across engines with identical settings, so they reuse one
+# HTTP connection pool instead of each building (and handshaking) their own
+_CLIENT_CACHE = {}
+_CLIENT_CACHE_LOCK = threading.Lock()
+
+# One keep-alive pool for every sync SDK client, whichever provider or key it uses
+_SHARED_HTTP = None
+
+
+def sdk_class(module_name, class_name):
+    """Import a provider SDK class on first use.
+
+    A run only talks to one or two providers, so the SDKs (and their httpx/pydantic
+    dependency trees) are not imported at module load.
+    """
+    return getattr(importlib.import_module(module_name), class_name)
+
+
+def get_shared_client(client_cls, **client_kwargs):
+    """Return a cached ``client_cls(**client_kwargs)``, creating it on first use.
+
+    The client is built on the process-wide HTTP pool, so this is only meant for
+    synchronous SDK clients.
+    """
+    global _SHARED_HTTP
+    key = (client_cls.__name__, tuple(sorted(client_kwargs.items())))
+    with _CLIENT_CACHE_LOCK:
+        client = _CLIENT_CACHE.get(key)
+        if client is None:
+            if _SHARED_HTTP is None:
+                import httpx
+
+                _SHARED_HTTP = httpx.Client(
+                    limits=httpx.Limits(max_connections=100, max_keepalive_connections=20),
+                    # Keep the SDKs' 600s read timeout for long (e.g. thinking) completions;
+                    # only an unreachable host fails fast
+                    timeout=httpx.Timeout(600.0, connect=5.0),
+                )
+                atexit.register(_SHARED_HTTP.close)
+            client = _CLIENT_CACHE[key] = client_cls(
+                http_client=_SHARED_HTTP, **client_kwargs
+            )
+    return client
 
 
 class LMMEngine:
-    pass
+    async_client = None
+    _async_client_loop = None
+    limiter = None
+
+    def throttle(self, messages, max_new_tokens=None):
+        """Wait for RPM/TPM budget (if this engine is rate limited) before a request."""
+        if self.limiter is not None:
+            self.limiter.acquire(estimate_tokens(messages, max_new_tokens))
+
+    async def athrottle(self, messages, max_new_tokens=None):
+        """Async counterpart of ``throttle``."""
+        if self.limiter is not None:
+            await self.limiter.aacquire(estimate_tokens(messages, max_new_tokens))
+
+    def get_async_client(self, factory):
+        """Return this engine's async SDK client for the running event loop.
+
+        Async HTTP connections are bound to the loop that opened them, so the client
+        is rebuilt whenever it is used from a different loop.
+        """
+        loop = asyncio.get_running_loop()
+        if self.async_client is None or self._async_client_loop is not loop:
+            self.async_client = factory()
+            self._async_client_loop = loop
+        return self.async_client
+
+
+async def run_batch(engine, list_of_messages, max_concurrency=32, **kwargs):
+    """Run ``engine.agenerate`` over many independent prompts concurrently.
+
+    Args:
+        engine: An engine implementing ``agenerate`` (OpenAI or Anthropic)
+        list_of_messages: One message list per request
+        max_concurrency: Maximum number of requests in flight at once
+        **kwargs: Forwarded to every ``agenerate`` call
+
+    Returns:
+        Responses in the same order as ``list_of_messages``
+    """
+    semaphore = asyncio.Semaphore(max_concurrency)
+
+    async def bounded(messages):
+        async with semaphore:
+            return await engine.agenerate(messages, **kwargs)
+
+    return await asyncio.gather(*(bounded(messages) for messages in list_of_messages))
+
+
+def accumulate_until(stream, predicate):
+    """Join streamed text chunks, stopping the stream as soon as predicate(text) holds.
+
+    Args:
+        stream: Generator of text deltas (e.g. an engine's ``generate_stream``)
+        predicate: Called on the accumulated text whenever a chunk may complete a
+            code fence
+
+    Returns:
+        The accumulated response text
+    """
+    parts = []
+    try:
+        for chunk in stream:
+            parts.append(chunk)
+            # Only re-check when a fence could have just closed
+            if "`" in chunk and predicate("".join(parts)):
+                break
+    finally:
+        stream.close()
+    return "".join(parts)
 
 
 class LMMEngineOpenAI(LMMEngine):
@@ -23,6 +133,7 @@ class LMMEngineOpenAI(LMMEngine):
         api_key=None,
         model=None,
         rate_limit=-1,
+        tpm_limit=None,
         temperature=None,
         organization=None,
         **kwargs,
@@ -32,14 +143,11 @@ class LMMEngineOpenAI(LMMEngine):
         self.base_url = base_url
         self.api_key = api_key
         self.organization = organization
-        self.request_interval = 0 if rate_limit == -1 else 60.0 / rate_limit
+        self.limiter = DualBucket.from_limits(rate_limit, tpm_limit)
         self.llm_client = None
         self.temperature = temperature  # Can force temperature to be the same (in the case of o3 requiring temperature to be 1)
 
-    @backoff.on_exception(
-        backoff.expo, (APIConnectionError, APIError, RateLimitError), max_time=60
-    )
-    def generate(self, messages, temperature=0.0, max_new_tokens=None, **kwargs):
+    def _client_kwargs(self):
         api_key = self.api_key if self.api_key else os.getenv("OPENAI_API_KEY")
 
         # Modal endpoints use OpenAI-compatible API but may not require auth
@@ -60,27 +168,120 @@ class LMMEngineOpenAI(LMMEngine):
             api_key = "modal-no-auth-required"
 
         organization = self.organization or os.getenv("OPENAI_ORG_ID")
+        return dict(base_url=self.base_url, api_key=api_key, organization=organization)
+
+    @retry_llm
+    def generate(self, messages, temperature=0.0, max_new_tokens=None, **kwargs):
         if not self.llm_client:
-            if not self.base_url:
-                self.llm_client = OpenAI(api_key=api_key, organization=organization)
-            else:
-                self.llm_client = OpenAI(
-                    base_url=self.base_url, api_key=api_key, organization=organization
-                )
-        return (
-            self.llm_client.chat.completions.create(
+            self.llm_client = get_shared_client(
+                sdk_class("openai", "OpenAI"), **self._client_kwargs()
+            )
+        temp = temperature if self.temperature is None else self.temperature
+        self.throttle(messages, max_new_tokens)
+        # Deterministic requests are answered from the response cache when possible
+        return llm_cache.memoize_deterministic(
+            temp,
+            (self.base_url, self.model, messages, max_new_tokens, kwargs),
+            lambda: self.llm_client.chat.completions.create(
                 model=self.model,
                 messages=messages,
                 # max_completion_tokens=max_new_tokens if max_new_tokens else 4096,
-                temperature=(
-                    temperature if self.temperature is None else self.temperature
-                ),
+                temperature=temp,
                 **kwargs,
             )
             .choices[0]
-            .message.content
+            .message.content,
         )
 
+    @retry_llm
+    async def agenerate(self, messages, temperature=0.0, max_new_tokens=None, **kwargs):
+        """Async variant of ``generate`` for concurrent fan-out (see ``run_batch``)."""
+        client_kwargs = self._client_kwargs()
+        client = self.get_async_client(
+            lambda: sdk_class("openai", "AsyncOpenAI")(**client_kwargs)
+        )
+        temp = temperature if self.temperature is None else self.temperature
+
+        async def request():
+            completion = await client.chat.completions.create(
+                model=self.model,
+                messages=messages,
+                temperature=temp,
+                **kwargs,
+            )
+            return completion.choices[0].message.content
+
+        await self.athrottle(messages, max_new_tokens)
+        return await llm_cache.amemoize_deterministic(
+            temp, (self.base_url, self.model, messages, max_new_tokens, kwargs), request
+        )
+
+    @retry_llm
+    def generate_until(
+        self, messages, stop_when, temperature=0.0, max_new_tokens=None, **kwargs
+    ):
+        """Streamed ``generate`` that stops reading once stop_when(text_so_far) holds.
+
+        Retried and cached like ``generate``; a failure mid-stream restarts the request.
+        """
+        temp = temperature if self.temperature is None else self.temperature
+        return llm_cache.memoize_deterministic(
+            temp,
+            (
+                self.base_url,
+                self.model,
+                messages,
+                max_new_tokens,
+                kwargs,
+                stop_when.__qualname__,
+            ),
+            lambda: accumulate_until(
+                self.generate_stream(messages, temperature, max_new_tokens, **kwargs),
+                stop_when,
+            ),
+        )
+
+    def generate_stream(self, messages, temperature=0.0, max_new_tokens=None, **kwargs):
+        """Stream the response as text deltas instead of waiting for the full message.
+
+        Closing the generator early (e.g. once enough text has arrived) closes the
+        underlying HTTP stream, so the rest of the completion is not downloaded.
+        """
+        if not self.llm_client:
+            self.llm_client = get_shared_client(
+                sdk_class("openai", "OpenAI"), **self._client_kwargs()
+            )
+        temp = temperature if self.temperature is None else self.temperature
+        self.throttle(messages, max_new_tokens)
+        stream = self.llm_client.chat.completions.create(
+            model=self.model,
+            messages=messages,
+            temperature=temp,
+            stream=True,
+            **kwargs,
+        )
+        try:
+            for chunk in stream:
+                if chunk.choices and chunk.choices[0].delta.content:
+                    yield chunk.choices[0].delta.content
+        finally:
+            stream.close()
+
+
+def cached_system_prompt(messages):
+    """Anthropic ``system`` blocks for the leading system message, marked for prompt caching.
+
+    The system prompt is identical across steps, so caching it lets Anthropic skip
+    re-processing that prefix on every call.
+    """
+    return [
+        {
+            "type": "text",
+            "text": messages[0]["content"][0]["text"],
+            "cache_control": {"type": "ephemeral"},
+        }
+    ]
+
 
 class LMMEngineAnthropic(LMMEngine):
     def __init__(
@@ -89,6 +290,9 @@ class LMMEngineAnthropic(LMMEngine):
         api_key=None,
         model=None,
         thinking=False,
+        rate_limit=-1,
+        tpm_limit=None,
+        default_max_tokens=4096,
         temperature=None,
         **kwargs,
     ):
@@ -96,48 +300,147 @@ class LMMEngineAnthropic(LMMEngine):
         self.model = model
         self.thinking = thinking
         self.api_key = api_key
+        self.limiter = DualBucket.from_limits(rate_limit, tpm_limit)
+        self.default_max_tokens = default_max_tokens
         self.llm_client = None
         self.temperature = temperature
 
-    @backoff.on_exception(
-        backoff.expo, (APIConnectionError, APIError, RateLimitError), max_time=60
-    )
+    @retry_llm
     def generate(self, messages, temperature=0.0, max_new_tokens=None, **kwargs):
         api_key = self.api_key or os.getenv("ANTHROPIC_API_KEY")
         if api_key is None:
             raise ValueError(
                 "An API Key needs to be provided in either the api_key parameter or as an environment variable named ANTHROPIC_API_KEY"
             )
-        self.llm_client = Anthropic(api_key=api_key)
+        if not self.llm_client:
+            self.llm_client = get_shared_client(
+                sdk_class("anthropic", "Anthropic"), api_key=api_key
+            )
         # Use the instance temperature if not specified in the call
         temp = self.temperature if temperature is None else temperature
         if self.thinking:
+            self.throttle(messages, 8192)
             full_response = self.llm_client.messages.create(
-                system=messages[0]["content"][0]["text"],
+                system=cached_system_prompt(messages),
                 model=self.model,
                 messages=messages[1:],
                 max_tokens=8192,
                 thinking={"type": "enabled", "budget_tokens": 4096},
                 **kwargs,
             )
-            thoughts = full_response.content[0].thinking
             return full_response.content[1].text
-        return (
-            self.llm_client.messages.create(
-                system=messages[0]["content"][0]["text"],
+        self.throttle(messages, max_new_tokens or self.default_max_tokens)
+        # Deterministic requests are answered from the response cache when possible
+        return llm_cache.memoize_deterministic(
+            temp,
+            (self.model, messages, max_new_tokens, kwargs),
+            lambda: self.llm_client.messages.create(
+                system=cached_system_prompt(messages),
                 model=self.model,
                 messages=messages[1:],
-                max_tokens=max_new_tokens if max_new_tokens else 4096,
+                max_tokens=max_new_tokens or self.default_max_tokens,
                 temperature=temp,
                 **kwargs,
             )
             .content[0]
-            .text
+            .text,
+        )
+
+    @retry_llm
+    async def agenerate(self, messages, temperature=0.0, max_new_tokens=None, **kwargs):
+        """Async variant of ``generate`` for concurrent fan-out (see ``run_batch``)."""
+        api_key = self.api_key or os.getenv("ANTHROPIC_API_KEY")
+        if api_key is None:
+            raise ValueError(
+                "An API Key needs to be provided in either the api_key parameter or as an environment variable named ANTHROPIC_API_KEY"
+            )
+        client = self.get_async_client(
+            lambda: sdk_class("anthropic", "AsyncAnthropic")(api_key=api_key)
+        )
+        temp = self.temperature if temperature is None else temperature
+        if self.thinking:
+            await self.athrottle(messages, 8192)
+            full_response = await client.messages.create(
+                system=cached_system_prompt(messages),
+                model=self.model,
+                messages=messages[1:],
+                max_tokens=8192,
+                thinking={"type": "enabled", "budget_tokens": 4096},
+                **kwargs,
+            )
+            return full_response.content[1].text
+
+        async def request():
+            response = await client.messages.create(
+                system=cached_system_prompt(messages),
+                model=self.model,
+                messages=messages[1:],
+                max_tokens=max_new_tokens or self.default_max_tokens,
+                temperature=temp,
+                **kwargs,
+            )
+            return response.content[0].text
+
+        await self.athrottle(messages, max_new_tokens or self.default_max_tokens)
+        return await llm_cache.amemoize_deterministic(
+            temp, (self.model, messages, max_new_tokens, kwargs), request
+        )
+
+    @retry_llm
+    def generate_until(
+        self, messages, stop_when, temperature=0.0, max_new_tokens=None, **kwargs
+    ):
+        """Streamed ``generate`` that stops reading once stop_when(text_so_far) holds.
+
+        Retried and cached like ``generate``; a failure mid-stream restarts the request.
+        """
+        temp = self.temperature if temperature is None else temperature
+        return llm_cache.memoize_deterministic(
+            temp,
+            (
+                self.model,
+                messages,
+                max_new_tokens,
+                kwargs,
+                stop_when.__qualname__,
+            ),
+            lambda: accumulate_until(
+                self.generate_stream(messages, temperature, max_new_tokens, **kwargs),
+                stop_when,
+            ),
         )
 
-    @backoff.on_exception(
-        backoff.expo, (APIConnectionError, APIError, RateLimitError), max_time=60
-    )
+    def generate_stream(self, messages, temperature=0.0, max_new_tokens=None, **kwargs):
+        """Stream the response as text deltas.
+
+        Closing the generator early closes the underlying HTTP stream. Thinking mode
+        is not streamed; its answer is yielded as a single chunk.
+        """
+        if self.thinking:
+            yield self.generate(messages, temperature, max_new_tokens, **kwargs)
+            return
+        api_key = self.api_key or os.getenv("ANTHROPIC_API_KEY")
+        if api_key is None:
+            raise ValueError(
+                "An API Key needs to be provided in either the api_key parameter or as an environment variable named ANTHROPIC_API_KEY"
+            )
+        if not self.llm_client:
+            self.llm_client = get_shared_client(
+                sdk_class("anthropic", "Anthropic"), api_key=api_key
+            )
+        temp = self.temperature if temperature is None else temperature
+        self.throttle(messages, max_new_tokens or self.default_max_tokens)
+        with self.llm_client.messages.stream(
+            system=cached_system_prompt(messages),
+            model=self.model,
+            messages=messages[1:],
+            max_tokens=max_new_tokens or self.default_max_tokens,
+            temperature=temp,
+            **kwargs,
+        ) as stream:
+            yield from stream.text_stream
+
+    @retry_llm
     # Compatible with Claude-3.7 Sonnet thinking mode
     def generate_with_thinking(
         self, messages, temperature=0.0, max_new_tokens=None, **kwargs
@@ -148,9 +451,13 @@ class LMMEngineAnthropic(LMMEngine):
             raise ValueError(
                 "An API Key needs to be provided in either the api_key parameter or as an environment variable named ANTHROPIC_API_KEY"
             )
-        self.llm_client = Anthropic(api_key=api_key)
+        if not self.llm_client:
+            self.llm_client = get_shared_client(
+                sdk_class("anthropic", "Anthropic"), api_key=api_key
+            )
+        self.throttle(messages, 8192)
         full_response = self.llm_client.messages.create(
-            system=messages[0]["content"][0]["text"],
+            system=cached_system_prompt(messages),
             model=self.model,
             messages=messages[1:],
             max_tokens=8192,
@@ -173,6 +480,8 @@ class LMMEngineGemini(LMMEngine):
         api_key=None,
         model=None,
         rate_limit=-1,
+        tpm_limit=None,
+        default_max_tokens=4096,
         temperature=None,
         **kwargs,
     ):
@@ -180,13 +489,12 @@ class LMMEngineGemini(LMMEngine):
         self.model = model
         self.base_url = base_url
         self.api_key = api_key
-        self.request_interval = 0 if rate_limit == -1 else 60.0 / rate_limit
+        self.limiter = DualBucket.from_limits(rate_limit, tpm_limit)
+        self.default_max_tokens = default_max_tokens
         self.llm_client = None
         self.temperature = temperature
 
-    @backoff.on_exception(
-        backoff.expo, (APIConnectionError, APIError, RateLimitError), max_time=60
-    )
+    @retry_llm
     def generate(self, messages, temperature=0.0, max_new_tokens=None, **kwargs):
         api_key = self.api_key or os.getenv("GEMINI_API_KEY")
         if api_key is None:
@@ -199,19 +507,25 @@ class LMMEngineGemini(LMMEngine):
                 "An endpoint URL needs to be provided in either the endpoint_url parameter or as an environment variable named GEMINI_ENDPOINT_URL"
             )
         if not self.llm_client:
-            self.llm_client = OpenAI(base_url=base_url, api_key=api_key)
+            self.llm_client = get_shared_client(
+                sdk_class("openai", "OpenAI"), base_url=base_url, api_key=api_key
+            )
         # Use the temperature passed to generate, otherwise use the instance's temperature, otherwise default to 0.0
         temp = self.temperature if temperature is None else temperature
-        return (
-            self.llm_client.chat.completions.create(
+        self.throttle(messages, max_new_tokens or self.default_max_tokens)
+        # Deterministic requests are answered from the response cache when possible
+        return llm_cache.memoize_deterministic(
+            temp,
+            (base_url, self.model, messages, max_new_tokens, kwargs),
+            lambda: self.llm_client.chat.completions.create(
                 model=self.model,
                 messages=messages,
-                max_tokens=max_new_tokens if max_new_tokens else 4096,
+                max_tokens=max_new_tokens or self.default_max_tokens,
                 temperature=temp,
                 **kwargs,
             )
             .choices[0]
-            .message.content
+            .message.content,
         )
 
 
@@ -222,6 +536,8 @@ class LMMEngineOpenRouter(LMMEngine):
         api_key=None,
         model=None,
         rate_limit=-1,
+        tpm_limit=None,
+        default_max_tokens=4096,
         temperature=None,
         **kwargs,
     ):
@@ -229,13 +545,12 @@ class LMMEngineOpenRouter(LMMEngine):
         self.model = model
         self.base_url = base_url
         self.api_key = api_key
-        self.request_interval = 0 if rate_limit == -1 else 60.0 / rate_limit
+        self.limiter = DualBucket.from_limits(rate_limit, tpm_limit)
+        self.default_max_tokens = default_max_tokens
         self.llm_client = None
         self.temperature = temperature
 
-    @backoff.on_exception(
-        backoff.expo, (APIConnectionError, APIError, RateLimitError), max_time=60
-    )
+    @retry_llm
     def generate(self, messages, temperature=0.0, max_new_tokens=None, **kwargs):
         api_key = self.api_key or os.getenv("OPENROUTER_API_KEY")
         if api_key is None:
@@ -248,19 +563,25 @@ class LMMEngineOpenRouter(LMMEngine):
                 "An endpoint URL needs to be provided in either the endpoint_url parameter or as an environment variable named OPEN_ROUTER_ENDPOINT_URL"
             )
         if not self.llm_client:
-            self.llm_client = OpenAI(base_url=base_url, api_key=api_key)
+            self.llm_client = get_shared_client(
+                sdk_class("openai", "OpenAI"), base_url=base_url, api_key=api_key
+            )
         # Use self.temperature if set, otherwise use the temperature argument
         temp = self.temperature if self.temperature is not None else temperature
-        return (
-            self.llm_client.chat.completions.create(
+        self.throttle(messages, max_new_tokens or self.default_max_tokens)
+        # Deterministic requests are answered from the response cache when possible
+        return llm_cache.memoize_deterministic(
+            temp,
+            (base_url, self.model, messages, max_new_tokens, kwargs),
+            lambda: self.llm_client.chat.completions.create(
                 model=self.model,
                 messages=messages,
-                max_tokens=max_new_tokens if max_new_tokens else 4096,
+                max_tokens=max_new_tokens or self.default_max_tokens,
                 temperature=temp,
                 **kwargs,
             )
             .choices[0]
-            .message.content
+            .message.content,
         )
 
 
@@ -273,6 +594,8 @@ class LMMEngineAzureOpenAI(LMMEngine):
         model=None,
         api_version=None,
         rate_limit=-1,
+        tpm_limit=None,
+        default_max_tokens=4096,
         temperature=None,
         **kwargs,
     ):
@@ -281,14 +604,13 @@ class LMMEngineAzureOpenAI(LMMEngine):
         self.api_version = api_version
         self.api_key = api_key
         self.azure_endpoint = azure_endpoint
-        self.request_interval = 0 if rate_limit == -1 else 60.0 / rate_limit
+        self.limiter = DualBucket.from_limits(rate_limit, tpm_limit)
+        self.default_max_tokens = default_max_tokens
         self.llm_client = None
         self.cost = 0.0
         self.temperature = temperature
 
-    @backoff.on_exception(
-        backoff.expo, (APIConnectionError, APIError, RateLimitError), max_time=60
-    )
+    @retry_llm
     def generate(self, messages, temperature=0.0, max_new_tokens=None, **kwargs):
         api_key = self.api_key or os.getenv("AZURE_OPENAI_API_KEY")
         if api_key is None:
@@ -306,23 +628,32 @@ class LMMEngineAzureOpenAI(LMMEngine):
                 "An Azure API endpoint needs to be provided in either the azure_endpoint parameter or as an environment variable named AZURE_OPENAI_ENDPOINT"
             )
         if not self.llm_client:
-            self.llm_client = AzureOpenAI(
+            self.llm_client = get_shared_client(
+                sdk_class("openai", "AzureOpenAI"),
                 azure_endpoint=azure_endpoint,
                 api_key=api_key,
                 api_version=api_version,
             )
         # Use self.temperature if set, otherwise use the temperature argument
         temp = self.temperature if self.temperature is not None else temperature
-        completion = self.llm_client.chat.completions.create(
-            model=self.model,
-            messages=messages,
-            max_tokens=max_new_tokens if max_new_tokens else 4096,
-            temperature=temp,
-            **kwargs,
+
+        def request():
+            completion = self.llm_client.chat.completions.create(
+                model=self.model,
+                messages=messages,
+                max_tokens=max_new_tokens or self.default_max_tokens,
+                temperature=temp,
+                **kwargs,
+            )
+            total_tokens = completion.usage.total_tokens
+            self.cost += 0.02 * ((total_tokens + 500) / 1000)
+            return completion.choices[0].message.content
+
+        self.throttle(messages, max_new_tokens or self.default_max_tokens)
+        # Deterministic requests are answered from the response cache when possible
+        return llm_cache.memoize_deterministic(
+            temp, (azure_endpoint, self.model, messages, max_new_tokens, kwargs), request
         )
-        total_tokens = completion.usage.total_tokens
-        self.cost += 0.02 * ((total_tokens + 500) / 1000)
-        return completion.choices[0].message.content
 
 
 class LMMEnginevLLM(LMMEngine):
@@ -332,6 +663,8 @@ class LMMEnginevLLM(LMMEngine):
         api_key=None,
         model=None,
         rate_limit=-1,
+        tpm_limit=None,
+        default_max_tokens=4096,
         temperature=None,
         **kwargs,
     ):
@@ -339,13 +672,12 @@ class LMMEnginevLLM(LMMEngine):
         self.model = model
         self.api_key = api_key
         self.base_url = base_url
-        self.request_interval = 0 if rate_limit == -1 else 60.0 / rate_limit
+        self.limiter = DualBucket.from_limits(rate_limit, tpm_limit)
+        self.default_max_tokens = default_max_tokens
         self.llm_client = None
         self.temperature = temperature
 
-    @backoff.on_exception(
-        backoff.expo, (APIConnectionError, APIError, RateLimitError), max_time=60
-    )
+    @retry_llm
     def generate(
         self,
         messages,
@@ -366,30 +698,46 @@ class LMMEnginevLLM(LMMEngine):
                 "An endpoint URL needs to be provided in either the endpoint_url parameter or as an environment variable named vLLM_ENDPOINT_URL"
             )
         if not self.llm_client:
-            self.llm_client = OpenAI(base_url=base_url, api_key=api_key)
+            self.llm_client = get_shared_client(
+                sdk_class("openai", "OpenAI"), base_url=base_url, api_key=api_key
+            )
         # Use self.temperature if set, otherwise use the temperature argument
         temp = self.temperature if self.temperature is not None else temperature
-        completion = self.llm_client.chat.completions.create(
-            model=self.model,
-            messages=messages,
-            max_tokens=max_new_tokens if max_new_tokens else 4096,
-            temperature=temp,
-            top_p=top_p,
-            extra_body={"repetition_penalty": repetition_penalty},
+        self.throttle(messages, max_new_tokens or self.default_max_tokens)
+        # Deterministic requests are answered from the response cache when possible
+        return llm_cache.memoize_deterministic(
+            temp,
+            (base_url, self.model, messages, max_new_tokens, top_p, repetition_penalty),
+            lambda: self.llm_client.chat.completions.create(
+                model=self.model,
+                messages=messages,
+                max_tokens=max_new_tokens or self.default_max_tokens,
+                temperature=temp,
+                top_p=top_p,
+                extra_body={"repetition_penalty": repetition_penalty},
+            )
+            .choices[0]
+            .message.content,
         )
-        return completion.choices[0].message.content
 
 
 class LMMEngineHuggingFace(LMMEngine):
-    def __init__(self, base_url=None, api_key=None, rate_limit=-1, **kwargs):
+    def __init__(
+        self,
+        base_url=None,
+        api_key=None,
+        rate_limit=-1,
+        tpm_limit=None,
+        default_max_tokens=4096,
+        **kwargs,
+    ):
         self.base_url = base_url
         self.api_key = api_key
-        self.request_interval = 0 if rate_limit == -1 else 60.0 / rate_limit
+        self.limiter = DualBucket.from_limits(rate_limit, tpm_limit)
+        self.default_max_tokens = default_max_tokens
         self.llm_client = None
 
-    @backoff.on_exception(
-        backoff.expo, (APIConnectionError, APIError, RateLimitError), max_time=60
-    )
+    @retry_llm
     def generate(self, messages, temperature=0.0, max_new_tokens=None, **kwargs):
         # Properly handle empty strings and None values for endpoint URL
         base_url = self.base_url if self.base_url else os.getenv("HF_ENDPOINT_URL")
@@ -433,34 +781,46 @@ class LMMEngineHuggingFace(LMMEngine):
             logger.info(f"📡 Modal endpoint detected, using OpenAI-compatible path: {base_url}")
 
         if not self.llm_client:
-            self.llm_client = OpenAI(base_url=base_url, api_key=api_key)
-        return (
-            self.llm_client.chat.completions.create(
+            self.llm_client = get_shared_client(
+                sdk_class("openai", "OpenAI"), base_url=base_url, api_key=api_key
+            )
+        self.throttle(messages, max_new_tokens or self.default_max_tokens)
+        # Deterministic requests are answered from the response cache when possible
+        return llm_cache.memoize_deterministic(
+            temperature,
+            (base_url, messages, max_new_tokens, kwargs),
+            lambda: self.llm_client.chat.completions.create(
                 model="tgi",
                 messages=messages,
-                max_tokens=max_new_tokens if max_new_tokens else 4096,
+                max_tokens=max_new_tokens or self.default_max_tokens,
                 temperature=temperature,
                 **kwargs,
             )
             .choices[0]
-            .message.content
+            .message.content,
         )
 
 
 class LMMEngineParasail(LMMEngine):
     def __init__(
-        self, base_url=None, api_key=None, model=None, rate_limit=-1, **kwargs
+        self,
+        base_url=None,
+        api_key=None,
+        model=None,
+        rate_limit=-1,
+        tpm_limit=None,
+        default_max_tokens=4096,
+        **kwargs,
     ):
         assert model is not None, "Parasail model id must be provided"
         self.base_url = base_url
         self.model = model
         self.api_key = api_key
-        self.request_interval = 0 if rate_limit == -1 else 60.0 / rate_limit
+        self.limiter = DualBucket.from_limits(rate_limit, tpm_limit)
+        self.default_max_tokens = default_max_tokens
         self.llm_client = None
 
-    @backoff.on_exception(
-        backoff.expo, (APIConnectionError, APIError, RateLimitError), max_time=60
-    )
+    @retry_llm
     def generate(self, messages, temperature=0.0, max_new_tokens=None, **kwargs):
         api_key = self.api_key or os.getenv("PARASAIL_API_KEY")
         if api_key is None:
@@ -473,20 +833,25 @@ class LMMEngineParasail(LMMEngine):
                 "Parasail endpoint must be provided as base_url parameter or as an environment variable named PARASAIL_ENDPOINT_URL"
             )
         if not self.llm_client:
-            self.llm_client = OpenAI(
+            self.llm_client = get_shared_client(
+                sdk_class("openai", "OpenAI"),
                 base_url=base_url if base_url else "https://api.parasail.io/v1",
                 api_key=api_key,
             )
-        return (
-            self.llm_client.chat.completions.create(
+        self.throttle(messages, max_new_tokens or self.default_max_tokens)
+        # Deterministic requests are answered from the response cache when possible
+        return llm_cache.memoize_deterministic(
+            temperature,
+            (base_url, self.model, messages, max_new_tokens, kwargs),
+            lambda: self.llm_client.chat.completions.create(
                 model=self.model,
                 messages=messages,
-                max_tokens=max_new_tokens if max_new_tokens else 4096,
+                max_tokens=max_new_tokens or self.default_max_tokens,
                 temperature=temperature,
                 **kwargs,
             )
             .choices[0]
-            .message.content
+            .message.content,
         )
 
 
@@ -497,6 +862,7 @@ class LMMEngineCerebras(LMMEngine):
         api_key=None,
         model=None,
         rate_limit=-1,
+        tpm_limit=None,
         temperature=None,
         **kwargs,
     ):
@@ -508,15 +874,13 @@ class LMMEngineCerebras(LMMEngine):
         # Default to Cerebras API endpoint if not specified
         self.base_url = base_url if base_url else "https://api.cerebras.ai/v1"
         self.api_key = api_key
-        self.request_interval = 0 if rate_limit == -1 else 60.0 / rate_limit
+        self.limiter = DualBucket.from_limits(rate_limit, tpm_limit)
         self.llm_client = None
         self.temperature = temperature
 
         self.logger.info(f"🧠 Initialized Cerebras engine: model={self.model}, base_url={self.base_url}")
 
-    @backoff.on_exception(
-        backoff.expo, (APIConnectionError, APIError, RateLimitError), max_time=60
-    )
+    @retry_llm
     def generate(self, messages, temperature=0.0, max_new_tokens=None, **kwargs):
         # Check for Cerebras API key first, then fall back to OpenAI key for compatibility
         api_key = self.api_key or os.getenv("CEREBRAS_API_KEY") or os.getenv("OPENAI_API_KEY")
@@ -532,7 +896,8 @@ class LMMEngineCerebras(LMMEngine):
             )
 
         if not self.llm_client:
-            self.llm_client = OpenAI(
+            self.llm_client = get_shared_client(
+                sdk_class("openai", "OpenAI"),
                 base_url=self.base_url,
                 api_key=api_key,
             )
@@ -567,19 +932,26 @@ class LMMEngineCerebras(LMMEngine):
         # Log request details
         self.logger.debug(f"📤 Cerebras API request: model={self.model}, messages={len(messages)}, temp={temperature}")
 
-        try:
+        temp = temperature if self.temperature is None else self.temperature
+
+        def request():
             response = self.llm_client.chat.completions.create(
                 model=self.model,
                 messages=messages,
-                temperature=(
-                    temperature if self.temperature is None else self.temperature
-                ),
+                temperature=temp,
                 **kwargs,
             )
 
             self.logger.debug(f"📥 Cerebras API response: {len(response.choices[0].message.content)} chars")
             return response.choices[0].message.content
 
+        try:
+            self.throttle(messages, max_new_tokens)
+            # Deterministic requests are answered from the response cache when possible
+            return llm_cache.memoize_deterministic(
+                temp, (self.base_url, self.model, messages, kwargs), request
+            )
+
         except Exception as e:
             self.logger.error(f"❌ Cerebras API error: {e}")
             self.logger.error(f"   Model: {self.model}")
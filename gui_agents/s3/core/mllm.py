@@ -15,6 +15,19 @@ from gui_agents.s3.core.engine import (
 )
 
 
+def image_media_type(data) -> str:
+    """Detect an encoded image's media type from its magic number (PNG if unknown)."""
+    if not isinstance(data, (bytes, bytearray)):
+        return "image/png"
+    if data[:3] == b"\xff\xd8\xff":
+        return "image/jpeg"
+    if data[:4] == b"RIFF" and data[8:12] == b"WEBP":
+        return "image/webp"
+    if data[:6] in (b"GIF87a", b"GIF89a"):
+        return "image/gif"
+    return "image/png"
+
+
 class LMMAgent:
     def __init__(self, engine_params=None, system_prompt=None, engine=None):
         if engine is None:
@@ -53,12 +66,22 @@ class LMMAgent:
             self.add_system_prompt("You are a helpful assistant.")
 
     def encode_image(self, image_content):
+        return self.encode_image_with_type(image_content)[0]
+
+    def encode_image_with_type(self, image_content):
+        """Base64-encode an image and detect its media type.
+
+        Screenshots may be PNG, JPEG or WebP depending on the caller, and providers
+        such as Anthropic reject images whose declared type doesn't match the bytes.
+        """
         # if image_content is a path to an image file, check type of the image_content to verify
         if isinstance(image_content, str):
             with open(image_content, "rb") as image_file:
-                return base64.b64encode(image_file.read()).decode("utf-8")
-        else:
-            return base64.b64encode(image_content).decode("utf-8")
+                image_content = image_file.read()
+        return (
+            base64.b64encode(image_content).decode("utf-8"),
+            image_media_type(image_content),
+        )
 
     def reset(
         self,
@@ -101,12 +124,12 @@ class LMMAgent:
                 "content": [{"type": "text", "text": text_content}],
             }
             if image_content:
-                base64_image = self.encode_image(image_content)
+                base64_image, media_type = self.encode_image_with_type(image_content)
                 self.messages[index]["content"].append(
                     {
                         "type": "image_url",
                         "image_url": {
-                            "url": f"data:image/png;base64,{base64_image}",
+                            "url": f"data:{media_type};base64,{base64_image}",
                             "detail": image_detail,
                         },
                     }
@@ -154,24 +177,26 @@ class LMMAgent:
                 if isinstance(image_content, list):
                     # If image_content is a list of images, loop through each image
                     for image in image_content:
-                        base64_image = self.encode_image(image)
+                        base64_image, media_type = self.encode_image_with_type(image)
                         message["content"].append(
                             {
                                 "type": "image_url",
                                 "image_url": {
-                                    "url": f"data:image/png;base64,{base64_image}",
+                                    "url": f"data:{media_type};base64,{base64_image}",
                                     "detail": image_detail,
                                 },
                             }
                         )
                 else:
                     # If image_content is a single image, handle it directly
-                    base64_image = self.encode_image(image_content)
+                    base64_image, media_type = self.encode_image_with_type(
+                        image_content
+                    )
                     message["content"].append(
                         {
                             "type": "image_url",
                             "image_url": {
-                                "url": f"data:image/png;base64,{base64_image}",
+                                "url": f"data:{media_type};base64,{base64_image}",
                                 "detail": image_detail,
                             },
                         }
@@ -205,26 +230,28 @@ class LMMAgent:
                 if isinstance(image_content, list):
                     # If image_content is a list of images, loop through each image
                     for image in image_content:
-                        base64_image = self.encode_image(image)
+                        base64_image, media_type = self.encode_image_with_type(image)
                         message["content"].append(
                             {
                                 "type": "image",
                                 "source": {
                                     "type": "base64",
-                                    "media_type": "image/png",
+                                    "media_type": media_type,
                                     "data": base64_image,
                                 },
                             }
                         )
                 else:
                     # If image_content is a single image, handle it directly
-                    base64_image = self.encode_image(image_content)
+                    base64_image, media_type = self.encode_image_with_type(
+                        image_content
+                    )
                     message["content"].append(
                         {
                             "type": "image",
                             "source": {
                                 "type": "base64",
-                                "media_type": "image/png",
+                                "media_type": media_type,
                                 "data": base64_image,
                             },
                         }
@@ -282,9 +309,14 @@ class LMMAgent:
         temperature=0.0,
         max_new_tokens=None,
         use_thinking=False,
+        stop_when=None,
         **kwargs,
     ):
-        """Generate the next response based on previous messages"""
+        """Generate the next response based on previous messages
+
+        If stop_when is given and the engine supports streaming, the response is
+        streamed and cut off as soon as stop_when(text_so_far) is true.
+        """
         if messages is None:
             messages = self.messages
         if user_message:
@@ -301,6 +333,16 @@ class LMMAgent:
                 **kwargs,
             )
 
+        # Streaming lets the caller stop reading once the part it needs has arrived
+        if stop_when is not None and hasattr(self.engine, "generate_until"):
+            return self.engine.generate_until(
+                messages,
+                stop_when,
+                temperature=temperature,
+                max_new_tokens=max_new_tokens,
+                **kwargs,
+            )
+
         return self.engine.generate(
             messages,
             temperature=temperature,
@@ -28,6 +28,7 @@ def create_pyautogui_code(agent, code: str, obs: Dict) -> str:
         Exception: If there is an error in evaluating the code.
     """
     agent.assign_screenshot(obs)  # Necessary for grounding
+    agent.last_actions = None  # Set again by actions that have a structured form
     exec_code = eval(code)
     return exec_code
 
@@ -220,7 +221,13 @@ def extract_agent_functions(code):
     return re.findall(pattern, code)
 
 
-def compress_image(image_bytes: bytes = None, image: Image = None, quality: int = 70) -> bytes:
+def compress_image(
+    image_bytes: bytes = None,
+    image: Image = None,
+    quality: int = 70,
+    method: int = 4,
+    output: BytesIO = None,
+) -> bytes:
     """Compresses an image represented as bytes.
 
     Compression involves resizing image into half its original size and saving to webp format.
@@ -230,15 +237,22 @@ def compress_image(image_bytes: bytes = None, image: Image = None, quality: int
         image (Image): PIL Image object to compress (alternative to image_bytes).
         quality (int): WebP compression quality (1-100). Default 70 is a good balance for LLMs.
                       Lower = smaller size, faster upload. Higher = better quality.
+        method (int): libwebp effort (0-6). 0 is the fastest encode, 6 the smallest output.
+        output (BytesIO): Optional buffer to reuse across calls; it is rewound and truncated first.
+                          Not thread-safe, so only share it within a single thread.
 
     Returns:
         bytes: The compressed image data.
     """
     if not image:
         image = Image.open(BytesIO(image_bytes))
-    output = BytesIO()
+    if output is None:
+        output = BytesIO()
+    else:
+        output.seek(0)
+        output.truncate()
     # OPTIMIZATION: Add quality parameter to reduce file size and token usage
     # Quality 70 provides good balance between size and visual fidelity for LLM processing
-    image.save(output, format="WEBP", quality=quality)
+    image.save(output, format="WEBP", quality=quality, method=method)
     compressed_image_bytes = output.getvalue()
     return compressed_image_bytes
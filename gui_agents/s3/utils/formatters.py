@@ -1,31 +1,63 @@
 """This file contains various formatting checks used to reprompt an agent for correctly formatted responses."""
 
 import re
+from functools import lru_cache
+
 from gui_agents.s3.utils.common_utils import (
     extract_agent_functions,
     parse_code_from_string,
     create_pyautogui_code,
-    split_thinking_response,
 )
 
+# Matches a fenced code block with an optional language tag
+_CODE_BLOCK_RE = re.compile(r"```(?:\w+\s+)?(.*?)```", re.DOTALL)
+
+_THOUGHTS_OPEN = "<thoughts>"
+_THOUGHTS_CLOSE = "</thoughts>"
+_ANSWER_OPEN = "<answer>"
+_ANSWER_CLOSE = "</answer>"
+
+
+# OPTIMIZATION: The same response is often re-validated by several formatters in a retry loop
+@lru_cache(maxsize=256)
+def _parse_cached(response):
+    return parse_code_from_string(response)
+
+
+@lru_cache(maxsize=256)
+def _extract_cached(code):
+    return tuple(extract_agent_functions(code))
+
+
 def single_action_check(response):
     """Check that there's exactly ONE code block with ONE agent function in the entire response.
 
     This prevents the LLM from generating multiple future steps in a single response.
     """
-    # Find ALL code blocks in the response
-    pattern = r"```(?:\w+\s+)?(.*?)```"
-    all_matches = re.findall(pattern, response, re.DOTALL)
+    # OPTIMIZATION: Scan code blocks lazily and reject as soon as a second one appears
+    first = None
+    for count, match in enumerate(_CODE_BLOCK_RE.finditer(response), 1):
+        if count > 1:
+            return False
+        first = match
 
-    # Reject if there's more than one code block
-    if len(all_matches) != 1:
+    if first is None:
         return False
 
     # Check that the single code block has exactly one agent function
-    code = all_matches[0]
-    agent_functions = extract_agent_functions(code)
+    agent_functions = _extract_cached(first.group(1))
     return len(agent_functions) == 1
 
+def second_code_block_closed(response):
+    """Stop predicate for streaming a plan: a second complete code block has arrived.
+
+    A plan must hold exactly one code block, so from this point ``single_action_check``
+    fails on the truncated text just as it would on the full response. Stopping at the
+    first closed block instead would hide any further blocks from the check.
+    """
+    blocks = _CODE_BLOCK_RE.finditer(response)
+    return next(blocks, None) is not None and next(blocks, None) is not None
+
 single_action_error_msg = (
     "Incorrect code: There must be exactly ONE code block with a single agent action. "
     "Do not generate multiple future steps - only return the immediate next action."
@@ -46,7 +78,7 @@ def _attempt_code_creation(agent, code, obs):
 
 code_valid_check = (
     lambda agent, obs, response: _attempt_code_creation(
-        agent, parse_code_from_string(response), obs
+        agent, _parse_cached(response), obs
     )
     is not None
 )
@@ -56,7 +88,30 @@ CODE_VALID_FORMATTER = lambda agent, obs, response: (
     code_valid_error_msg,
 )
 
-thoughts_answer_tag_check = lambda response: split_thinking_response(response)[1] != ""
+def _split_thoughts_answer(response):
+    """Return (answer, thoughts) from <thoughts>...</thoughts><answer>...</answer>.
+
+    OPTIMIZATION: Linear str.find scan instead of splitting the whole response per tag.
+    Returns ("", "") unless all four tags are present in order.
+    """
+    t0 = response.find(_THOUGHTS_OPEN)
+    if t0 == -1:
+        return "", ""
+    t0 += len(_THOUGHTS_OPEN)
+    t1 = response.find(_THOUGHTS_CLOSE, t0)
+    if t1 == -1:
+        return "", ""
+    a0 = response.find(_ANSWER_OPEN, t1 + len(_THOUGHTS_CLOSE))
+    if a0 == -1:
+        return "", ""
+    a0 += len(_ANSWER_OPEN)
+    a1 = response.find(_ANSWER_CLOSE, a0)
+    if a1 == -1:
+        return "", ""
+    return response[a0:a1].strip(), response[t0:t1].strip()
+
+
+thoughts_answer_tag_check = lambda response: _split_thoughts_answer(response)[1] != ""
 thoughts_answer_tag_error_msg = "Incorrect response: The response must contain both <thoughts>...</thoughts> and <answer>...</answer> tags."
 THOUGHTS_ANSWER_TAG_FORMATTER = lambda response: (
     thoughts_answer_tag_check(response),
@@ -64,7 +119,7 @@ THOUGHTS_ANSWER_TAG_FORMATTER = lambda response: (
 )
 
 integer_answer_check = (
-    lambda response: split_thinking_response(response)[0].strip().isdigit()
+    lambda response: _split_thoughts_answer(response)[0].isdigit()
 )
 integer_answer_error_msg = (
     "Incorrect response: The <answer>...</answer> tag must contain a single integer."
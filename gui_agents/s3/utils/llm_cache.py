@@ -0,0 +1,93 @@
+"""
+In-process cache for deterministic (temperature == 0) LLM responses.
+
+Retried or re-issued prompts with identical messages are answered from memory
+instead of paying another network round-trip.
+"""
+
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Optional
+
+MAX_ENTRIES = 1024
+
+_cache: "OrderedDict[str, str]" = OrderedDict()
+_lock = threading.Lock()
+
+
+def make_key(*parts: Any) -> str:
+    """Hash the request fields (model, messages, limits, ...) into a cache key."""
+    payload = json.dumps(parts, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def lookup(key: str) -> Optional[str]:
+    """Return the cached response for key, or None."""
+    with _lock:
+        value = _cache.get(key)
+        if value is not None:
+            _cache.move_to_end(key)
+        return value
+
+
+def store(key: str, value: str) -> None:
+    """Store a response, evicting the least recently used entry when full."""
+    with _lock:
+        _cache[key] = value
+        _cache.move_to_end(key)
+        if len(_cache) > MAX_ENTRIES:
+            _cache.popitem(last=False)
+
+
+def clear() -> None:
+    """Drop all cached responses."""
+    with _lock:
+        _cache.clear()
+
+
+def memoize_deterministic(
+    temperature, key_parts: tuple, compute: Callable[[], str]
+) -> str:
+    """
+    Return ``compute()``, served from the cache when sampling is deterministic.
+
+    Args:
+        temperature: Effective sampling temperature of the request; only 0 is cached
+        key_parts: Fields identifying the request (model, messages, max tokens, kwargs)
+        compute: Performs the actual API call and returns the response text
+
+    Returns:
+        The response text
+    """
+    if temperature != 0:
+        return compute()
+
+    key = make_key(*key_parts)
+    cached = lookup(key)
+    if cached is not None:
+        return cached
+
+    response = compute()
+    if response:
+        store(key, response)
+    return response
+
+
+async def amemoize_deterministic(
+    temperature, key_parts: tuple, compute: Callable[[], Awaitable[str]]
+) -> str:
+    """Async counterpart of ``memoize_deterministic``; ``compute`` is awaited."""
+    if temperature != 0:
+        return await compute()
+
+    key = make_key(*key_parts)
+    cached = lookup(key)
+    if cached is not None:
+        return cached
+
+    response = await compute()
+    if response:
+        store(key, response)
+    return response
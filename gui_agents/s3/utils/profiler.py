@@ -5,32 +5,55 @@ This module provides hierarchical profiling capabilities to track execution timi
 at multiple granularity levels: steps, phases, functions, and API calls.
 """
 
+import contextvars
+import heapq
+import sys
+import threading
 import time
 import logging
 from contextlib import contextmanager
-from typing import Dict, List, Optional, Any
+from typing import Dict, List, Optional, Any, Tuple
 from dataclasses import dataclass, field
 from collections import defaultdict
 
 logger = logging.getLogger("desktopenv.agent")
 
+# dataclass(slots=True) is only available on Python 3.10+
+_DATACLASS_SLOTS = {"slots": True} if sys.version_info >= (3, 10) else {}
 
-@dataclass
+# Key handed out by start_timing: (reset generation, index into timings)
+TimingKey = Tuple[int, int]
+
+# Row layout of the summary table: name, count, then total/avg/min/max in ms
+_SUMMARY_ROW = "{:<40} {:>8} {:>12.2f} {:>12.2f} {:>12.2f} {:>12.2f}".format
+
+
+@dataclass(**_DATACLASS_SLOTS)
 class TimingEntry:
     """Represents a single timing measurement."""
     name: str
-    start_time: float
-    end_time: Optional[float] = None
-    duration: Optional[float] = None
+    # OPTIMIZATION: Integer nanoseconds; converted to ms/s only when reporting
+    start_time_ns: int
+    end_time_ns: Optional[int] = None
+    duration_ns: Optional[int] = None
     level: int = 0  # Hierarchy depth
-    parent: Optional[str] = None
-    children: List[str] = field(default_factory=list)
+    parent: Optional[int] = None
+    children: List[int] = field(default_factory=list)
     metadata: Dict[str, Any] = field(default_factory=dict)
 
     def finish(self):
         """Mark timing entry as complete and calculate duration."""
-        self.end_time = time.perf_counter()
-        self.duration = self.end_time - self.start_time
+        self.end_time_ns = time.monotonic_ns()
+        self.duration_ns = self.end_time_ns - self.start_time_ns
+
+
+@dataclass(**_DATACLASS_SLOTS)
+class AggStats:
+    """Running statistics for all timings sharing a name."""
+    count: int = 0
+    total: int = 0  # nanoseconds
+    mn: float = float("inf")
+    mx: int = 0
 
 
 class ExecutionProfiler:
@@ -67,17 +90,34 @@ class ExecutionProfiler:
         if self._initialized:
             return
         self._initialized = True
+        self._generation = 0
         self.reset()
 
     def reset(self):
         """Reset profiler state for new task."""
-        self.timings: Dict[str, TimingEntry] = {}
-        self.timing_stack: List[str] = []  # Track current hierarchy
-        self.current_level = 0
+        # OPTIMIZATION: Entries are keyed by their list index instead of hashed string keys.
+        # Keys also carry the reset generation, so a timing started before a reset
+        # cannot end or annotate an unrelated entry that reused its index.
+        self._generation += 1
+        self.timings: List[TimingEntry] = []
+        self._timings_lock = threading.Lock()
+        # Open-timing stack per thread / asyncio task, so concurrent flows don't corrupt
+        # each other's hierarchy. Stored as a tuple and replaced on every push/pop since
+        # tasks inherit (and would otherwise share) their parent's value. A fresh
+        # ContextVar per reset drops stacks left over from the previous task.
+        self._stack = contextvars.ContextVar("profiler_stack", default=())
         self.enabled = True
-        self.counter = 0  # For generating unique keys
 
-    def start_timing(self, name: str, metadata: Optional[Dict] = None) -> str:
+    def _entry(self, key: Optional[TimingKey]) -> Optional[TimingEntry]:
+        """Return the entry for key, or None if it is unset or from an earlier reset."""
+        if key is None:
+            return None
+        generation, index = key
+        if generation != self._generation or not 0 <= index < len(self.timings):
+            return None
+        return self.timings[index]
+
+    def start_timing(self, name: str, metadata: Optional[Dict] = None) -> Optional[TimingKey]:
         """
         Start timing for a named block.
 
@@ -86,38 +126,38 @@ class ExecutionProfiler:
             metadata: Optional metadata to attach to this timing
 
         Returns:
-            Unique key for this timing entry
+            Unique key for this timing entry (None when profiling is disabled)
         """
         if not self.enabled:
-            return name
-
-        # Generate unique key for this timing entry
-        key = f"{name}_{self.counter}"
-        self.counter += 1
+            return None
 
-        parent = self.timing_stack[-1] if self.timing_stack else None
+        generation = self._generation
+        stack = self._stack.get()
+        parent = stack[-1][1] if stack else None
 
         entry = TimingEntry(
             name=name,
-            start_time=time.perf_counter(),
-            level=self.current_level,
+            start_time_ns=time.monotonic_ns(),
+            level=len(stack),
             parent=parent,
             metadata=metadata or {}
         )
 
-        self.timings[key] = entry
+        with self._timings_lock:
+            index = len(self.timings)
+            self.timings.append(entry)
 
-        # Update parent's children
-        if parent and parent in self.timings:
-            self.timings[parent].children.append(key)
+            # Update parent's children
+            if parent is not None:
+                self.timings[parent].children.append(index)
+        key = (generation, index)
 
         # Push to stack
-        self.timing_stack.append(key)
-        self.current_level += 1
+        self._stack.set(stack + (key,))
 
         return key
 
-    def end_timing(self, key: str) -> float:
+    def end_timing(self, key: Optional[TimingKey]) -> float:
         """
         End timing for a named block and log the result.
 
@@ -127,33 +167,38 @@ class ExecutionProfiler:
         Returns:
             Duration in seconds
         """
-        if not self.enabled or key not in self.timings:
+        entry = self._entry(key) if self.enabled else None
+        if entry is None:
             return 0.0
 
-        entry = self.timings[key]
         entry.finish()
 
         # Pop from stack
-        if self.timing_stack and self.timing_stack[-1] == key:
-            self.timing_stack.pop()
-            self.current_level -= 1
-
-        # Log with hierarchy-aware formatting
-        indent = "  " * entry.level
-        duration_ms = entry.duration * 1000
-
-        # Add metadata to log if present
-        meta_str = ""
-        if entry.metadata:
-            # Format metadata as compact dict
-            meta_items = ", ".join([f"'{k}': {repr(v)}" for k, v in entry.metadata.items()])
-            meta_str = f" | {{{meta_items}}}"
-
-        logger.info(f"⏱️  {indent}{entry.name}: {duration_ms:.2f}ms{meta_str}")
-
-        return entry.duration
-
-    def add_metadata(self, key: str, metadata: Dict):
+        stack = self._stack.get()
+        if stack and stack[-1] == key:
+            self._stack.set(stack[:-1])
+        elif key in stack:
+            # Finished out of order
+            self._stack.set(tuple(k for k in stack if k != key))
+
+        # OPTIMIZATION: Skip building the log line when INFO is filtered out
+        if logger.isEnabledFor(logging.INFO):
+            # Log with hierarchy-aware formatting
+            indent = "  " * entry.level
+            duration_ms = entry.duration_ns / 1e6
+
+            # Add metadata to log if present
+            meta_str = ""
+            if entry.metadata:
+                # Format metadata as compact dict
+                meta_items = ", ".join([f"'{k}': {repr(v)}" for k, v in entry.metadata.items()])
+                meta_str = f" | {{{meta_items}}}"
+
+            logger.info(f"⏱️  {indent}{entry.name}: {duration_ms:.2f}ms{meta_str}")
+
+        return entry.duration_ns / 1e9
+
+    def add_metadata(self, key: Optional[TimingKey], metadata: Dict):
         """
         Add metadata to existing timing entry.
 
@@ -161,8 +206,9 @@ class ExecutionProfiler:
             key: Unique key of the timing entry
             metadata: Metadata to add/update
         """
-        if key in self.timings:
-            self.timings[key].metadata.update(metadata)
+        entry = self._entry(key)
+        if entry is not None:
+            entry.metadata.update(metadata)
 
     @contextmanager
     def profile(self, name: str, metadata: Optional[Dict] = None):
@@ -182,10 +228,13 @@ class ExecutionProfiler:
         finally:
             self.end_timing(key)
 
-    def generate_summary(self) -> str:
+    def generate_summary(self, top_k: Optional[int] = 50) -> str:
         """
         Generate a summary table of all timings.
 
+        Args:
+            top_k: Maximum number of operations to list (None lists all)
+
         Returns:
             Formatted summary string
         """
@@ -193,41 +242,40 @@ class ExecutionProfiler:
             return "No timing data collected"
 
         # Aggregate timings by name (ignore unique suffixes)
-        aggregated = defaultdict(lambda: {
-            "count": 0,
-            "total": 0.0,
-            "min": float('inf'),
-            "max": 0.0,
-            "durations": []
-        })
-
-        for key, entry in self.timings.items():
-            if entry.duration is None:
-                continue
+        # OPTIMIZATION: Single pass over running stats, no per-name duration lists
+        aggregated = defaultdict(AggStats)
 
-            name = entry.name
-            duration = entry.duration
+        for entry in self.timings:
+            duration = entry.duration_ns
+            if duration is None:
+                continue
 
-            aggregated[name]["count"] += 1
-            aggregated[name]["total"] += duration
-            aggregated[name]["min"] = min(aggregated[name]["min"], duration)
-            aggregated[name]["max"] = max(aggregated[name]["max"], duration)
-            aggregated[name]["durations"].append(duration)
+            stats = aggregated[entry.name]
+            stats.count += 1
+            stats.total += duration
+            if duration < stats.mn:
+                stats.mn = duration
+            if duration > stats.mx:
+                stats.mx = duration
 
         # Calculate averages and sort by total time
         summary_data = []
         for name, stats in aggregated.items():
-            avg = stats["total"] / stats["count"]
             summary_data.append({
                 "name": name,
-                "count": stats["count"],
-                "total": stats["total"],
-                "avg": avg,
-                "min": stats["min"],
-                "max": stats["max"]
+                "count": stats.count,
+                "total": stats.total,
+                "avg": stats.total / stats.count,
+                "min": stats.mn,
+                "max": stats.mx
             })
 
-        summary_data.sort(key=lambda x: x["total"], reverse=True)
+        # OPTIMIZATION: Partial selection of the top operations instead of a full sort
+        num_operations = len(summary_data)
+        if top_k is not None and top_k < num_operations:
+            summary_data = heapq.nlargest(top_k, summary_data, key=lambda x: x["total"])
+        else:
+            summary_data.sort(key=lambda x: x["total"], reverse=True)
 
         # Format as table
         lines = []
@@ -237,24 +285,29 @@ class ExecutionProfiler:
         lines.append(f"{'Operation':<40} {'Count':>8} {'Total (ms)':>12} {'Avg (ms)':>12} {'Min (ms)':>12} {'Max (ms)':>12}")
         lines.append("-"*100)
 
-        for data in summary_data:
-            lines.append(
-                f"{data['name']:<40} "
-                f"{data['count']:>8} "
-                f"{data['total']*1000:>12.2f} "
-                f"{data['avg']*1000:>12.2f} "
-                f"{data['min']*1000:>12.2f} "
-                f"{data['max']*1000:>12.2f}"
+        lines.extend(
+            _SUMMARY_ROW(
+                data["name"],
+                data["count"],
+                data["total"] / 1e6,
+                data["avg"] / 1e6,
+                data["min"] / 1e6,
+                data["max"] / 1e6,
             )
+            for data in summary_data
+        )
+
+        if len(summary_data) < num_operations:
+            lines.append(f"... {num_operations - len(summary_data)} more operations not shown")
 
         lines.append("="*100)
 
         # Calculate total execution time (top-level entries only)
-        total_time = sum(
-            entry.duration for entry in self.timings.values()
-            if entry.duration is not None and entry.level == 0
+        total_time_ns = sum(
+            entry.duration_ns for entry in self.timings
+            if entry.duration_ns is not None and entry.level == 0
         )
-        lines.append(f"Total Execution Time: {total_time*1000:.2f}ms ({total_time:.2f}s)")
+        lines.append(f"Total Execution Time: {total_time_ns / 1e6:.2f}ms ({total_time_ns / 1e9:.2f}s)")
         lines.append("="*100)
 
         return "\n".join(lines)
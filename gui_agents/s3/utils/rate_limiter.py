@@ -0,0 +1,95 @@
+"""
+Client-side request and token rate limiting for LMM engines.
+
+A request is only issued once both its request slot (RPM) and its estimated token
+cost (TPM) fit inside the trailing one-minute window, so long-context bursts wait
+locally instead of triggering a storm of 429 responses.
+"""
+
+import asyncio
+import threading
+import time
+from collections import deque
+from typing import Optional
+
+# Rough per-image token charge used when estimating a request's cost
+IMAGE_TOKEN_ESTIMATE = 1000
+# Completion budget assumed when the caller does not cap max_new_tokens
+DEFAULT_COMPLETION_TOKENS = 4096
+
+
+def estimate_tokens(messages, max_new_tokens: Optional[int] = None) -> int:
+    """Estimate prompt + completion tokens for a chat request (~4 chars per token)."""
+    total = 0
+    for message in messages:
+        content = message.get("content")
+        if isinstance(content, str):
+            total += len(content) // 4
+            continue
+        for part in content or []:
+            if not isinstance(part, dict):
+                continue
+            if part.get("type") == "text":
+                total += len(part.get("text", "")) // 4
+            elif part.get("type") in ("image", "image_url"):
+                total += IMAGE_TOKEN_ESTIMATE
+    return total + (max_new_tokens or DEFAULT_COMPLETION_TOKENS)
+
+
+class DualBucket:
+    """Sliding-window limiter over requests per minute and tokens per minute."""
+
+    def __init__(
+        self, rpm: Optional[int] = None, tpm: Optional[int] = None, window: float = 60.0
+    ):
+        self.rpm = rpm
+        self.tpm = tpm
+        self.window = window
+        self._events = deque()  # (timestamp, token cost)
+        self._tokens_in_window = 0
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_limits(cls, rate_limit: int = -1, tpm_limit: Optional[int] = None):
+        """Build a limiter from engine kwargs; returns None when both are unlimited."""
+        rpm = None if rate_limit is None or rate_limit == -1 else rate_limit
+        if rpm is None and tpm_limit is None:
+            return None
+        return cls(rpm=rpm, tpm=tpm_limit)
+
+    def _reserve(self, n_tokens: int) -> float:
+        """Reserve capacity if available; otherwise return seconds to wait."""
+        with self._lock:
+            now = time.monotonic()
+            while self._events and now - self._events[0][0] >= self.window:
+                self._tokens_in_window -= self._events.popleft()[1]
+
+            fits_requests = self.rpm is None or len(self._events) < self.rpm
+            # An oversized request is let through on an empty window rather than blocking forever
+            fits_tokens = (
+                self.tpm is None
+                or not self._events
+                or self._tokens_in_window + n_tokens <= self.tpm
+            )
+            if fits_requests and fits_tokens:
+                self._events.append((now, n_tokens))
+                self._tokens_in_window += n_tokens
+                return 0.0
+            # Wait until the oldest reservation leaves the window
+            return self._events[0][0] + self.window - now
+
+    def acquire(self, n_tokens: int = 0):
+        """Block until a request costing n_tokens fits in both budgets."""
+        while True:
+            wait = self._reserve(n_tokens)
+            if wait <= 0:
+                return
+            time.sleep(wait)
+
+    async def aacquire(self, n_tokens: int = 0):
+        """Async counterpart of ``acquire``."""
+        while True:
+            wait = self._reserve(n_tokens)
+            if wait <= 0:
+                return
+            await asyncio.sleep(wait)
@@ -0,0 +1,123 @@
+"""
+Retry policy shared by all LMM engines.
+
+Transient API failures are retried with jittered exponential backoff, except
+when the server says how long to wait (``Retry-After`` / ``retry-after-ms``),
+in which case that hint is used directly.
+"""
+
+import asyncio
+import functools
+import inspect
+import logging
+import random
+import sys
+import time
+from email.utils import parsedate_to_datetime
+from typing import Optional
+
+logger = logging.getLogger("desktopenv.agent")
+
+MAX_TRIES = 6
+INITIAL_DELAY = 1.0
+MAX_DELAY = 30.0
+
+# SDKs whose APIConnectionError / APIError / RateLimitError are retried
+RETRYABLE_SDKS = ("openai", "anthropic")
+
+
+def is_retryable(error: Exception) -> bool:
+    """Whether error is a transient API error from one of the provider SDKs.
+
+    Only SDKs that are already imported are checked, so this module doesn't force
+    provider imports (an SDK that was never loaded cannot have raised).
+    """
+    for name in RETRYABLE_SDKS:
+        sdk = sys.modules.get(name)
+        if sdk is not None and isinstance(
+            error, (sdk.APIConnectionError, sdk.APIError, sdk.RateLimitError)
+        ):
+            return True
+    return False
+
+
+def retry_after_seconds(error: Exception) -> Optional[float]:
+    """Return the server-requested wait from the error's response headers, if any."""
+    headers = getattr(getattr(error, "response", None), "headers", None)
+    if not headers:
+        return None
+
+    retry_after_ms = headers.get("retry-after-ms")
+    if retry_after_ms:
+        try:
+            return float(retry_after_ms) / 1000.0
+        except ValueError:
+            pass
+
+    retry_after = headers.get("retry-after")
+    if not retry_after:
+        return None
+    try:
+        return float(retry_after)
+    except ValueError:
+        pass
+    # HTTP-date form
+    try:
+        return max(parsedate_to_datetime(retry_after).timestamp() - time.time(), 0.0)
+    except (TypeError, ValueError):
+        return None
+
+
+def _next_delay(error: Exception, attempt: int) -> float:
+    delay = retry_after_seconds(error)
+    if delay is None:
+        delay = INITIAL_DELAY * 2.0**attempt + random.random()
+    return min(delay, MAX_DELAY)
+
+
+def _log_retry(fn, error: Exception, delay: float, attempt: int):
+    logger.warning(
+        "%s failed (%s: %s); retrying in %.2fs (attempt %d/%d)",
+        fn.__qualname__,
+        type(error).__name__,
+        error,
+        delay,
+        attempt + 1,
+        MAX_TRIES,
+    )
+
+
+def retry_llm(fn):
+    """Retry ``fn`` on transient API errors, honouring Retry-After when present.
+
+    Works for both regular and ``async def`` functions.
+    """
+    if inspect.iscoroutinefunction(fn):
+
+        @functools.wraps(fn)
+        async def async_wrapper(*args, **kwargs):
+            for attempt in range(MAX_TRIES):
+                try:
+                    return await fn(*args, **kwargs)
+                except Exception as e:
+                    if not is_retryable(e) or attempt == MAX_TRIES - 1:
+                        raise
+                    delay = _next_delay(e, attempt)
+                    _log_retry(fn, e, delay, attempt)
+                    await asyncio.sleep(delay)
+
+        return async_wrapper
+
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        for attempt in range(MAX_TRIES):
+            try:
+                return fn(*args, **kwargs)
+            except Exception as e:
+                if not is_retryable(e) or attempt == MAX_TRIES - 1:
+                    raise
+                delay = _next_delay(e, attempt)
+                _log_retry(fn, e, delay, attempt)
+                time.sleep(delay)
+
+    return wrapper
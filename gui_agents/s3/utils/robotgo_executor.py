@@ -2,19 +2,65 @@
 Executor that converts pyautogui code strings to robotgo JSON commands and executes them.
 """
 import re
+import ast
+import atexit
+import functools
 import json
 import platform
+import queue
 import subprocess
 import logging
+import threading
 from pathlib import Path
 from typing import Dict, Any, Optional
 
 logger = logging.getLogger("desktopenv.agent")
 
+# OPTIMIZATION: Resolved once; the platform cannot change while the process runs
+_PLATFORM = platform.system().lower()
+
+# OPTIMIZATION: Use orjson for action payloads when it is installed
+try:
+    import orjson
+
+    def json_dumps_bytes(obj) -> bytes:
+        return orjson.dumps(obj)
+
+    json_loads = orjson.loads
+except ImportError:
+    def json_dumps_bytes(obj) -> bytes:
+        return json.dumps(obj).encode()
+
+    json_loads = json.loads
+
+
+# OPTIMIZATION: Length-prefixed msgpack frames for the persistent executor when installed
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+
+def json_dumps(obj) -> str:
+    """Serialize an action payload to a str (e.g. for the -json argument)."""
+    return json_dumps_bytes(obj).decode()
+
+
 # Path to the robotgo_executor binary
 ROBOTGO_EXECUTOR_PATH = None
 
 
+# Persistent `robotgo_executor -serve` process shared by all calls, and the queue its
+# reader thread fills with decoded responses (None once stdout closes)
+_EXECUTOR_PROC = None
+_EXECUTOR_RESPONSES = None
+# Set once the daemon has agreed to msgpack framing in the handshake
+_EXECUTOR_PACKED = False
+_EXECUTOR_LOCK = threading.Lock()
+# Cleared when the binary predates -serve, so calls go back to one process each
+_SERVE_SUPPORTED = True
+
+
 def get_robotgo_executor_path():
     """Get the path to the robotgo_executor binary."""
     global ROBOTGO_EXECUTOR_PATH
@@ -25,7 +71,7 @@ def get_robotgo_executor_path():
         executor_dir = current_dir / "robotgo_executor"
         
         # Check for built binary
-        if platform.system() == "Windows":
+        if _PLATFORM == "windows":
             binary_name = "robotgo_executor.exe"
         else:
             binary_name = "robotgo_executor"
@@ -45,6 +91,122 @@ def get_robotgo_executor_path():
     return ROBOTGO_EXECUTOR_PATH
 
 
+# OPTIMIZATION: One precompiled pattern finds the call and its name in a single scan;
+# the name then dispatches to a handler instead of trying a regex per action type
+_CALL_RE = re.compile(
+    r"(?:pyautogui\.(?P<pyautogui>click|moveTo|dragTo|write|typewrite|press|hotkey"
+    r"|keyDown|keyUp|vscroll|hscroll)|time\.(?P<time>sleep))\((?P<args>[^)]+)\)"
+)
+# A ';'-separated statement, skipping leading whitespace, empty and '#' statements
+_STATEMENT_RE = re.compile(r"(?:^|;)\s*([^;\s#][^;]*)")
+_X_RE = re.compile(r"(\d+)\s*,")
+_Y_RE = re.compile(r",\s*(\d+)")
+_CLICKS_RE = re.compile(r"clicks\s*=\s*(\d+)")
+_BUTTON_RE = re.compile(r"button\s*=\s*['\"]([^'\"]+)['\"]")
+_QUOTED_RE = re.compile(r"['\"]([^'\"]+)['\"]")
+_SINGLE_QUOTED_RE = re.compile(r"['\"]([^'\"]+)['\"]$")
+
+
+def _parse_click(args_str, actions):
+    # Extract x, y, clicks, button
+    x_match = _X_RE.search(args_str)
+    y_match = _Y_RE.search(args_str)
+    clicks_match = _CLICKS_RE.search(args_str)
+    button_match = _BUTTON_RE.search(args_str)
+
+    params = {}
+    if x_match and y_match:
+        params['x'] = int(x_match.group(1))
+        params['y'] = int(y_match.group(1))
+    if clicks_match:
+        params['clicks'] = int(clicks_match.group(1))
+    if button_match:
+        params['button'] = button_match.group(1)
+    return 'click', params
+
+
+def _parse_move_to(args_str, actions):
+    coords = [int(x.strip()) for x in args_str.split(',')[:2]]
+    if len(coords) == 2:
+        return 'moveTo', {'x': coords[0], 'y': coords[1]}
+    return None
+
+
+def _parse_drag_to(args_str, actions):
+    coords = [int(x.strip()) for x in args_str.split(',')[:2]]
+    button_match = _BUTTON_RE.search(args_str)
+    button = button_match.group(1) if button_match else 'left'
+
+    # Need to get start position from previous moveTo
+    if actions and actions[-1]['type'] == 'moveTo':
+        start_params = actions.pop()['params']  # Remove the moveTo
+        return 'dragTo', {
+            'x1': start_params['x'],
+            'y1': start_params['y'],
+            'x2': coords[0],
+            'y2': coords[1],
+            'button': button
+        }
+    return None
+
+
+def _parse_write(args_str, actions):
+    # Try to extract string value
+    text_match = _QUOTED_RE.search(args_str)
+    if text_match:
+        return 'type', {'text': text_match.group(1)}
+    return None
+
+
+def _parse_key(action_type):
+    def parse(args_str, actions):
+        key_match = _SINGLE_QUOTED_RE.match(args_str)
+        if key_match:
+            return action_type, {'key': key_match.group(1)}
+        return None
+    return parse
+
+
+def _parse_hotkey(args_str, actions):
+    keys = _QUOTED_RE.findall(args_str)
+    if keys:
+        return 'hotkey', {'keys': keys}
+    return None
+
+
+def _parse_scroll(horizontal):
+    def parse(args_str, actions):
+        clicks = int(args_str)
+        # Get position from previous moveTo if available
+        x, y = 0, 0
+        if actions and actions[-1]['type'] == 'moveTo':
+            x = actions[-1]['params']['x']
+            y = actions[-1]['params']['y']
+        return 'scroll', {'x': x, 'y': y, 'clicks': clicks, 'horizontal': horizontal}
+    return parse
+
+
+def _parse_sleep(args_str, actions):
+    return 'wait', {'duration': float(args_str)}
+
+
+# Call name -> handler(args_str, actions) returning (action_type, params) or None
+_REGEX_HANDLERS = {
+    'click': _parse_click,
+    'moveTo': _parse_move_to,
+    'dragTo': _parse_drag_to,
+    'write': _parse_write,
+    'typewrite': _parse_write,
+    'press': _parse_key('press'),
+    'hotkey': _parse_hotkey,
+    'keyDown': _parse_key('keyDown'),
+    'keyUp': _parse_key('keyUp'),
+    'vscroll': _parse_scroll(False),
+    'hscroll': _parse_scroll(True),
+    'sleep': _parse_sleep,
+}
+
+
 def parse_pyautogui_code(code: str) -> list:
     """
     Parse pyautogui code string into a list of action dictionaries.
@@ -55,191 +217,346 @@ def parse_pyautogui_code(code: str) -> list:
     Returns:
         List of action dictionaries ready for JSON serialization
     """
-    actions = []
-    platform_name = platform.system().lower()
+    # Copies, so callers can't mutate the cached parse
+    return [
+        {'type': action['type'], 'params': dict(action['params']), 'platform': action['platform']}
+        for action in _parse_cached(code)
+    ]
+
+
+def _arg(args, kwargs, index, name, default=None):
+    """Positional argument index, else keyword name, else default."""
+    if len(args) > index:
+        return args[index]
+    return kwargs.get(name, default)
+
+
+def _call_click(args, kwargs, actions):
+    x, y = _arg(args, kwargs, 0, 'x'), _arg(args, kwargs, 1, 'y')
+    if x is None or y is None:
+        return None  # The executor would otherwise click at (0, 0)
+    params = {'x': int(x), 'y': int(y)}
+    if 'clicks' in kwargs:
+        params['clicks'] = int(kwargs['clicks'])
+    if 'button' in kwargs:
+        params['button'] = kwargs['button']
+    return 'click', params
+
+
+def _call_move_to(args, kwargs, actions):
+    x, y = _arg(args, kwargs, 0, 'x'), _arg(args, kwargs, 1, 'y')
+    if x is None or y is None:
+        return None
+    return 'moveTo', {'x': int(x), 'y': int(y)}
+
+
+def _call_drag_to(args, kwargs, actions):
+    x, y = _arg(args, kwargs, 0, 'x'), _arg(args, kwargs, 1, 'y')
+    # Need to get start position from previous moveTo
+    if x is None or y is None or not actions or actions[-1]['type'] != 'moveTo':
+        return None
+    start_params = actions.pop()['params']  # Remove the moveTo
+    return 'dragTo', {
+        'x1': start_params['x'],
+        'y1': start_params['y'],
+        'x2': int(x),
+        'y2': int(y),
+        'button': kwargs.get('button', 'left')
+    }
+
+
+def _call_write(args, kwargs, actions):
+    text = _arg(args, kwargs, 0, 'message')
+    if isinstance(text, str) and text:
+        return 'type', {'text': text}
+    return None
+
+
+def _call_key(action_type):
+    def parse(args, kwargs, actions):
+        key = _arg(args, kwargs, 0, 'key')
+        if isinstance(key, str):
+            return action_type, {'key': key}
+        return None
+    return parse
+
+
+def _call_hotkey(args, kwargs, actions):
+    keys = [key for key in args if isinstance(key, str)]
+    if keys:
+        return 'hotkey', {'keys': keys}
+    return None
+
+
+def _call_scroll(horizontal):
+    def parse(args, kwargs, actions):
+        clicks = int(_arg(args, kwargs, 0, 'clicks', 0))
+        # Get position from previous moveTo if available
+        x, y = 0, 0
+        if actions and actions[-1]['type'] == 'moveTo':
+            x = actions[-1]['params']['x']
+            y = actions[-1]['params']['y']
+        return 'scroll', {'x': x, 'y': y, 'clicks': clicks, 'horizontal': horizontal}
+    return parse
+
+
+def _call_sleep(args, kwargs, actions):
+    return 'wait', {'duration': float(_arg(args, kwargs, 0, 'secs', 0.0))}
+
+
+# (module, function) -> handler(args, kwargs, actions) returning (action_type, params) or None
+_CALL_HANDLERS = {
+    ('pyautogui', 'click'): _call_click,
+    ('pyautogui', 'moveTo'): _call_move_to,
+    ('pyautogui', 'dragTo'): _call_drag_to,
+    ('pyautogui', 'write'): _call_write,
+    ('pyautogui', 'typewrite'): _call_write,
+    ('pyautogui', 'press'): _call_key('press'),
+    ('pyautogui', 'hotkey'): _call_hotkey,
+    ('pyautogui', 'keyDown'): _call_key('keyDown'),
+    ('pyautogui', 'keyUp'): _call_key('keyUp'),
+    ('pyautogui', 'vscroll'): _call_scroll(False),
+    ('pyautogui', 'hscroll'): _call_scroll(True),
+    ('time', 'sleep'): _call_sleep,
+}
+
+
+def _calls_from_ast(code: str):
+    """
+    Yield (handler, args, kwargs) for each supported top-level call, in order.
     
-    # Split by semicolons and process each statement
-    statements = [s.strip() for s in code.split(';') if s.strip() and not s.strip().startswith('#')]
+    The whole snippet is parsed once by the C parser; arguments are read as literals,
+    so negative numbers, floats and strings containing quotes/commas/parentheses are
+    handled. Calls with non-literal arguments are skipped.
     
-    for stmt in statements:
-        if 'import' in stmt:
-            continue  # Skip import statements
-        
-        # Parse pyautogui.click(x, y, clicks=1, button='left')
-        click_match = re.search(r'pyautogui\.click\(([^)]+)\)', stmt)
-        if click_match:
-            args_str = click_match.group(1)
-            # Extract x, y, clicks, button
-            x_match = re.search(r'(\d+)\s*,', args_str)
-            y_match = re.search(r',\s*(\d+)', args_str)
-            clicks_match = re.search(r'clicks\s*=\s*(\d+)', args_str)
-            button_match = re.search(r"button\s*=\s*['\"]([^'\"]+)['\"]", args_str)
-            
-            params = {}
-            if x_match and y_match:
-                params['x'] = int(x_match.group(1))
-                params['y'] = int(y_match.group(1))
-            if clicks_match:
-                params['clicks'] = int(clicks_match.group(1))
-            if button_match:
-                params['button'] = button_match.group(1)
-            
-            # Check for keyDown/keyUp before click
-            hold_keys = []
-            if 'keyDown' in code[:code.index(stmt)]:
-                # Extract held keys (simplified - would need more parsing)
-                pass
-            
-            actions.append({
-                'type': 'click',
-                'params': params,
-                'platform': platform_name
-            })
-            continue
-        
-        # Parse pyautogui.moveTo(x, y)
-        moveto_match = re.search(r'pyautogui\.moveTo\(([^)]+)\)', stmt)
-        if moveto_match:
-            args_str = moveto_match.group(1)
-            coords = [int(x.strip()) for x in args_str.split(',')[:2]]
-            if len(coords) == 2:
-                actions.append({
-                    'type': 'moveTo',
-                    'params': {'x': coords[0], 'y': coords[1]},
-                    'platform': platform_name
-                })
+    Raises:
+        SyntaxError: If code is not valid Python
+    """
+    for stmt in ast.parse(code).body:
+        if not isinstance(stmt, ast.Expr) or not isinstance(stmt.value, ast.Call):
             continue
-        
-        # Parse pyautogui.dragTo(x, y, duration=1., button='left')
-        drag_match = re.search(r'pyautogui\.dragTo\(([^)]+)\)', stmt)
-        if drag_match:
-            args_str = drag_match.group(1)
-            coords = [int(x.strip()) for x in args_str.split(',')[:2]]
-            button_match = re.search(r"button\s*=\s*['\"]([^'\"]+)['\"]", args_str)
-            button = button_match.group(1) if button_match else 'left'
-            
-            # Need to get start position from previous moveTo
-            if actions and actions[-1]['type'] == 'moveTo':
-                start_params = actions[-1]['params']
-                actions.pop()  # Remove the moveTo
-                actions.append({
-                    'type': 'dragTo',
-                    'params': {
-                        'x1': start_params['x'],
-                        'y1': start_params['y'],
-                        'x2': coords[0],
-                        'y2': coords[1],
-                        'button': button
-                    },
-                    'platform': platform_name
-                })
+        func = stmt.value.func
+        if not isinstance(func, ast.Attribute) or not isinstance(func.value, ast.Name):
             continue
-        
-        # Parse pyautogui.write(text) or pyautogui.typewrite(text)
-        write_match = re.search(r'pyautogui\.(?:write|typewrite)\(([^)]+)\)', stmt)
-        if write_match:
-            text_str = write_match.group(1)
-            # Try to extract string value
-            text_match = re.search(r"['\"]([^'\"]+)['\"]", text_str)
-            if text_match:
-                actions.append({
-                    'type': 'type',
-                    'params': {'text': text_match.group(1)},
-                    'platform': platform_name
-                })
+        handler = _CALL_HANDLERS.get((func.value.id, func.attr))
+        if handler is None:
             continue
-        
-        # Parse pyautogui.press('key')
-        press_match = re.search(r"pyautogui\.press\(['\"]([^'\"]+)['\"]\)", stmt)
-        if press_match:
-            key = press_match.group(1)
-            actions.append({
-                'type': 'press',
-                'params': {'key': key},
-                'platform': platform_name
-            })
+        try:
+            args = [ast.literal_eval(arg) for arg in stmt.value.args]
+            kwargs = {kw.arg: ast.literal_eval(kw.value) for kw in stmt.value.keywords if kw.arg}
+        except ValueError:
             continue
         
-        # Parse pyautogui.hotkey('key1', 'key2', ...)
-        hotkey_match = re.search(r'pyautogui\.hotkey\(([^)]+)\)', stmt)
-        if hotkey_match:
-            args_str = hotkey_match.group(1)
-            keys = re.findall(r"['\"]([^'\"]+)['\"]", args_str)
-            if keys:
-                actions.append({
-                    'type': 'hotkey',
-                    'params': {'keys': keys},
-                    'platform': platform_name
-                })
+        # pyautogui.press also accepts a list of keys pressed in sequence
+        if func.attr == 'press' and args and isinstance(args[0], (list, tuple)):
+            for key in args[0]:
+                yield handler, [key], {}
             continue
-        
-        # Parse pyautogui.keyDown('key') and pyautogui.keyUp('key')
-        keydown_match = re.search(r"pyautogui\.keyDown\(['\"]([^'\"]+)['\"]\)", stmt)
-        if keydown_match:
+        yield handler, args, kwargs
+
+
+# OPTIMIZATION: The agent re-issues identical snippets (press('enter'), hotkeys, ...)
+@functools.lru_cache(maxsize=512)
+def _parse_cached(code: str) -> tuple:
+    # OPTIMIZATION: One ast.parse of the whole snippet instead of a regex cascade per
+    # statement; the regex parser remains for snippets that aren't valid Python
+    try:
+        calls = list(_calls_from_ast(code))
+    except SyntaxError:
+        return tuple(_parse_with_regex(code, _PLATFORM))
+    
+    actions = []
+    for handler, args, kwargs in calls:
+        try:
+            parsed = handler(args, kwargs, actions)
+        except (TypeError, ValueError):
+            continue  # Argument of the wrong type, e.g. click('a', 'b')
+        if parsed is not None:
+            action_type, params = parsed
             actions.append({
-                'type': 'keyDown',
-                'params': {'key': keydown_match.group(1)},
-                'platform': platform_name
+                'type': action_type,
+                'params': params,
+                'platform': _PLATFORM
             })
-            continue
+    
+    return tuple(actions)
+
+
+def _parse_with_regex(code: str, platform_name: str) -> list:
+    """Statement-by-statement regex parser, used when code doesn't parse as Python."""
+    actions = []
+    
+    # OPTIMIZATION: One scan yields the non-empty, non-comment statements
+    for stmt_match in _STATEMENT_RE.finditer(code):
+        stmt = stmt_match.group(1)
+        if 'import' in stmt:
+            continue  # Skip import statements
         
-        keyup_match = re.search(r"pyautogui\.keyUp\(['\"]([^'\"]+)['\"]\)", stmt)
-        if keyup_match:
-            actions.append({
-                'type': 'keyUp',
-                'params': {'key': keyup_match.group(1)},
-                'platform': platform_name
-            })
+        call_match = _CALL_RE.search(stmt)
+        if not call_match:
             continue
         
-        # Parse pyautogui.vscroll(clicks) or pyautogui.hscroll(clicks)
-        vscroll_match = re.search(r'pyautogui\.vscroll\(([^)]+)\)', stmt)
-        if vscroll_match:
-            clicks = int(vscroll_match.group(1))
-            # Get position from previous moveTo if available
-            x, y = 0, 0
-            if actions and actions[-1]['type'] == 'moveTo':
-                x = actions[-1]['params']['x']
-                y = actions[-1]['params']['y']
+        name = call_match.group('pyautogui') or call_match.group('time')
+        parsed = _REGEX_HANDLERS[name](call_match.group('args'), actions)
+        if parsed is not None:
+            action_type, params = parsed
             actions.append({
-                'type': 'scroll',
-                'params': {'x': x, 'y': y, 'clicks': clicks, 'horizontal': False},
+                'type': action_type,
+                'params': params,
                 'platform': platform_name
             })
-            continue
+    
+    return actions
+
+
+def _read_executor_responses(proc, responses):
+    stream = proc.stdout
+    try:
+        # JSON lines until the handshake reply switches the session to msgpack frames
+        for line in stream:
+            response = json_loads(line)
+            responses.put(response)
+            if response.get("format") == "msgpack":
+                break
+        else:
+            return
+        while True:
+            header = stream.read(4)
+            if len(header) < 4:
+                return
+            responses.put(msgpack.unpackb(stream.read(int.from_bytes(header, "big"))))
+    except (ValueError, AttributeError):  # msgpack's unpack errors are ValueErrors too
+        logger.error("robotgo_executor sent a malformed response")
+    finally:
+        responses.put(None)
+
+
+def _exchange(request: dict, timeout: float) -> Optional[dict]:
+    """Write one request to the daemon and wait for its decoded response."""
+    if _EXECUTOR_PACKED:
+        body = msgpack.packb(request)
+        _EXECUTOR_PROC.stdin.write(len(body).to_bytes(4, "big") + body)
+    else:
+        _EXECUTOR_PROC.stdin.write(json_dumps_bytes(request) + b"\n")
+    _EXECUTOR_PROC.stdin.flush()
+    return _EXECUTOR_RESPONSES.get(timeout=timeout)
+
+
+def _start_executor() -> bool:
+    """Launch the -serve daemon; returns False if this binary doesn't support it."""
+    global _EXECUTOR_PROC, _EXECUTOR_RESPONSES, _EXECUTOR_PACKED, _SERVE_SUPPORTED
+    _EXECUTOR_PACKED = False
+    _EXECUTOR_PROC = subprocess.Popen(
+        [get_robotgo_executor_path(), "-serve"],
+        stdin=subprocess.PIPE,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.DEVNULL,
+    )
+    _EXECUTOR_RESPONSES = queue.Queue()
+    threading.Thread(
+        target=_read_executor_responses,
+        args=(_EXECUTOR_PROC, _EXECUTOR_RESPONSES),
+        daemon=True,
+    ).start()
+
+    # Handshake: an older binary exits on the unknown flag and never answers, and one
+    # without msgpack support ignores "format" and keeps answering in JSON lines
+    ping = {"type": "ping"}
+    if msgpack is not None:
+        ping["format"] = "msgpack"
+    try:
+        response = _exchange(ping, timeout=5.0)
+        if response is not None:
+            _EXECUTOR_PACKED = response.get("format") == "msgpack"
+            return True
+    except (OSError, ValueError, queue.Empty):
+        pass
+    logger.warning("robotgo_executor does not support -serve; rebuild it for a persistent executor")
+    _stop_executor()
+    _SERVE_SUPPORTED = False
+    return False
+
+
+def _stop_executor():
+    global _EXECUTOR_PROC
+    proc, _EXECUTOR_PROC = _EXECUTOR_PROC, None
+    if proc is None:
+        return
+    try:
+        # EOF ends the serve loop whichever framing the session negotiated
+        proc.stdin.close()
+        proc.wait(timeout=2.0)
+    except (OSError, ValueError, subprocess.TimeoutExpired):
+        proc.kill()
+
+
+atexit.register(_stop_executor)
+
+
+def send_to_executor(request: dict, timeout: float = 10.0) -> Optional[dict]:
+    """
+    Send one request to the persistent robotgo executor and return its response.
+    
+    Args:
+        request: An action dict, {"actions": [...]} batch, or control message
+        timeout: Seconds to wait for the response
+    
+    Returns:
+        The decoded response, or None if no persistent executor is available (the
+        caller should then fall back to a one-off subprocess)
+    
+    Raises:
+        TimeoutError: If the executor doesn't answer in time (it is restarted on the
+            next call rather than re-running a possibly half-executed request)
+    """
+    with _EXECUTOR_LOCK:
+        if not _SERVE_SUPPORTED:
+            return None
+        if _EXECUTOR_PROC is None or _EXECUTOR_PROC.poll() is not None:
+            if not _start_executor():
+                return None
+        try:
+            response = _exchange(request, timeout)
+        except queue.Empty:
+            _stop_executor()
+            raise TimeoutError(f"robotgo_executor did not respond within {timeout:.1f}s")
+        except OSError:
+            # Daemon died before taking the request; nothing was executed
+            _stop_executor()
+            return None
+        if response is None:
+            _stop_executor()
+            raise RuntimeError("robotgo_executor exited while executing a request")
+        return response
+
+
+def _execute_actions_individually(actions: list, executor_path: str) -> bool:
+    """Run each action in its own executor process (binaries built without -batch)."""
+    for action in actions:
+        json_input = json_dumps(action)
         
-        hscroll_match = re.search(r'pyautogui\.hscroll\(([^)]+)\)', stmt)
-        if hscroll_match:
-            clicks = int(hscroll_match.group(1))
-            x, y = 0, 0
-            if actions and actions[-1]['type'] == 'moveTo':
-                x = actions[-1]['params']['x']
-                y = actions[-1]['params']['y']
-            actions.append({
-                'type': 'scroll',
-                'params': {'x': x, 'y': y, 'clicks': clicks, 'horizontal': True},
-                'platform': platform_name
-            })
-            continue
+        result = subprocess.run(
+            [executor_path, "-json", json_input],
+            # Only stderr is read (on failure); stdout isn't needed for these actions
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.PIPE,
+            timeout=10.0
+        )
         
-        # Parse time.sleep(seconds)
-        sleep_match = re.search(r'time\.sleep\(([^)]+)\)', stmt)
-        if sleep_match:
-            duration = float(sleep_match.group(1))
-            actions.append({
-                'type': 'wait',
-                'params': {'duration': duration},
-                'platform': platform_name
-            })
-            continue
+        if result.returncode != 0:
+            stderr = result.stderr.decode(errors="replace")
+            logger.error(f"robotgo_executor failed for action {action['type']}: {stderr}")
+            return False
     
-    return actions
+    return True
 
 
 def execute_robotgo_code(code: str) -> bool:
     """
     Execute pyautogui code by converting it to robotgo JSON commands.
     
+    Prefer ``execute_robotgo_actions`` when the structured actions are already known.
+    
     Args:
         code: Python code string with pyautogui calls
     
@@ -248,25 +565,63 @@ def execute_robotgo_code(code: str) -> bool:
     """
     try:
         actions = parse_pyautogui_code(code)
+    except Exception as e:
+        logger.error(f"Error executing robotgo code: {e}")
+        return False
+    return execute_robotgo_actions(actions)
+
+
+def execute_robotgo_actions(actions: list) -> bool:
+    """
+    Execute already-structured robotgo actions in order.
+    
+    Args:
+        actions: Action dicts of the form {"type": ..., "params": {...}, "platform": ...}
+    
+    Returns:
+        True if all actions succeeded, False otherwise
+    """
+    try:
+        if not actions:
+            return True
+        
+        # OPTIMIZATION: One request for the whole action list; the timeout grows with the
+        # batch and its explicit waits
+        timeout = 5.0 + 0.2 * len(actions) + sum(
+            action['params']['duration'] for action in actions if action['type'] == 'wait'
+        )
+        
+        # OPTIMIZATION: Reuse the persistent executor instead of paying process startup
+        response = send_to_executor({"actions": actions}, timeout=timeout)
+        if response is not None:
+            if not response.get("ok"):
+                failed = (response.get("results") or [{}])[-1]
+                logger.error(f"robotgo_executor failed for action {failed.get('type')}: {response.get('error')}")
+            return bool(response.get("ok"))
+        
         executor_path = get_robotgo_executor_path()
+        result = subprocess.run(
+            [executor_path, "-batch", "-json", json_dumps({"actions": actions})],
+            # OPTIMIZATION: Raw bytes; output is only decoded on the failure path
+            capture_output=True,
+            timeout=timeout
+        )
         
-        for action in actions:
-            json_input = json.dumps(action)
-            
-            result = subprocess.run(
-                [executor_path, "-json", json_input],
-                capture_output=True,
-                text=True,
-                timeout=10.0
-            )
-            
-            if result.returncode != 0:
-                logger.error(f"robotgo_executor failed for action {action['type']}: {result.stderr}")
-                return False
+        if result.returncode == 0:
+            return True
         
-        return True
+        if b"flag provided but not defined" in result.stderr:
+            # Binary predates -batch; rebuild it to get batched execution
+            return _execute_actions_individually(actions, executor_path)
+        
+        try:
+            failed = json_loads(result.stdout)[-1]
+            logger.error(f"robotgo_executor failed for action {failed['type']}: {failed.get('error')}")
+        except (ValueError, IndexError, KeyError, TypeError):
+            logger.error(f"robotgo_executor failed: {result.stderr.decode(errors='replace')}")
+        return False
     except Exception as e:
-        logger.error(f"Error executing robotgo code: {e}")
+        logger.error(f"Error executing robotgo actions: {e}")
         return False
 
 
@@ -275,26 +630,29 @@ def get_screen_size() -> tuple:
     action = {
         "type": "screenSize",
         "params": {},
-        "platform": platform.system().lower()
+        "platform": _PLATFORM
     }
     
-    json_input = json.dumps(action)
-    executor_path = get_robotgo_executor_path()
-    
     try:
-        result = subprocess.run(
-            [executor_path, "-json", json_input],
-            capture_output=True,
-            text=True,
-            timeout=5.0
-        )
-        
-        if result.returncode == 0 and result.stdout:
-            size_data = json.loads(result.stdout)
-            return (size_data.get("width", 1920), size_data.get("height", 1080))
+        response = send_to_executor(action, timeout=5.0)
+        if response is not None:
+            if response.get("ok"):
+                return (response.get("width", 1920), response.get("height", 1080))
+        else:
+            json_input = json_dumps(action)
+            executor_path = get_robotgo_executor_path()
+            result = subprocess.run(
+                [executor_path, "-json", json_input],
+                # json_loads accepts the raw bytes
+                capture_output=True,
+                timeout=5.0
+            )
+            
+            if result.returncode == 0 and result.stdout:
+                size_data = json_loads(result.stdout)
+                return (size_data.get("width", 1920), size_data.get("height", 1080))
     except Exception as e:
         logger.error(f"Error getting screen size: {e}")
     
     # Fallback
     return (1920, 1080)
-
@@ -1,15 +1,20 @@
 package main
 
 import (
+	"bufio"
+	"bytes"
+	"encoding/binary"
 	"encoding/json"
 	"flag"
 	"fmt"
+	"io"
 	"os"
 	"runtime"
 	"strconv"
 	"strings"
 
 	"github.com/go-vgo/robotgo"
+	"github.com/vmihailenco/msgpack/v5"
 )
 
 // Action represents a GUI action command
@@ -20,6 +25,38 @@ type Action struct {
 	Platform string                 `json:"platform,omitempty"`
 }
 
+// Batch is a list of actions executed in order by a single process (-batch)
+type Batch struct {
+	Actions []Action `json:"actions"`
+}
+
+// Result reports the outcome of one action in a batch
+type Result struct {
+	Type  string `json:"type"`
+	OK    bool   `json:"ok"`
+	Error string `json:"error,omitempty"`
+}
+
+// Request is one message of the -serve protocol: a single action, or a batch when
+// Actions is set. Control types are "ping" and "quit"; a ping with Format "msgpack"
+// switches the rest of the session to length-prefixed msgpack frames.
+type Request struct {
+	Action
+	Actions []Action `json:"actions,omitempty"`
+	Format  string   `json:"format,omitempty"`
+}
+
+// Response is the single message written back for each -serve request
+type Response struct {
+	Type    string   `json:"type"`
+	OK      bool     `json:"ok"`
+	Error   string   `json:"error,omitempty"`
+	Format  string   `json:"format,omitempty"`
+	Width   int      `json:"width,omitempty"`
+	Height  int      `json:"height,omitempty"`
+	Results []Result `json:"results,omitempty"`
+}
+
 // normalizeKey normalizes key names for the current platform
 func normalizeKey(key string, platform string) string {
 	keyLower := strings.ToLower(key)
@@ -71,18 +108,20 @@ func executeAction(action Action) error {
 
 	switch action.Type {
 	case "click":
-		x, _ := getFloat(action.Params["x"])
-		y, _ := getFloat(action.Params["y"])
+		x, y, err := paramXY(action.Params, "x", "y")
+		if err != nil {
+			return err
+		}
 		if x < 0 || y < 0 {
 			return fmt.Errorf("invalid coordinates: x=%v, y=%v", x, y)
 		}
 		clicks := 1
-		if c, ok := action.Params["clicks"]; ok {
-			if ci, ok := c.(float64); ok {
-				clicks = int(ci)
-			} else if ci, ok := c.(int); ok {
-				clicks = ci
+		if _, ok := action.Params["clicks"]; ok {
+			c, err := paramFloat(action.Params, "clicks")
+			if err != nil {
+				return err
 			}
+			clicks = int(c)
 		}
 		button := "left"
 		if b, ok := action.Params["button"]; ok {
@@ -133,18 +172,24 @@ func executeAction(action Action) error {
 		}
 
 	case "moveTo":
-		x, _ := getFloat(action.Params["x"])
-		y, _ := getFloat(action.Params["y"])
+		x, y, err := paramXY(action.Params, "x", "y")
+		if err != nil {
+			return err
+		}
 		if x < 0 || y < 0 {
 			return fmt.Errorf("invalid coordinates: x=%v, y=%v", x, y)
 		}
 		robotgo.Move(int(x), int(y))
 
 	case "dragTo":
-		x1, _ := getFloat(action.Params["x1"])
-		y1, _ := getFloat(action.Params["y1"])
-		x2, _ := getFloat(action.Params["x2"])
-		y2, _ := getFloat(action.Params["y2"])
+		x1, y1, err := paramXY(action.Params, "x1", "y1")
+		if err != nil {
+			return err
+		}
+		x2, y2, err := paramXY(action.Params, "x2", "y2")
+		if err != nil {
+			return err
+		}
 		if x1 < 0 || y1 < 0 || x2 < 0 || y2 < 0 {
 			return fmt.Errorf("invalid drag coordinates: (%v,%v) to (%v,%v)", x1, y1, x2, y2)
 		}
@@ -235,9 +280,14 @@ func executeAction(action Action) error {
 		robotgo.KeyToggle(key, "up")
 
 	case "scroll":
-		x, _ := getFloat(action.Params["x"])
-		y, _ := getFloat(action.Params["y"])
-		clicks, _ := getFloat(action.Params["clicks"])
+		x, y, err := paramXY(action.Params, "x", "y")
+		if err != nil {
+			return err
+		}
+		clicks, err := paramFloat(action.Params, "clicks")
+		if err != nil {
+			return err
+		}
 		if x < 0 || y < 0 {
 			return fmt.Errorf("invalid scroll coordinates: x=%v, y=%v", x, y)
 		}
@@ -264,7 +314,10 @@ func executeAction(action Action) error {
 		}
 
 	case "wait":
-		duration, _ := getFloat(action.Params["duration"])
+		duration, err := paramFloat(action.Params, "duration")
+		if err != nil {
+			return err
+		}
 		// Convert seconds to milliseconds for MilliSleep
 		ms := int(duration * 1000)
 		robotgo.MilliSleep(ms)
@@ -282,26 +335,217 @@ func executeAction(action Action) error {
 	return nil
 }
 
+// getFloat converts a decoded number to float64. JSON yields float64; msgpack with
+// loose interface decoding yields int64 or uint64 (positive ints are packed unsigned)
 func getFloat(v interface{}) (float64, error) {
 	switch val := v.(type) {
 	case float64:
 		return val, nil
+	case float32:
+		return float64(val), nil
 	case int:
 		return float64(val), nil
+	case int32:
+		return float64(val), nil
+	case int64:
+		return float64(val), nil
+	case uint:
+		return float64(val), nil
+	case uint64:
+		return float64(val), nil
 	case string:
 		return strconv.ParseFloat(val, 64)
 	default:
-		return 0, fmt.Errorf("cannot convert %v to float64", v)
+		return 0, fmt.Errorf("cannot convert %v (%T) to float64", v, v)
+	}
+}
+
+// paramFloat reads a required numeric parameter
+func paramFloat(params map[string]interface{}, key string) (float64, error) {
+	v, ok := params[key]
+	if !ok {
+		return 0, fmt.Errorf("missing parameter %q", key)
+	}
+	f, err := getFloat(v)
+	if err != nil {
+		return 0, fmt.Errorf("invalid parameter %q: %w", key, err)
+	}
+	return f, nil
+}
+
+// paramXY reads a required coordinate pair
+func paramXY(params map[string]interface{}, xKey, yKey string) (float64, float64, error) {
+	x, err := paramFloat(params, xKey)
+	if err != nil {
+		return 0, 0, err
+	}
+	y, err := paramFloat(params, yKey)
+	if err != nil {
+		return 0, 0, err
+	}
+	return x, y, nil
+}
+
+// executeBatch executes actions in order, stopping at the first failure, and
+// returns one Result per attempted action
+func executeBatch(actions []Action, platform string) ([]Result, bool) {
+	results := make([]Result, 0, len(actions))
+	for _, action := range actions {
+		if platform != "" {
+			action.Platform = platform
+		}
+		result := Result{Type: action.Type, OK: true}
+		if err := executeAction(action); err != nil {
+			result.OK = false
+			result.Error = err.Error()
+			return append(results, result), false
+		}
+		results = append(results, result)
+	}
+	return results, true
+}
+
+// runBatch executes a {"actions": [...]} batch and prints its results as a JSON array
+func runBatch(jsonInput string, platform string) {
+	var batch Batch
+	if err := json.Unmarshal([]byte(jsonInput), &batch); err != nil {
+		fmt.Fprintf(os.Stderr, "Error parsing JSON: %v\n", err)
+		os.Exit(1)
+	}
+
+	results, ok := executeBatch(batch.Actions, platform)
+	out, _ := json.Marshal(results)
+	fmt.Println(string(out))
+	if !ok {
+		fmt.Fprintf(os.Stderr, "Error executing action: %s\n", results[len(results)-1].Error)
+		os.Exit(1)
+	}
+}
+
+// readFrame reads one request: a JSON line, or a 4-byte big-endian length followed
+// by a msgpack body once the session is packed
+func readFrame(r *bufio.Reader, packed bool) ([]byte, error) {
+	if !packed {
+		line, err := r.ReadBytes('\n')
+		if len(line) > 0 {
+			return line, nil
+		}
+		return nil, err
+	}
+	var size [4]byte
+	if _, err := io.ReadFull(r, size[:]); err != nil {
+		return nil, err
+	}
+	body := make([]byte, binary.BigEndian.Uint32(size[:]))
+	_, err := io.ReadFull(r, body)
+	return body, err
+}
+
+func decodeRequest(frame []byte, packed bool, req *Request) error {
+	if !packed {
+		return json.Unmarshal(frame, req)
+	}
+	dec := msgpack.NewDecoder(bytes.NewReader(frame))
+	dec.SetCustomStructTag("json")
+	// Numbers decode as int64/float64, like the JSON path's float64
+	dec.UseLooseInterfaceDecoding(true)
+	return dec.Decode(req)
+}
+
+func writeResponse(w *bufio.Writer, packed bool, resp Response) error {
+	if packed {
+		var buf bytes.Buffer
+		enc := msgpack.NewEncoder(&buf)
+		enc.SetCustomStructTag("json")
+		if err := enc.Encode(resp); err != nil {
+			return err
+		}
+		var size [4]byte
+		binary.BigEndian.PutUint32(size[:], uint32(buf.Len()))
+		w.Write(size[:])
+		w.Write(buf.Bytes())
+	} else {
+		out, err := json.Marshal(resp)
+		if err != nil {
+			return err
+		}
+		w.Write(out)
+		w.WriteByte('\n')
+	}
+	return w.Flush()
+}
+
+// serve reads one request at a time from stdin and writes one response per request
+// to stdout, so a caller can keep a single process alive for a whole run. Messages
+// are JSON lines until a ping negotiates msgpack framing.
+func serve(platform string) {
+	reader := bufio.NewReaderSize(os.Stdin, 64*1024)
+	writer := bufio.NewWriter(os.Stdout)
+	packed := false
+
+	for {
+		frame, err := readFrame(reader, packed)
+		if err != nil {
+			return
+		}
+		var req Request
+		if err := decodeRequest(frame, packed, &req); err != nil {
+			writeResponse(writer, packed, Response{Type: "error", Error: fmt.Sprintf("parsing request: %v", err)})
+			continue
+		}
+		if platform != "" {
+			req.Platform = platform
+		}
+
+		switch {
+		case req.Actions != nil:
+			results, ok := executeBatch(req.Actions, platform)
+			resp := Response{Type: "batch", OK: ok, Results: results}
+			if !ok {
+				resp.Error = results[len(results)-1].Error
+			}
+			writeResponse(writer, packed, resp)
+		case req.Type == "quit":
+			writeResponse(writer, packed, Response{Type: "quit", OK: true})
+			return
+		case req.Type == "ping":
+			// The reply still uses the current framing; later messages use the new one
+			resp := Response{Type: "ping", OK: true}
+			if req.Format == "msgpack" {
+				resp.Format = "msgpack"
+			}
+			writeResponse(writer, packed, resp)
+			packed = packed || req.Format == "msgpack"
+		case req.Type == "screenSize":
+			w, h := robotgo.GetScreenSize()
+			writeResponse(writer, packed, Response{Type: "screenSize", OK: true, Width: w, Height: h})
+		default:
+			resp := Response{Type: req.Type, OK: true}
+			if err := executeAction(req.Action); err != nil {
+				resp.OK = false
+				resp.Error = err.Error()
+			}
+			writeResponse(writer, packed, resp)
+		}
 	}
 }
 
 func main() {
 	var jsonInput string
 	var platform string
+	var batch bool
+	var serveMode bool
 	flag.StringVar(&jsonInput, "json", "", "JSON action to execute")
 	flag.StringVar(&platform, "platform", "", "Platform (darwin, windows, linux)")
+	flag.BoolVar(&batch, "batch", false, "Treat -json as {\"actions\": [...]} and execute them in order")
+	flag.BoolVar(&serveMode, "serve", false, "Read requests from stdin until EOF or a quit request (JSON lines, or msgpack frames once negotiated)")
 	flag.Parse()
 
+	if serveMode {
+		serve(platform)
+		return
+	}
+
 	if jsonInput == "" {
 		// Try reading from stdin
 		var input []byte
@@ -314,6 +558,11 @@ func main() {
 		os.Exit(1)
 	}
 
+	if batch {
+		runBatch(jsonInput, platform)
+		return
+	}
+
 	var action Action
 	if err := json.Unmarshal([]byte(jsonInput), &action); err != nil {
 		fmt.Fprintf(os.Stderr, "Error parsing JSON: %v\n", err)
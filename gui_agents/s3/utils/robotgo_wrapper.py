@@ -1,48 +1,25 @@
 """
 Wrapper module to execute GUI actions using Go robotgo binary instead of pyautogui.
 """
-import json
 import os
 import platform
 import subprocess
 import logging
-from pathlib import Path
+import warnings
 from typing import Dict, List, Optional, Any
 
-logger = logging.getLogger("desktopenv.agent")
+from gui_agents.s3.utils.robotgo_executor import (
+    execute_robotgo_actions,
+    get_robotgo_executor_path,
+    json_dumps,
+    json_loads,
+    send_to_executor,
+)
 
-# Path to the robotgo_executor binary
-ROBOTGO_EXECUTOR_PATH = None
+logger = logging.getLogger("desktopenv.agent")
 
-
-def get_robotgo_executor_path():
-    """Get the path to the robotgo_executor binary."""
-    global ROBOTGO_EXECUTOR_PATH
-    
-    if ROBOTGO_EXECUTOR_PATH is None:
-        # Try to find the binary relative to this file
-        current_dir = Path(__file__).parent
-        executor_dir = current_dir / "robotgo_executor"
-        
-        # Check for built binary
-        if platform.system() == "Windows":
-            binary_name = "robotgo_executor.exe"
-        else:
-            binary_name = "robotgo_executor"
-        
-        binary_path = executor_dir / binary_name
-        
-        if binary_path.exists():
-            ROBOTGO_EXECUTOR_PATH = str(binary_path.absolute())
-        else:
-            # Fallback: try in PATH
-            ROBOTGO_EXECUTOR_PATH = "robotgo_executor"
-            logger.warning(
-                f"robotgo_executor binary not found at {binary_path}. "
-                "Make sure to build it first: cd gui_agents/s3/utils/robotgo_executor && go build -o robotgo_executor main.go"
-            )
-    
-    return ROBOTGO_EXECUTOR_PATH
+# OPTIMIZATION: Resolved once; the platform cannot change while the process runs
+_PLATFORM = platform.system().lower()
 
 
 def execute_action(action_type: str, params: Dict[str, Any], platform_name: Optional[str] = None) -> bool:
@@ -58,7 +35,7 @@ def execute_action(action_type: str, params: Dict[str, Any], platform_name: Opti
         True if successful, False otherwise
     """
     if platform_name is None:
-        platform_name = platform.system().lower()
+        platform_name = _PLATFORM
     
     action = {
         "type": action_type,
@@ -66,23 +43,32 @@ def execute_action(action_type: str, params: Dict[str, Any], platform_name: Opti
         "platform": platform_name
     }
     
-    json_input = json.dumps(action)
-    executor_path = get_robotgo_executor_path()
-    
     try:
+        # OPTIMIZATION: Reuse the persistent executor when the binary supports -serve
+        response = send_to_executor(action)
+        if response is not None:
+            if not response.get("ok"):
+                logger.error(f"robotgo_executor failed: {response.get('error')}")
+                return False
+            return True
+        
+        json_input = json_dumps(action)
+        executor_path = get_robotgo_executor_path()
         result = subprocess.run(
             [executor_path, "-json", json_input, "-platform", platform_name],
-            capture_output=True,
-            text=True,
+            # Only stderr is read (on failure); stdout isn't needed for these actions
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.PIPE,
             timeout=10.0
         )
         
         if result.returncode != 0:
-            logger.error(f"robotgo_executor failed: {result.stderr}")
+            stderr = result.stderr.decode(errors="replace")
+            logger.error(f"robotgo_executor failed: {stderr}")
             return False
         
         return True
-    except subprocess.TimeoutExpired:
+    except (subprocess.TimeoutExpired, TimeoutError):
         logger.error("robotgo_executor timed out")
         return False
     except Exception as e:
@@ -100,14 +86,21 @@ def execute_robotgo_code(code: str) -> bool:
             robotgo.hotkey('ctrl', 'c')
             etc.
     
+    Deprecated: the grounding agent now records structured actions (see
+    ``OSWorldACI.last_actions``); run those with ``execute_robotgo_actions``.
+    
     Args:
         code: Code string with robotgo action calls
     
     Returns:
         True if all actions succeeded, False otherwise
     """
-    # This is a simplified parser - in practice, you might want to use
-    # a more robust approach or generate proper JSON directly from grounding.py
+    warnings.warn(
+        "execute_robotgo_code is deprecated; use execute_robotgo_actions",
+        DeprecationWarning,
+        stacklevel=2,
+    )
+    # This is a simplified parser - structured actions from grounding.py avoid it
     lines = code.strip().split('\n')
     
     for line in lines:
@@ -133,22 +126,22 @@ def get_screen_size() -> tuple:
     action = {
         "type": "screenSize",
         "params": {},
-        "platform": platform.system().lower()
+        "platform": _PLATFORM
     }
     
-    json_input = json.dumps(action)
+    json_input = json_dumps(action)
     executor_path = get_robotgo_executor_path()
     
     try:
         result = subprocess.run(
             [executor_path, "-json", json_input],
+            # json_loads accepts the raw bytes
             capture_output=True,
-            text=True,
             timeout=5.0
         )
         
         if result.returncode == 0 and result.stdout:
-            size_data = json.loads(result.stdout)
+            size_data = json_loads(result.stdout)
             return (size_data.get("width", 1920), size_data.get("height", 1080))
     except Exception as e:
         logger.error(f"Error getting screen size: {e}")
@@ -26,6 +26,7 @@ setup(
         "selenium",
         'pyobjc; platform_system == "Darwin"',
         "pyautogui",
+        "mss",
         "toml",
         "pytesseract",
         "google-genai",
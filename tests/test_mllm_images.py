@@ -0,0 +1,57 @@
+"""Image media types in LMMAgent messages."""
+
+import base64
+
+import pytest
+
+pytest.importorskip("anthropic")
+pytest.importorskip("openai")
+
+from gui_agents.s3.core.engine import LMMEngineAnthropic, LMMEngineOpenAI
+from gui_agents.s3.core.mllm import LMMAgent, image_media_type
+
+PNG = b"\x89PNG\r\n\x1a\n" + b"\x00" * 16
+JPEG = b"\xff\xd8\xff\xe0" + b"\x00" * 16
+WEBP = b"RIFF\x00\x00\x00\x00WEBPVP8 " + b"\x00" * 8
+
+
+def _agent(engine_cls):
+    # Skip the engine constructor so no API client is created
+    return LMMAgent(engine=engine_cls.__new__(engine_cls))
+
+
+@pytest.mark.parametrize(
+    "data, media_type",
+    [
+        (PNG, "image/png"),
+        (JPEG, "image/jpeg"),
+        (WEBP, "image/webp"),
+        (b"", "image/png"),
+    ],
+)
+def test_image_media_type(data, media_type):
+    assert image_media_type(data) == media_type
+
+
+def test_anthropic_jpeg_observation_is_labelled_jpeg():
+    agent = _agent(LMMEngineAnthropic)
+    agent.add_message("Screenshot:", image_content=JPEG, role="user")
+
+    source = agent.messages[-1]["content"][1]["source"]
+    assert source["media_type"] == "image/jpeg"
+    assert base64.b64decode(source["data"]) == JPEG
+
+
+def test_openai_jpeg_observation_is_labelled_jpeg():
+    agent = _agent(LMMEngineOpenAI)
+    agent.add_message("Screenshot:", image_content=JPEG, role="user")
+
+    url = agent.messages[-1]["content"][1]["image_url"]["url"]
+    assert url.startswith("data:image/jpeg;base64,")
+
+
+def test_png_observation_is_still_labelled_png():
+    agent = _agent(LMMEngineAnthropic)
+    agent.add_message("Screenshot:", image_content=PNG, role="user")
+
+    assert agent.messages[-1]["content"][1]["source"]["media_type"] == "image/png"
@@ -2,7 +2,12 @@
 Data models for Agent-S MCP server.
 """
 
-from typing import Optional, List, Dict, Any
+import base64
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Optional, List, Dict, Any, Deque, Literal
 from pydantic import BaseModel, Field
 from enum import Enum
 
@@ -38,10 +43,24 @@ class ConfigSchema(BaseModel):
     enable_reflection: bool = Field(True, description="Enable reflection agent")
     max_steps: int = Field(15, description="Maximum steps per task")
     max_trajectory_length: int = Field(8, description="Maximum trajectory length")
+    step_history_limit: int = Field(64, description="Most recent steps kept in task state (full history is in the logs)")
+    resample_filter: Literal["nearest", "bilinear", "bicubic", "lanczos"] = Field(
+        "bilinear", description="Filter used to downscale per-step screenshots"
+    )
+    min_settle: float = Field(0.2, description="Minimum seconds to wait after an action before the next screenshot")
+    max_settle: float = Field(1.0, description="Maximum seconds to wait for the screen to stop changing after an action")
+    settle_threshold: float = Field(1.0, description="Mean per-pixel change (0-255) below which the screen counts as settled")
+    dedup_screenshots: bool = Field(True, description="Reuse the previous step's encoded screenshot when the screen is unchanged")
+    screenshot_format: Literal["png", "jpeg"] = Field(
+        "png", description="Encoding of screenshots sent to the models (jpeg encodes several times faster)"
+    )
     enable_local_env: bool = Field(False, description="Enable local code execution environment")
 
 
-class StepInfo(BaseModel):
+# OPTIMIZATION: Per-step task records are slotted dataclasses rather than pydantic models,
+# so creating and copying them skips validation and per-instance __dict__ storage.
+@dataclass(slots=True, kw_only=True)
+class StepInfo:
     """Information about a single execution step."""
     step_number: int
     plan: Optional[str] = None
@@ -51,19 +70,35 @@ class StepInfo(BaseModel):
     timestamp: float
 
 
-class TaskState(BaseModel):
+@dataclass(slots=True, kw_only=True)
+class TaskState:
     """State of a running or completed task."""
     task_id: str
     instruction: str
     status: TaskStatus
     current_step: int = 0
     max_steps: int = 15
-    steps: List[StepInfo] = Field(default_factory=list)
-    latest_screenshot: Optional[str] = None  # Base64 encoded PNG
+    # Bounded by TaskManager to the most recent steps
+    steps: Deque[StepInfo] = field(default_factory=deque)
+    plan_history: List[str] = field(default_factory=list)  # "Step N: plan", kept per step
+    # OPTIMIZATION: Raw encoded bytes; base64 is produced only when a client reads it
+    latest_screenshot_bytes: Optional[bytes] = None
+    screenshot_format: str = "png"  # ConfigSchema.screenshot_format of the task
     error: Optional[str] = None
     created_at: float
     updated_at: float
     completed_at: Optional[float] = None
+    # Monotonic creation time for age checks; wall-clock fields are for display
+    created_monotonic: float = field(default_factory=time.monotonic)
+    # Serializes writers of this task only (see TaskManager)
+    lock: threading.Lock = field(default_factory=threading.Lock, repr=False, compare=False)
+
+    @property
+    def latest_screenshot(self) -> Optional[str]:
+        """Latest screenshot as base64 encoded image (see screenshot_format)."""
+        if not self.latest_screenshot_bytes:
+            return None
+        return base64.b64encode(self.latest_screenshot_bytes).decode('ascii')
 
 
 class TaskResponse(BaseModel):
@@ -31,12 +31,54 @@ task_manager = TaskManager(cleanup_age_hours=24)
 # Lock for enforcing single-task execution
 execution_lock = threading.Lock()
 
+# Strong references to running progress pumps (the event loop only keeps weak ones)
+_progress_pumps = set()
+
+# Python 3.12+: lets the progress pump start eagerly instead of on the next loop pass
+_eager_task_factory = getattr(asyncio, "eager_task_factory", None)
+
 # Store agent wrapper per session (keyed by some session identifier)
 # For now, we'll create it on-demand per task
 agent_wrappers = {}
 
 logger = logging.getLogger(__name__)
 
+# OPTIMIZATION: Serialize tool results with orjson when it is installed
+try:
+    import orjson
+
+    def _json(obj, indent: bool = False) -> str:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2 if indent else 0).decode()
+except ImportError:
+    def _json(obj, indent: bool = False) -> str:
+        return json.dumps(obj, indent=2 if indent else None)
+
+
+# Constant-shape "not found" reply; only the (JSON-escaped) task id varies
+_NOT_FOUND_TEMPLATE = '{"error": "Task not found", "task_id": %s}'
+
+
+def _task_not_found(task_id: str) -> str:
+    return _NOT_FOUND_TEMPLATE % _json(task_id)
+
+
+# User message of the automate_task prompt; %s is the task description
+_AUTOMATE_TASK_PROMPT = """I need to automate this GUI task: %s
+
+Please use the run_task tool to execute this task with Agent-S.
+
+Agent-S will:
+1. Analyze the screen and task requirements
+2. Generate and execute GUI actions automatically (clicks, typing, etc.)
+3. Report progress in real-time
+4. Complete the task or reach max steps
+
+After starting the task, you can:
+- Use get_status to check progress and see the latest screenshot
+- Use cancel_task to stop execution if needed
+
+What task would you like to execute?"""
+
 
 @smithery.server(config_schema=ConfigSchema)
 def create_server():
@@ -67,29 +109,31 @@ def create_server():
         Example:
             instruction: "Open calculator and compute 123 + 456"
         """
+        # Generate task ID
+        task_id = str(uuid.uuid4())
+        
         try:
             # Get session config
             config: ConfigSchema = ctx.session_config
             
             # Enforce single task limit (Phase 1)
-            running_tasks = task_manager.get_running_tasks()
-            if running_tasks:
-                return json.dumps({
+            running_task_id = task_manager.try_claim_running(task_id)
+            if running_task_id is not None:
+                return _json({
                     "error": "A task is already running",
-                    "running_task_id": running_tasks[0],
+                    "running_task_id": running_task_id,
                     "message": "Please wait for the current task to complete or cancel it first"
                 })
             
-            # Generate task ID
-            task_id = str(uuid.uuid4())
-            
             logger.info(f"📝 Creating task {task_id}: {instruction}")
             
             # Create task in manager
             task_manager.create_task(
                 task_id=task_id,
                 instruction=instruction,
-                max_steps=config.max_steps
+                max_steps=config.max_steps,
+                step_history_limit=config.step_history_limit,
+                screenshot_format=config.screenshot_format
             )
             
             # Initialize agent wrapper
@@ -99,7 +143,7 @@ def create_server():
             logger.info("🔍 Validating grounding model connectivity...")
             if not wrapper.initialize_agent():
                 task_manager.mark_complete(task_id, "failed", "Failed to initialize Agent-S")
-                return json.dumps({
+                return _json({
                     "task_id": task_id,
                     "status": "failed",
                     "error": "Failed to initialize Agent-S. Check grounding model connectivity."
@@ -119,21 +163,46 @@ def create_server():
                 except Exception as e:
                     logger.error(f"Failed to report progress: {e}")
             
-            # Start task execution in background thread
+            # OPTIMIZATION: Progress is reported on the server's own event loop rather
+            # than a private loop per task blocked on once per step
+            main_loop = asyncio.get_running_loop()
+            
+            # OPTIMIZATION: Latest-value-wins slot drained by a single pump, so steps that
+            # arrive while a report is in flight are coalesced into the next one
+            progress_lock = threading.Lock()
+            latest_progress = {}
+            progress_ready = asyncio.Event()
+            
+            async def progress_pump():
+                """Send the newest pending progress until the task finishes."""
+                while True:
+                    await progress_ready.wait()
+                    progress_ready.clear()
+                    with progress_lock:
+                        update = latest_progress.pop("update", None)
+                        done = latest_progress.get("done", False)
+                    if update is not None:
+                        await report_progress(*update)
+                    if done:
+                        return
+            
+            def signal_progress(key, value):
+                """Store into the progress slot and wake the pump (worker thread)."""
+                try:
+                    with progress_lock:
+                        latest_progress[key] = value
+                    main_loop.call_soon_threadsafe(progress_ready.set)
+                except Exception as e:
+                    logger.error(f"Progress callback error: {e}")
+            
+            def sync_progress_callback(step, max_steps, plan):
+                """Record progress from the worker thread without waiting on the client."""
+                signal_progress("update", (step, max_steps, plan))
+            
+            # Start task execution on the loop's default executor
             def execute_task():
                 """Background execution function."""
                 try:
-                    # Create event loop for async progress reporting
-                    loop = asyncio.new_event_loop()
-                    asyncio.set_event_loop(loop)
-                    
-                    def sync_progress_callback(step, max_steps, plan):
-                        """Sync wrapper for async progress reporting."""
-                        try:
-                            loop.run_until_complete(report_progress(step, max_steps, plan))
-                        except Exception as e:
-                            logger.error(f"Progress callback error: {e}")
-                    
                     # Execute task
                     result = wrapper.execute_task(
                         task_id=task_id,
@@ -147,13 +216,24 @@ def create_server():
                     logger.error(f"Task execution error: {e}")
                     logger.exception(e)
                     task_manager.mark_complete(task_id, "failed", str(e))
-            
-            # Start execution thread
-            execution_thread = threading.Thread(target=execute_task, daemon=True)
-            execution_thread.start()
+                finally:
+                    task_manager.release_running(task_id)
+                    signal_progress("done", True)
+            
+            # OPTIMIZATION: Start the pump eagerly so it is already waiting when the first
+            # step lands; only this task is eager, not the whole FastMCP loop
+            if _eager_task_factory is not None:
+                pump = _eager_task_factory(main_loop, progress_pump())
+            else:
+                pump = main_loop.create_task(progress_pump())
+            _progress_pumps.add(pump)
+            pump.add_done_callback(_progress_pumps.discard)
+            
+            # Errors are handled inside execute_task, so the future isn't awaited
+            main_loop.run_in_executor(None, execute_task)
             
             # Return immediately with task ID
-            return json.dumps({
+            return _json({
                 "task_id": task_id,
                 "status": "running",
                 "message": f"Task started with {config.max_steps} max steps"
@@ -162,7 +242,8 @@ def create_server():
         except Exception as e:
             logger.error(f"Failed to start task: {e}")
             logger.exception(e)
-            return json.dumps({
+            task_manager.release_running(task_id)
+            return _json({
                 "error": str(e),
                 "message": "Failed to start task"
             })
@@ -176,7 +257,7 @@ def create_server():
         - Current status (running, completed, failed, cancelled)
         - Current step number and max steps
         - Plan history from all executed steps
-        - Latest screenshot (base64 encoded PNG)
+        - Latest screenshot (base64 encoded PNG, or JPEG if configured)
         - Error message if failed
         
         Args:
@@ -190,24 +271,16 @@ def create_server():
             task = task_manager.get_task(task_id)
             
             if not task:
-                return json.dumps({
-                    "error": "Task not found",
-                    "task_id": task_id
-                })
-            
-            # Extract plan history
-            plan_history = []
-            for step in task.steps:
-                if step.plan:
-                    plan_history.append(f"Step {step.step_number + 1}: {step.plan}")
+                return _task_not_found(task_id)
             
             # Build response
-            response = TaskStatusResponse(
+            # OPTIMIZATION: Fields come from the validated task record, so skip re-validation
+            response = TaskStatusResponse.model_construct(
                 task_id=task.task_id,
                 status=task.status.value,
                 current_step=task.current_step,
                 max_steps=task.max_steps,
-                plan_history=plan_history,
+                plan_history=task.plan_history,
                 latest_screenshot=task.latest_screenshot,
                 error=task.error
             )
@@ -216,7 +289,7 @@ def create_server():
             
         except Exception as e:
             logger.error(f"Failed to get status: {e}")
-            return json.dumps({
+            return _json({
                 "error": str(e),
                 "task_id": task_id
             })
@@ -241,13 +314,10 @@ def create_server():
             task = task_manager.get_task(task_id)
             
             if not task:
-                return json.dumps({
-                    "error": "Task not found",
-                    "task_id": task_id
-                })
+                return _task_not_found(task_id)
             
             if task.status != TaskStatus.RUNNING:
-                return json.dumps({
+                return _json({
                     "error": f"Task is not running (status: {task.status.value})",
                     "task_id": task_id,
                     "status": task.status.value
@@ -258,7 +328,7 @@ def create_server():
             
             logger.info(f"Task {task_id} cancelled")
             
-            return json.dumps({
+            return _json({
                 "task_id": task_id,
                 "status": "cancelled",
                 "message": "Task cancelled successfully"
@@ -266,7 +336,7 @@ def create_server():
             
         except Exception as e:
             logger.error(f"Failed to cancel task: {e}")
-            return json.dumps({
+            return _json({
                 "error": str(e),
                 "task_id": task_id
             })
@@ -301,14 +371,14 @@ def create_server():
                     "error": task.error
                 })
             
-            return json.dumps({
+            return _json({
                 "tasks": summary,
                 "total": len(summary)
-            }, indent=2)
+            }, indent=True)
             
         except Exception as e:
             logger.error(f"Failed to list tasks: {e}")
-            return json.dumps({
+            return _json({
                 "error": str(e),
                 "tasks": []
             })
@@ -319,7 +389,8 @@ def create_server():
         Get the latest screenshot for a task.
         
         Returns the most recent screenshot captured during task execution.
-        The screenshot is base64 encoded PNG format.
+        The screenshot is base64 encoded, PNG by default or JPEG when the
+        session sets screenshot_format to "jpeg" (see the "format" field).
         
         Args:
             task_id: Task identifier
@@ -328,29 +399,27 @@ def create_server():
             task = task_manager.get_task(task_id)
             
             if not task:
-                return json.dumps({
-                    "error": "Task not found",
-                    "task_id": task_id
-                })
+                return _task_not_found(task_id)
             
-            if not task.latest_screenshot:
-                return json.dumps({
+            screenshot = task.latest_screenshot
+            if not screenshot:
+                return _json({
                     "error": "No screenshot available",
                     "task_id": task_id,
                     "message": "Task may not have started yet or no screenshots captured"
                 })
             
-            return json.dumps({
+            return _json({
                 "task_id": task_id,
-                "screenshot": task.latest_screenshot,
-                "format": "base64_png",
+                "screenshot": screenshot,
+                "format": f"base64_{task.screenshot_format}",
                 "status": task.status.value,
                 "step": task.current_step
             })
             
         except Exception as e:
             logger.error(f"Failed to get screenshot: {e}")
-            return json.dumps({
+            return _json({
                 "error": str(e),
                 "task_id": task_id
             })
@@ -373,21 +442,7 @@ def create_server():
         return [
             {
                 "role": "user",
-                "content": f"""I need to automate this GUI task: {task_description}
-
-Please use the run_task tool to execute this task with Agent-S.
-
-Agent-S will:
-1. Analyze the screen and task requirements
-2. Generate and execute GUI actions automatically (clicks, typing, etc.)
-3. Report progress in real-time
-4. Complete the task or reach max steps
-
-After starting the task, you can:
-- Use get_status to check progress and see the latest screenshot
-- Use cancel_task to stop execution if needed
-
-What task would you like to execute?"""
+                "content": _AUTOMATE_TASK_PROMPT % task_description
             }
         ]
     
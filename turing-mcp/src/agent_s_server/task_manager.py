@@ -2,18 +2,25 @@
 Thread-safe task state management for Agent-S MCP server.
 """
 
-import base64
 import time
 import threading
+from collections import deque
 from typing import Optional, Dict, List
-from multiprocessing import Manager
 
 from .models import TaskState, TaskStatus, StepInfo
 
+# OPTIMIZATION: Members bound once at module scope and compared by identity (enum
+# members are singletons), skipping the class attribute lookup and str.__eq__
+_PENDING = TaskStatus.PENDING
+_RUNNING = TaskStatus.RUNNING
+
+# Statuses that end a task and stamp completed_at
+_FINAL_STATUSES = frozenset((TaskStatus.COMPLETED, TaskStatus.FAILED, TaskStatus.CANCELLED))
+
 
 class TaskManager:
     """
-    Thread-safe manager for task state using multiprocessing.Manager.
+    Thread-safe manager for task state held in this process.
     Provides CRUD operations and automatic cleanup of old tasks.
     """
     
@@ -24,11 +31,17 @@ class TaskManager:
         Args:
             cleanup_age_hours: Tasks older than this will be cleaned up
         """
-        # Use multiprocessing Manager for inter-process shared state
-        self._manager = Manager()
-        self._tasks = self._manager.dict()
+        # OPTIMIZATION: Plain in-process dict of TaskState objects. Tasks only run on
+        # threads of the server process, so a Manager proxy (pickling every access
+        # through a helper process) is unnecessary.
+        self._tasks: Dict[str, TaskState] = {}
         
-        # Thread lock for atomic operations within server process
+        # OPTIMIZATION: Single slot for the one task allowed to run at a time, so the
+        # check is O(1) instead of a scan over every task
+        self._running_task_id: Optional[str] = None
+        
+        # Guards inserts/deletes of _tasks and the running slot. Updates to a task take
+        # only that task's own lock, so status polls and other tasks never wait on them.
         self._lock = threading.Lock()
         
         self.cleanup_age_hours = cleanup_age_hours
@@ -37,7 +50,9 @@ class TaskManager:
         self,
         task_id: str,
         instruction: str,
-        max_steps: int = 15
+        max_steps: int = 15,
+        step_history_limit: Optional[int] = 64,
+        screenshot_format: str = "png"
     ) -> TaskState:
         """
         Create a new task.
@@ -46,6 +61,8 @@ class TaskManager:
             task_id: Unique task identifier
             instruction: Task instruction
             max_steps: Maximum number of steps
+            step_history_limit: Most recent steps to retain (None keeps all)
+            screenshot_format: Encoding of the task's screenshots ("png" or "jpeg")
             
         Returns:
             TaskState object
@@ -58,18 +75,46 @@ class TaskManager:
                 status=TaskStatus.PENDING,
                 current_step=0,
                 max_steps=max_steps,
-                steps=[],
-                latest_screenshot=None,
+                # OPTIMIZATION: Ring buffer, so long tasks don't grow without bound
+                steps=deque(maxlen=step_history_limit),
+                latest_screenshot_bytes=None,
+                screenshot_format=screenshot_format,
                 error=None,
                 created_at=now,
                 updated_at=now,
                 completed_at=None
             )
             
-            # Convert to dict for storage in Manager.dict
-            self._tasks[task_id] = task.model_dump()
+            self._tasks[task_id] = task
             return task
     
+    def try_claim_running(self, task_id: str) -> Optional[str]:
+        """
+        Claim the single running-task slot.
+        
+        Args:
+            task_id: Task that wants to run
+            
+        Returns:
+            None if the slot was claimed, otherwise the ID of the task holding it
+        """
+        with self._lock:
+            if self._running_task_id is None:
+                self._running_task_id = task_id
+                return None
+            return self._running_task_id
+    
+    def release_running(self, task_id: str):
+        """
+        Free the running-task slot if task_id holds it.
+        
+        Args:
+            task_id: Task identifier
+        """
+        with self._lock:
+            if self._running_task_id == task_id:
+                self._running_task_id = None
+    
     def get_task(self, task_id: str) -> Optional[TaskState]:
         """
         Get task by ID.
@@ -78,13 +123,10 @@ class TaskManager:
             task_id: Task identifier
             
         Returns:
-            TaskState object or None if not found
+            The stored TaskState (shared, treat as read-only) or None if not found
         """
-        with self._lock:
-            task_dict = self._tasks.get(task_id)
-            if task_dict:
-                return TaskState(**task_dict)
-            return None
+        # OPTIMIZATION: A single dict lookup is atomic under the GIL; no lock needed
+        return self._tasks.get(task_id)
     
     def update_task_status(
         self,
@@ -103,22 +145,24 @@ class TaskManager:
         Returns:
             True if successful, False if task not found
         """
-        with self._lock:
-            if task_id not in self._tasks:
-                return False
-            
-            task_dict = self._tasks[task_id]
-            task_dict['status'] = status.value
-            task_dict['updated_at'] = time.time()
+        task = self._tasks.get(task_id)
+        if task is None:
+            return False
+        
+        with task.lock:
+            now = time.time()
+            task.status = status
+            task.updated_at = now
             
             if error:
-                task_dict['error'] = error
-            
-            if status in [TaskStatus.COMPLETED, TaskStatus.FAILED, TaskStatus.CANCELLED]:
-                task_dict['completed_at'] = time.time()
+                task.error = error
             
-            self._tasks[task_id] = task_dict
-            return True
+            if status in _FINAL_STATUSES:
+                task.completed_at = now
+        
+        if status in _FINAL_STATUSES:
+            self.release_running(task_id)
+        return True
     
     def update_step(
         self,
@@ -140,16 +184,18 @@ class TaskManager:
             reflection: Reflection text
             code: Code to execute
             error: Error message if any
-            screenshot: Screenshot bytes (will be base64 encoded)
+            screenshot: Encoded screenshot bytes (base64 encoded when read)
             
         Returns:
             True if successful, False if task not found
         """
-        with self._lock:
-            if task_id not in self._tasks:
-                return False
-            
-            task_dict = self._tasks[task_id]
+        task = self._tasks.get(task_id)
+        if task is None:
+            return False
+        
+        with task.lock:
+            # OPTIMIZATION: One clock read shared by the step and the task
+            now = time.time()
             
             # Create step info
             step_info = StepInfo(
@@ -158,23 +204,59 @@ class TaskManager:
                 reflection=reflection,
                 code=code,
                 error=error,
-                timestamp=time.time()
+                timestamp=now
             )
             
             # Update task
-            task_dict['steps'].append(step_info.model_dump())
-            task_dict['current_step'] = step_number
-            task_dict['updated_at'] = time.time()
+            task.steps.append(step_info)
+            # OPTIMIZATION: Extend the plan history here instead of rebuilding it per poll
+            if plan:
+                task.plan_history.append(f"Step {step_number + 1}: {plan}")
+            task.current_step = step_number
+            task.updated_at = now
             
             # Update screenshot if provided (store only latest to avoid memory bloat)
             if screenshot:
-                task_dict['latest_screenshot'] = base64.b64encode(screenshot).decode('utf-8')
+                task.latest_screenshot_bytes = screenshot
             
             # Update status to running if not already
-            if task_dict['status'] == TaskStatus.PENDING.value:
-                task_dict['status'] = TaskStatus.RUNNING.value
+            if task.status is _PENDING:
+                task.status = _RUNNING
+            
+            return True
+    
+    def record_step_error(self, task_id: str, step_number: int, error: str) -> bool:
+        """
+        Record an error for a step.
+        
+        Args:
+            task_id: Task identifier
+            step_number: Step number (0-indexed)
+            error: Error message
+            
+        Returns:
+            True if successful, False if task not found
+        """
+        task = self._tasks.get(task_id)
+        if task is None:
+            return False
+        
+        with task.lock:
+            now = time.time()
+            
+            # OPTIMIZATION: Annotate the step's existing record (e.g. an action that failed
+            # to execute) instead of appending a second, error-only record for it
+            steps = task.steps
+            if steps and steps[-1].step_number == step_number:
+                steps[-1].error = error
+            else:
+                steps.append(StepInfo(step_number=step_number, error=error, timestamp=now))
+            task.current_step = step_number
+            task.updated_at = now
+            
+            if task.status is _PENDING:
+                task.status = _RUNNING
             
-            self._tasks[task_id] = task_dict
             return True
     
     def mark_complete(self, task_id: str, status: str, error: Optional[str] = None) -> bool:
@@ -207,21 +289,28 @@ class TaskManager:
             List of TaskState objects
         """
         with self._lock:
-            return [TaskState(**task_dict) for task_dict in self._tasks.values()]
+            return list(self._tasks.values())
+    
+    def get_running_task_id(self) -> Optional[str]:
+        """
+        Get the ID of the running task.
+        
+        Returns:
+            ID of the task in the running slot, or None if no task is running
+        """
+        # OPTIMIZATION: One attribute read; callers checking for a running task need
+        # no list built
+        return self._running_task_id
     
     def get_running_tasks(self) -> List[str]:
         """
         Get list of running task IDs.
         
         Returns:
-            List of task IDs with status RUNNING
+            List holding the ID of the task in the running slot, if any
         """
-        with self._lock:
-            return [
-                task_id 
-                for task_id, task_dict in self._tasks.items() 
-                if task_dict['status'] == TaskStatus.RUNNING.value
-            ]
+        running_task_id = self._running_task_id
+        return [running_task_id] if running_task_id is not None else []
     
     def cleanup_old_tasks(self) -> int:
         """
@@ -231,14 +320,16 @@ class TaskManager:
             Number of tasks cleaned up
         """
         with self._lock:
-            now = time.time()
-            cutoff = now - (self.cleanup_age_hours * 3600)
+            # Monotonic, so a wall-clock step (NTP, DST, manual change) can't expire tasks early
+            cutoff = time.monotonic() - (self.cleanup_age_hours * 3600)
             
-            to_remove = [
-                task_id
-                for task_id, task_dict in self._tasks.items()
-                if task_dict['created_at'] < cutoff
-            ]
+            # OPTIMIZATION: _tasks is in creation order (tasks are inserted under the lock
+            # as they're created), so expired tasks are a prefix; stop at the first live one
+            to_remove = []
+            for task_id, task in self._tasks.items():
+                if task.created_monotonic >= cutoff:
+                    break
+                to_remove.append(task_id)
             
             for task_id in to_remove:
                 del self._tasks[task_id]